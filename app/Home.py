@@ -16,7 +16,7 @@ import io
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.vtrack import auth
-from src.vtrack.database import initialize_all_databases, G_DRIVE
+from src.vtrack.database import ensure_databases_initialized, G_DRIVE
 from app.styles import apply_verizon_theme
 
 # Profile pictures directory
@@ -351,7 +351,7 @@ def show_dashboard():
             active_count = active['count'] if active else 0
 
             # Pending sync
-            pending = local_db.fetchone("SELECT COUNT(*) as count FROM projects WHERE sync_status IN ('new', 'updated')", ())
+            pending = local_db.fetchone("SELECT COUNT(*) as count FROM pending_changes WHERE table_name = 'projects'", ())
             pending_count = pending['count'] if pending else 0
 
             # Completed
@@ -756,9 +756,9 @@ def show_dashboard():
 def main():
     """Main application logic"""
 
-    # Initialize databases on first run
+    # Initialize databases once per process (no-op on later reruns)
     try:
-        initialize_all_databases()
+        ensure_databases_initialized()
     except Exception as e:
         st.error(f"Database initialization error: {e}")
 
@@ -14,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.vtrack import auth
 from src.vtrack.database import MasterProjectsDB, LocalProjectsDB
+from src.vtrack.records import ProjectRecord
 from src.vtrack.health_score import HealthScoreCalculator
 from app.styles import apply_verizon_theme
 
@@ -54,12 +55,14 @@ role = st.session_state.role
 if role == "Sr. Project Manager":
     db = LocalProjectsDB(st.session_state.user_id)
     db.connect()
-    all_projects = db.fetchall("SELECT * FROM projects WHERE pm_id = ? ORDER BY name", (st.session_state.user_id,))
+    all_projects = db.fetch_records(
+        "SELECT * FROM projects WHERE pm_id = ? ORDER BY name", (st.session_state.user_id,), ProjectRecord
+    )
     db.close()
 else:
     db = MasterProjectsDB()
     db.connect()
-    all_projects = db.fetchall("SELECT * FROM projects ORDER BY name", ())
+    all_projects = db.fetch_records("SELECT * FROM projects ORDER BY name", (), ProjectRecord)
     db.close()
 
 if not all_projects:
@@ -113,17 +116,16 @@ with tab1:
     comparison_data = []
 
     for proj in selected_projects:
-        proj_dict = dict(proj)
-        health = HealthScoreCalculator.calculate_project_health(proj_dict)
+        health = HealthScoreCalculator.calculate_project_health(proj)
 
         comparison_data.append({
-            'Project': proj_dict['name'],
-            'CCR/NFID': proj_dict.get('ccr_nfid', 'N/A'),
-            'Status': proj_dict['status'],
-            'Customer': proj_dict.get('customer', 'N/A'),
+            'Project': proj['name'],
+            'CCR/NFID': proj.get('ccr_nfid', 'N/A'),
+            'Status': proj['status'],
+            'Customer': proj.get('customer', 'N/A'),
             'Health Score': f"{health['total_score']} ({health['grade']})",
-            'Start Date': proj_dict.get('project_start_date', 'N/A'),
-            'Complete Date': proj_dict.get('project_complete_date', 'N/A')
+            'Start Date': proj.get('project_start_date', 'N/A'),
+            'Complete Date': proj.get('project_complete_date', 'N/A')
         })
 
     df = pd.DataFrame(comparison_data)
@@ -142,12 +144,11 @@ with tab1:
     fig_status = go.Figure()
 
     for proj in selected_projects:
-        proj_dict = dict(proj)
-        status = proj_dict['status']
+        status = proj['status']
         color = status_colors.get(status, '#999')
 
         fig_status.add_trace(go.Bar(
-            name=proj_dict['name'][:20],
+            name=proj['name'][:20],
             x=['Status'],
             y=[1],
             marker_color=color,
@@ -176,10 +177,9 @@ with tab2:
 
         budget_data = []
         for proj in selected_projects:
-            proj_dict = dict(proj)
-            budget = proj_dict.get('budget_amount', 0) or 0
+            budget = proj.get('budget_amount', 0) or 0
             budget_data.append({
-                'Project': proj_dict['name'][:20],
+                'Project': proj['name'][:20],
                 'Budget': budget
             })
 
@@ -211,10 +211,9 @@ with tab2:
 
         duration_data = []
         for proj in selected_projects:
-            proj_dict = dict(proj)
 
-            start = proj_dict.get('project_start_date')
-            end = proj_dict.get('project_complete_date')
+            start = proj.get('project_start_date')
+            end = proj.get('project_complete_date')
 
             if start and end:
                 from datetime import datetime
@@ -228,7 +227,7 @@ with tab2:
                 days = 0
 
             duration_data.append({
-                'Project': proj_dict['name'][:20],
+                'Project': proj['name'][:20],
                 'Days': days
             })
 
@@ -262,10 +261,9 @@ with tab3:
     # Calculate health for all projects
     health_scores = []
     for proj in selected_projects:
-        proj_dict = dict(proj)
-        health = HealthScoreCalculator.calculate_project_health(proj_dict)
+        health = HealthScoreCalculator.calculate_project_health(proj)
         health_scores.append({
-            'project': proj_dict,
+            'project': proj,
             'health': health
         })
 
@@ -349,8 +347,7 @@ with tab4:
                 row_data = [field.replace('_', ' ').title()]
 
                 for proj in selected_projects:
-                    proj_dict = dict(proj)
-                    value = proj_dict.get(field, 'N/A')
+                    value = proj.get(field, 'N/A')
                     if value is None:
                         value = 'N/A'
                     row_data.append(str(value))
@@ -358,7 +355,7 @@ with tab4:
                 comparison_table[field] = row_data
 
             # Create DataFrame
-            columns = ['Field'] + [p['name'][:20] for p in [dict(proj) for proj in selected_projects]]
+            columns = ['Field'] + [p['name'][:20] for p in selected_projects]
             rows = list(comparison_table.values())
 
             df_detail = pd.DataFrame(rows, columns=columns)
@@ -373,21 +370,20 @@ if st.button("📊 Export Comparison as CSV", use_container_width=False):
     export_data = []
 
     for proj in selected_projects:
-        proj_dict = dict(proj)
-        health = HealthScoreCalculator.calculate_project_health(proj_dict)
+        health = HealthScoreCalculator.calculate_project_health(proj)
 
         export_row = {
-            'Project Name': proj_dict['name'],
-            'CCR/NFID': proj_dict.get('ccr_nfid', ''),
-            'Status': proj_dict['status'],
-            'Customer': proj_dict.get('customer', ''),
+            'Project Name': proj['name'],
+            'CCR/NFID': proj.get('ccr_nfid', ''),
+            'Status': proj['status'],
+            'Customer': proj.get('customer', ''),
             'Health Score': health['total_score'],
             'Health Grade': health['grade'],
-            'Start Date': proj_dict.get('project_start_date', ''),
-            'Complete Date': proj_dict.get('project_complete_date', ''),
-            'Budget': proj_dict.get('budget_amount', 0),
-            'Phase': proj_dict.get('phase', ''),
-            'Priority': proj_dict.get('project_priority', '')
+            'Start Date': proj.get('project_start_date', ''),
+            'Complete Date': proj.get('project_complete_date', ''),
+            'Budget': proj.get('budget_amount', 0),
+            'Phase': proj.get('phase', ''),
+            'Priority': proj.get('project_priority', '')
         }
 
         export_data.append(export_row)
@@ -50,22 +50,23 @@ def get_my_projects():
     """Fetch all projects for the current user"""
     query = """
         SELECT
-            local_id,
-            name,
-            ccr_nfid,
-            status,
-            phase,
-            customer,
-            clli,
-            site_address,
-            current_queue,
-            system_type,
-            project_start_date,
-            project_complete_date,
-            sync_status,
-            notes
-        FROM projects
-        ORDER BY created_at DESC
+            p.local_id,
+            p.name,
+            p.ccr_nfid,
+            p.status,
+            p.phase,
+            p.customer,
+            p.clli,
+            p.site_address,
+            p.current_queue,
+            p.system_type,
+            p.project_start_date,
+            p.project_complete_date,
+            COALESCE(pc.sync_status, 'synced') as sync_status,
+            p.notes
+        FROM projects p
+        LEFT JOIN pending_changes pc ON pc.table_name = 'projects' AND pc.row_id = p.local_id
+        ORDER BY p.created_at DESC
     """
     results = local_db.fetchall(query)
     return [dict(row) for row in results]
@@ -174,7 +175,6 @@ else:
                             UPDATE projects
                             SET name = ?, status = ?, customer = ?, clli = ?,
                                 site_address = ?, current_queue = ?, system_type = ?,
-                                sync_status = CASE WHEN sync_status = 'synced' THEN 'updated' ELSE sync_status END,
                                 updated_at = CURRENT_TIMESTAMP
                             WHERE local_id = ?
                         """, (
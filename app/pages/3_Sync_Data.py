@@ -1,6 +1,6 @@
 """
 Sync Data Page
-Push local changes to the sync inbox
+Push local changes to the sync inbox and pull master changes back
 """
 
 import streamlit as st
@@ -10,7 +10,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.vtrack import auth, sync
+from src.vtrack import auth, bundles, sync
 from app.styles import apply_verizon_theme
 from app import sidebar
 
@@ -35,6 +35,20 @@ username = st.session_state.username
 counts = sync.get_pending_sync_counts(local_db)
 total_pending = sum(counts.values())
 
+# Bundles an earlier sync staged but could not finish uploading
+staged = sync.staged_bundles(username)
+if staged:
+    st.warning(f"⚠️ {len(staged)} earlier sync bundle(s) did not finish uploading to the inbox. "
+               f"Uploaded parts are kept; only the remaining parts are sent.")
+    if st.button("⬆️ Resume Upload"):
+        with st.spinner("Uploading remaining parts..."):
+            try:
+                completed = sync.resume_outbox_uploads(username)
+                st.success(f"✅ Finished uploading {completed} sync bundle(s)")
+                st.rerun()
+            except OSError as e:
+                st.error(f"❌ Upload stopped again: {e}")
+
 # Display sync status
 st.markdown("### 📊 Sync Status")
 
@@ -82,9 +96,9 @@ if total_pending > 0:
     if counts.get('projects', 0) > 0:
         st.markdown("**Projects to Sync:**")
         projects = local_db.fetchall("""
-            SELECT name, ccr_nfid, status, sync_status
-            FROM projects
-            WHERE sync_status IN ('new', 'updated')
+            SELECT p.name, p.ccr_nfid, p.status, pc.sync_status
+            FROM projects p
+            JOIN pending_changes pc ON pc.table_name = 'projects' AND pc.row_id = p.local_id
         """)
         df = pd.DataFrame([dict(p) for p in projects])
         st.dataframe(df, hide_index=True, use_container_width=True)
@@ -95,8 +109,8 @@ if total_pending > 0:
             kpis = local_db.fetchall("""
                 SELECT k.snapshot_date, p.name as project_name, k.budget_status, k.schedule_status
                 FROM kpi_snapshots k
+                JOIN pending_changes pc ON pc.table_name = 'kpi_snapshots' AND pc.row_id = k.local_snapshot_id
                 JOIN projects p ON k.local_project_id = p.local_id
-                WHERE k.sync_status IN ('new', 'updated')
             """)
             df_kpis = pd.DataFrame([dict(k) for k in kpis])
             st.dataframe(df_kpis, hide_index=True, use_container_width=True)
@@ -133,22 +147,41 @@ else:
     st.success("✅ All changes are synced! You have no pending changes.")
     st.info("💡 Make changes to projects, add KPI snapshots, or create dependencies in 'My Dashboard' to have items to sync.")
 
+# Pull changes made in master (imports, other editors, merged inbox bundles)
+st.markdown("---")
+st.markdown("### ⬇️ Pull from Master")
+st.markdown("Refresh your local copy with changes made to your projects in the master database.")
+
+col_a, col_b, col_c = st.columns([2, 1, 2])
+with col_b:
+    if st.button("⬇️ Pull from Master", use_container_width=True):
+        with st.spinner("Fetching changes from master database..."):
+            success, message, stats = sync.pull_master_to_local(local_db)
+
+        if success:
+            st.success(f"✅ {message}")
+            if stats.get('duration') is not None:
+                st.caption(f"{stats['projects']} projects, {stats['kpis']} KPIs, "
+                           f"{stats['dependencies']} dependencies, {stats['contacts']} contacts "
+                           f"in {stats['duration']:.2f}s")
+        else:
+            st.error(f"❌ {message}")
+
 # Sync history
 st.markdown("---")
 st.markdown("### 📜 Recent Syncs")
 
 # Get list of sync files for this user
-import os
 sync_files = []
 if sync.SYNC_INBOX.exists():
-    sync_files = [f for f in os.listdir(sync.SYNC_INBOX) if f.startswith(f"sync_{username}_")]
+    sync_files = [f.name for f in bundles.bundle_files(sync.SYNC_INBOX) if f.name.startswith(f"sync_{username}_")]
     sync_files.sort(reverse=True)
 
 if sync_files:
     st.markdown(f"**Last 5 sync operations:**")
     for sync_file in sync_files[:5]:
         # Parse filename for timestamp
-        parts = sync_file.replace('.json', '').split('_')
+        parts = Path(sync_file).stem.split('_')
         if len(parts) >= 3:
             date_part = parts[2] if len(parts) > 2 else "Unknown"
             time_part = parts[3] if len(parts) > 3 else ""
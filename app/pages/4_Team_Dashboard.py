@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.vtrack import auth
-from src.vtrack.database import MasterProjectsDB, MasterUsersDB
+from src.vtrack.database import MasterProjectsDB, PROJECT_FRAME_DTYPES, PROJECT_DATE_COLUMNS
 from app.styles import apply_verizon_theme
 from app import sidebar
 
@@ -30,42 +30,26 @@ st.markdown("""
     </p>
 """, unsafe_allow_html=True)
 
-# Connect to databases
+# Connect to database (users are reachable through the attached users_db schema)
 projects_db = MasterProjectsDB()
 projects_db.connect()
 
-users_db = MasterUsersDB()
-users_db.connect()
-
 # Get all projects with user and program data
-projects = projects_db.fetchall("""
-    SELECT
-        p.*,
-        u.full_name as pm_name,
-        u.role as pm_role,
-        prog.program_name,
-        pt.type_name as project_type
-    FROM projects p
-    LEFT JOIN users u ON p.pm_id = u.user_id
-    LEFT JOIN programs prog ON p.program_id = prog.program_id
-    LEFT JOIN project_types pt ON p.project_type_id = pt.type_id
-    ORDER BY p.updated_at DESC
-""")
+df = projects_db.cached_fetch_frame(
+    "SELECT * FROM project_with_pm ORDER BY updated_at DESC",
+    dtypes=PROJECT_FRAME_DTYPES,
+    parse_dates=PROJECT_DATE_COLUMNS
+)
 
 # Get all users
-users = users_db.fetchall("SELECT * FROM users WHERE active = 1")
+users_df = projects_db.cached_fetch_frame("SELECT * FROM users_db.users WHERE active = 1")
 
 projects_db.close()
-users_db.close()
 
-if not projects:
+if df.empty:
     st.warning("No projects found. Create some projects to see team metrics!")
     st.stop()
 
-# Convert to DataFrame
-df = pd.DataFrame([dict(p) for p in projects])
-users_df = pd.DataFrame([dict(u) for u in users])
-
 # === EXECUTIVE SUMMARY ===
 st.markdown("### 📊 Executive Summary")
 
@@ -233,7 +217,6 @@ st.markdown("### 🕐 Recent Activity")
 
 # Get recently updated projects
 recent_df = df.nlargest(10, 'updated_at')[['name', 'ccr_nfid', 'status', 'pm_name', 'updated_at']]
-recent_df['updated_at'] = pd.to_datetime(recent_df['updated_at'])
 recent_df['updated_at'] = recent_df['updated_at'].dt.strftime('%Y-%m-%d %H:%M')
 
 st.dataframe(
@@ -202,55 +202,58 @@ if uploaded_file is not None:
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     
-                    for idx, row in df.iterrows():
-                        status_text.text(f"Processing row {idx + 1} of {len(df)}...")
-                        
-                        try:
-                            # Check if project already exists
-                            existing = projects_db.fetchone(
-                                "SELECT project_id FROM projects WHERE ccr_nfid = ?",
-                                (row['ccr_nfid'],)
-                            )
+                    # One lookup for every CCR/NFID already in master instead of one per row
+                    existing_ids = {
+                        r['ccr_nfid'] for r in projects_db.fetchall("SELECT ccr_nfid FROM projects")
+                    }
+                    
+                    # All rows share one transaction, so the import pays a single commit
+                    with projects_db.transaction():
+                        for idx, row in df.iterrows():
+                            # Throttle UI updates - a websocket message per row dominates large imports
+                            if idx % 100 == 0 or idx + 1 == len(df):
+                                status_text.text(f"Processing row {idx + 1} of {len(df)}...")
+                                progress_bar.progress((idx + 1) / len(df))
                             
-                            if existing:
+                            if row['ccr_nfid'] in existing_ids:
                                 skipped_count += 1
                                 continue
                             
-                            # Insert project
-                            projects_db.execute("""
-                                INSERT INTO projects (
-                                    name, ccr_nfid, program_id, project_type_id, pm_id,
-                                    status, phase, notes, nfid, customer, clli,
-                                    rft_date, system_type, current_queue, site_address,
-                                    project_start_date, project_complete_date
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (
-                                row['name'],
-                                row['ccr_nfid'],
-                                row.get('program_id'),
-                                row.get('project_type_id'),
-                                row['pm_id'],
-                                row['status'],
-                                row.get('phase'),
-                                row.get('notes'),
-                                row.get('nfid'),
-                                row.get('customer'),
-                                row.get('clli'),
-                                row.get('rft_date'),
-                                row.get('system_type'),
-                                row.get('current_queue'),
-                                row.get('site_address'),
-                                row.get('project_start_date'),
-                                row.get('project_complete_date')
-                            ))
-                            
-                            success_count += 1
-                            
-                        except Exception as e:
-                            error_count += 1
-                            st.warning(f"Error importing row {idx + 1}: {e}")
-                        
-                        progress_bar.progress((idx + 1) / len(df))
+                            try:
+                                # Insert project
+                                projects_db.execute("""
+                                    INSERT INTO projects (
+                                        name, ccr_nfid, program_id, project_type_id, pm_id,
+                                        status, phase, notes, nfid, customer, clli,
+                                        rft_date, system_type, current_queue, site_address,
+                                        project_start_date, project_complete_date
+                                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                """, (
+                                    row['name'],
+                                    row['ccr_nfid'],
+                                    row.get('program_id'),
+                                    row.get('project_type_id'),
+                                    row['pm_id'],
+                                    row['status'],
+                                    row.get('phase'),
+                                    row.get('notes'),
+                                    row.get('nfid'),
+                                    row.get('customer'),
+                                    row.get('clli'),
+                                    row.get('rft_date'),
+                                    row.get('system_type'),
+                                    row.get('current_queue'),
+                                    row.get('site_address'),
+                                    row.get('project_start_date'),
+                                    row.get('project_complete_date')
+                                ))
+                                
+                                existing_ids.add(row['ccr_nfid'])
+                                success_count += 1
+                                
+                            except Exception as e:
+                                error_count += 1
+                                st.warning(f"Error importing row {idx + 1}: {e}")
                     
                     projects_db.close()
                     progress_bar.empty()
@@ -4,15 +4,15 @@ Process Sync Inbox - Admin tool to merge synced data into master database
 
 import streamlit as st
 import pandas as pd
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.vtrack import auth
-from src.vtrack.database import MasterProjectsDB, SYNC_INBOX, ARCHIVE
+from src.vtrack import archive, auth, bundles, ingest, inbox
+from src.vtrack.database import ConfigDB, MasterProjectsDB, SYNC_INBOX, ARCHIVE
+from src.vtrack.settings import settings
 from app.styles import apply_verizon_theme
 from app import sidebar
 
@@ -33,7 +33,16 @@ st.markdown("""
 SYNC_INBOX.mkdir(parents=True, exist_ok=True)
 ARCHIVE.mkdir(parents=True, exist_ok=True)
 
-sync_files = sorted(SYNC_INBOX.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+# Pending bundles come from the manifest; only new or changed files are parsed
+manifest_db = MasterProjectsDB()
+manifest_db.connect()
+inbox.refresh_manifest(manifest_db)
+sync_files = inbox.pending_bundles(manifest_db)
+queues = ingest.queue_stats(manifest_db)
+# Processed syncs come from the archive index, not a scan of the archive
+archived_total = archive.archived_count(manifest_db)
+recent_archives = archive.recent_bundles(manifest_db)
+manifest_db.close()
 
 # Summary metrics
 st.markdown("### 📊 Inbox Status")
@@ -49,20 +58,15 @@ with col1:
     """, unsafe_allow_html=True)
 
 with col2:
-    archive_files = list(ARCHIVE.glob("*.json"))
     st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{len(archive_files)}</div>
+            <div class="metric-value">{archived_total}</div>
             <div class="metric-label">Processed</div>
         </div>
     """, unsafe_allow_html=True)
 
 with col3:
-    total_items = 0
-    for sync_file in sync_files:
-        with open(sync_file, 'r') as f:
-            data = json.load(f)
-            total_items += len(data.get('projects', []))
+    total_items = sum(entry['total_items'] for entry in sync_files)
     st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">{total_items}</div>
@@ -72,6 +76,47 @@ with col3:
 
 st.markdown("<br/>", unsafe_allow_html=True)
 
+# Per-PM queues: bundles are applied fair-share across PMs, pinned PMs first
+if queues:
+    st.markdown("### 👥 Queues by Project Manager")
+
+    def format_wait(seconds):
+        if seconds is None:
+            return "-"
+        if seconds < 120:
+            return f"{seconds:.0f}s"
+        if seconds < 7200:
+            return f"{seconds / 60:.0f}m"
+        return f"{seconds / 3600:.1f}h"
+
+    pinned = settings.ingest_pinned_users
+    df_queues = pd.DataFrame([{
+        'PM': queue['username'],
+        'Pinned': "📌" if queue['username'] in pinned else "",
+        'Pending': queue['pending'],
+        'Pending MB': round(queue['pending_bytes'] / (1024 * 1024), 2),
+        'Oldest Waiting': format_wait(queue['oldest_wait']),
+        'Applied (24h)': queue['applied'],
+        'Wait p50': format_wait(queue['p50_wait']),
+        'Wait p95': format_wait(queue['p95_wait'])
+    } for queue in queues])
+    st.dataframe(df_queues, hide_index=True, use_container_width=True)
+
+    with st.expander("📌 Pinned PMs", expanded=False):
+        st.caption("Pinned PMs' bundles are processed before everyone else's, in the order listed. "
+                   "Other PMs share the inbox fairly, with small and long-waiting bundles first.")
+        usernames = sorted({queue['username'] for queue in queues} | set(pinned))
+        new_pinned = st.multiselect("Pinned PMs", usernames, default=pinned)
+        if st.button("💾 Save Pins"):
+            config_db = ConfigDB()
+            config_db.connect()
+            config_db.set_config('ingest_pinned_users', ','.join(new_pinned))
+            config_db.close()
+            st.success("✅ Pins saved")
+            st.rerun()
+
+    st.markdown("<br/>", unsafe_allow_html=True)
+
 # Process all button
 if len(sync_files) > 0:
     st.markdown("### 🚀 Quick Actions")
@@ -80,83 +125,32 @@ if len(sync_files) > 0:
         if st.button("⚡ Process All Syncs", use_container_width=True, type="primary"):
             progress_bar = st.progress(0)
             status_text = st.empty()
-            
-            projects_db = MasterProjectsDB()
-            projects_db.connect()
-            
-            total_processed = 0
-            total_files = len(sync_files)
-            
-            for idx, sync_file in enumerate(sync_files):
-                status_text.text(f"Processing {sync_file.name}...")
-                
-                try:
-                    with open(sync_file, 'r') as f:
-                        data = json.load(f)
-                    
-                    # Process projects
-                    for project in data.get('projects', []):
-                        try:
-                            # Check if project exists by ccr_nfid
-                            existing = projects_db.fetchone(
-                                "SELECT project_id FROM projects WHERE ccr_nfid = ?",
-                                (project['ccr_nfid'],)
-                            )
-                            
-                            if existing:
-                                # Update existing project
-                                projects_db.execute("""
-                                    UPDATE projects SET
-                                        name = ?, status = ?, phase = ?, notes = ?,
-                                        customer = ?, clli = ?, site_address = ?,
-                                        current_queue = ?, system_type = ?,
-                                        updated_at = CURRENT_TIMESTAMP
-                                    WHERE ccr_nfid = ?
-                                """, (
-                                    project['name'], project['status'], project.get('phase'),
-                                    project.get('notes'), project.get('customer'),
-                                    project.get('clli'), project.get('site_address'),
-                                    project.get('current_queue'), project.get('system_type'),
-                                    project['ccr_nfid']
-                                ))
-                            else:
-                                # Insert new project
-                                projects_db.execute("""
-                                    INSERT INTO projects (
-                                        name, ccr_nfid, program_id, project_type_id, pm_id,
-                                        status, phase, notes, nfid, customer, clli,
-                                        rft_date, system_type, current_queue, site_address,
-                                        project_start_date, project_complete_date
-                                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                """, (
-                                    project['name'], project['ccr_nfid'],
-                                    project.get('program_id'), project.get('project_type_id'),
-                                    project['pm_id'], project['status'], project.get('phase'),
-                                    project.get('notes'), project.get('nfid'),
-                                    project.get('customer'), project.get('clli'),
-                                    project.get('rft_date'), project.get('system_type'),
-                                    project.get('current_queue'), project.get('site_address'),
-                                    project.get('project_start_date'), project.get('project_complete_date')
-                                ))
-                            
-                            total_processed += 1
-                        except Exception as e:
-                            st.warning(f"Error processing project {project.get('name')}: {e}")
-                    
-                    # Move to archive
-                    archive_path = ARCHIVE / sync_file.name
-                    sync_file.rename(archive_path)
-                    
-                except Exception as e:
-                    st.error(f"Error processing file {sync_file.name}: {e}")
-                
-                progress_bar.progress((idx + 1) / total_files)
-            
-            projects_db.close()
+
+            def show_progress(done, total, file_stats):
+                status_text.text(f"Processed {file_stats['file']}...")
+                progress_bar.progress(done / total)
+
+            totals = ingest.ingest_inbox(progress=show_progress, workers=ingest.default_ingest_workers())
+
             status_text.empty()
             progress_bar.empty()
-            
-            st.success(f"✅ Processed {total_files} sync files with {total_processed} projects!")
+
+            for error in totals['errors']:
+                st.warning(error)
+
+            processed = totals['projects_inserted'] + totals['projects_updated']
+            st.success(
+                f"✅ Processed {totals['files_processed']} of {totals['files']} sync files with {processed} projects "
+                f"({totals['projects_inserted']} new, {totals['projects_updated']} updated), "
+                f"{totals['kpis_applied']} KPIs, {totals['dependencies_applied']} dependencies and "
+                f"{totals['contacts_applied']} contacts in {totals['duration']:.2f}s"
+            )
+            if totals['files_deferred']:
+                st.info(f"⏳ {totals['files_deferred']} bundle parts are waiting for an earlier part "
+                        f"of the same sync and were left in the inbox")
+            if totals['files_duplicate']:
+                st.info(f"⏭️ {totals['files_duplicate']} files were identical to bundles already applied "
+                        f"and were archived without changes")
             st.balloons()
             st.rerun()
 
@@ -166,21 +160,22 @@ if len(sync_files) > 0:
 if len(sync_files) > 0:
     st.markdown("### 📦 Pending Sync Files")
     
-    for sync_file in sync_files:
-        # Read sync file
-        with open(sync_file, 'r') as f:
-            data = json.load(f)
-        
-        username = data.get('username', 'Unknown')
-        timestamp = data.get('sync_timestamp', 'Unknown')
-        num_projects = len(data.get('projects', []))
-        num_kpis = len(data.get('kpi_snapshots', []))
-        num_deps = len(data.get('project_dependencies', []))
-        num_contacts = len(data.get('project_contacts', []))
-        
-        total_items = num_projects + num_kpis + num_deps + num_contacts
-        
+    for entry in sync_files:
+        sync_file = SYNC_INBOX / entry['file_name']
+
+        username = entry['username']
+        timestamp = entry['sync_timestamp']
+        num_projects = entry['projects']
+        num_kpis = entry['kpis']
+        num_deps = entry['dependencies']
+        num_contacts = entry['contacts']
+
+        total_items = entry['total_items']
+
         with st.expander(f"📄 {sync_file.name} - {username} ({total_items} items)", expanded=False):
+            if entry['error']:
+                st.warning(f"Could not read this file: {entry['error']}")
+
             col1, col2 = st.columns([2, 1])
             
             with col1:
@@ -197,82 +192,41 @@ if len(sync_files) > 0:
                 # Show project names
                 if num_projects > 0:
                     st.markdown("**Projects in this sync:**")
-                    for project in data['projects'][:5]:  # Show first 5
-                        st.markdown(f"- {project['name']} ({project['ccr_nfid']}) - {project['status']}")
-                    if num_projects > 5:
-                        st.markdown(f"*...and {num_projects - 5} more*")
+                    for project in entry['project_preview']:
+                        # Deltas only carry name and status when they change them
+                        st.markdown(f"- {project['name'] or 'Edited project'} ({project['ccr_nfid']}) - "
+                                    f"{project['status'] or 'field updates'}")
+                    if num_projects > len(entry['project_preview']):
+                        st.markdown(f"*...and {num_projects - len(entry['project_preview'])} more*")
             
             with col2:
                 # Process this file button
                 if st.button(f"✅ Process", key=f"process_{sync_file.name}"):
                     projects_db = MasterProjectsDB()
                     projects_db.connect()
-                    
-                    processed_count = 0
-                    
-                    try:
-                        # Process projects
-                        for project in data.get('projects', []):
-                            try:
-                                existing = projects_db.fetchone(
-                                    "SELECT project_id FROM projects WHERE ccr_nfid = ?",
-                                    (project['ccr_nfid'],)
-                                )
-                                
-                                if existing:
-                                    projects_db.execute("""
-                                        UPDATE projects SET
-                                            name = ?, status = ?, phase = ?, notes = ?,
-                                            customer = ?, clli = ?, site_address = ?,
-                                            current_queue = ?, system_type = ?,
-                                            updated_at = CURRENT_TIMESTAMP
-                                        WHERE ccr_nfid = ?
-                                    """, (
-                                        project['name'], project['status'], project.get('phase'),
-                                        project.get('notes'), project.get('customer'),
-                                        project.get('clli'), project.get('site_address'),
-                                        project.get('current_queue'), project.get('system_type'),
-                                        project['ccr_nfid']
-                                    ))
-                                else:
-                                    projects_db.execute("""
-                                        INSERT INTO projects (
-                                            name, ccr_nfid, program_id, project_type_id, pm_id,
-                                            status, phase, notes, nfid, customer, clli,
-                                            rft_date, system_type, current_queue, site_address,
-                                            project_start_date, project_complete_date
-                                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                    """, (
-                                        project['name'], project['ccr_nfid'],
-                                        project.get('program_id'), project.get('project_type_id'),
-                                        project['pm_id'], project['status'], project.get('phase'),
-                                        project.get('notes'), project.get('nfid'),
-                                        project.get('customer'), project.get('clli'),
-                                        project.get('rft_date'), project.get('system_type'),
-                                        project.get('current_queue'), project.get('site_address'),
-                                        project.get('project_start_date'), project.get('project_complete_date')
-                                    ))
-                                
-                                processed_count += 1
-                            except Exception as e:
-                                st.warning(f"Error: {e}")
-                        
-                        # Move to archive
-                        archive_path = ARCHIVE / sync_file.name
-                        sync_file.rename(archive_path)
-                        
-                        projects_db.close()
-                        
-                        st.success(f"✅ Processed {processed_count} projects!")
+                    file_stats = ingest.ingest_file(projects_db, sync_file)
+                    projects_db.close()
+
+                    for error in file_stats['errors']:
+                        st.warning(f"Error: {error}")
+
+                    if file_stats['deferred']:
+                        st.info("⏳ An earlier part of this sync must be processed first")
+                    elif file_stats['duplicate']:
+                        st.info("⏭️ This bundle was already applied; archived without changes")
                         st.rerun()
-                        
-                    except Exception as e:
-                        projects_db.close()
-                        st.error(f"Error: {e}")
-                
+                    elif file_stats['success']:
+                        processed_count = file_stats['projects_inserted'] + file_stats['projects_updated']
+                        st.success(
+                            f"✅ Processed {processed_count} projects, {file_stats['kpis_applied']} KPIs, "
+                            f"{file_stats['dependencies_applied']} dependencies and "
+                            f"{file_stats['contacts_applied']} contacts!"
+                        )
+                        st.rerun()
+
                 # View JSON button
                 if st.button(f"👁️ View JSON", key=f"view_{sync_file.name}"):
-                    st.json(data)
+                    st.json(bundles.load_bundle(sync_file))
 
 else:
     st.success("✅ Inbox is empty! No pending syncs to process.")
@@ -282,13 +236,12 @@ else:
 st.markdown("---")
 st.markdown("### 📚 Recently Processed")
 
-if len(archive_files) > 0:
-    st.markdown(f"**Last 10 processed syncs:**")
-    
-    recent_archives = sorted(archive_files, key=lambda x: x.stat().st_mtime, reverse=True)[:10]
+if len(recent_archives) > 0:
+    st.markdown(f"**Last {len(recent_archives)} processed syncs:**")
     
-    for archive_file in recent_archives:
-        mtime = datetime.fromtimestamp(archive_file.stat().st_mtime)
-        st.markdown(f"- ✓ {archive_file.name} - Processed at {mtime.strftime('%Y-%m-%d %H:%M:%S')}")
+    for entry in recent_archives:
+        archived_at = datetime.fromtimestamp(entry['archived_at'])
+        st.markdown(f"- ✓ {entry['file_name']} from {entry['username']} - "
+                    f"Processed at {archived_at.strftime('%Y-%m-%d %H:%M:%S')}")
 else:
     st.info("No processed syncs yet.")
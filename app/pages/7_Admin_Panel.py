@@ -173,10 +173,7 @@ with tab2:
         if st.form_submit_button("Add Configuration"):
             if config_key and config_value:
                 try:
-                    config_db.execute("""
-                        INSERT INTO config_settings (setting_key, setting_value, description)
-                        VALUES (?, ?, ?)
-                    """, (config_key, config_value, config_desc))
+                    config_db.add_config(config_key, config_value, config_desc)
                     st.success(f"✅ Configuration '{config_key}' added!")
                     st.rerun()
                 except Exception as e:
@@ -229,9 +226,34 @@ with tab3:
             else:
                 st.markdown(f"- **{name}:** Not found")
 
+        # Connection pool and shared query cache
+        from src.vtrack.database import connection_pool, query_cache
+
+        pool_stats = connection_pool.stats()
+        st.markdown("""
+            <div class="vz-card">
+                <h4>Connection Pool</h4>
+            </div>
+        """, unsafe_allow_html=True)
+        st.markdown(f"- **Open Handles:** {pool_stats['open_handles']} ({pool_stats['in_use']} in use, {pool_stats['idle']} idle)")
+        st.markdown(f"- **Pool Hits / Misses:** {pool_stats['hits']} / {pool_stats['misses']} ({pool_stats['hit_rate']}% hit rate)")
+        st.markdown(f"- **Idle Connections Reaped:** {pool_stats['reaped']}")
+
+        cache_stats = query_cache.stats()
+        st.markdown("""
+            <div class="vz-card">
+                <h4>Query Cache</h4>
+            </div>
+        """, unsafe_allow_html=True)
+        st.markdown(f"- **Cached Results:** {cache_stats['entries']}")
+        st.markdown(f"- **Cache Hits / Misses:** {cache_stats['hits']} / {cache_stats['misses']} ({cache_stats['hit_rate']}% hit rate)")
+
     with info_col2:
         # Sync inbox status
-        from src.vtrack.database import SYNC_INBOX, ARCHIVE
+        from src.vtrack.archive import archived_count
+        from src.vtrack.inbox import pending_count
+        from src.vtrack.ingest import ingest_latency
+        from src.vtrack.database import MasterProjectsDB
 
         st.markdown("""
             <div class="vz-card">
@@ -239,17 +261,17 @@ with tab3:
             </div>
         """, unsafe_allow_html=True)
 
-        if SYNC_INBOX.exists():
-            inbox_files = list(SYNC_INBOX.glob("*.json"))
-            st.markdown(f"- **Pending Syncs:** {len(inbox_files)}")
-        else:
-            st.markdown(f"- **Pending Syncs:** 0")
-
-        if ARCHIVE.exists():
-            archive_files = list(ARCHIVE.glob("*.json"))
-            st.markdown(f"- **Processed Syncs:** {len(archive_files)}")
-        else:
-            st.markdown(f"- **Processed Syncs:** 0")
+        st.markdown(f"- **Pending Syncs:** {pending_count()}")
+
+        st.markdown(f"- **Processed Syncs:** {archived_count()}")
+
+        latency_db = MasterProjectsDB()
+        latency_db.connect()
+        latency = ingest_latency(latency_db)
+        latency_db.close()
+        if latency['bundles']:
+            st.markdown(f"- **Drop-to-Applied Latency (24h):** p50 {latency['p50']:.1f}s, "
+                        f"p95 {latency['p95']:.1f}s over {latency['bundles']} syncs")
 
         # Quick actions
         st.markdown("""
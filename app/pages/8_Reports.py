@@ -3,7 +3,6 @@ Reports Page - Advanced analytics and KPI reporting
 """
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import sys
@@ -13,7 +12,10 @@ from datetime import datetime, timedelta
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.vtrack import auth
-from src.vtrack.database import MasterProjectsDB
+from src.vtrack.database import (
+    MasterProjectsDB, PROJECT_FRAME_DTYPES, PROJECT_DATE_COLUMNS, KPI_FRAME_DTYPES, KPI_DATE_COLUMNS
+)
+from src.vtrack.settings import settings
 from app.styles import apply_verizon_theme
 from app import sidebar
 
@@ -34,20 +36,14 @@ st.markdown("""
 projects_db = MasterProjectsDB()
 projects_db.connect()
 
-# Get all data
-projects = projects_db.fetchall("""
-    SELECT
-        p.*,
-        u.full_name as pm_name,
-        prog.program_name,
-        pt.type_name as project_type
-    FROM projects p
-    LEFT JOIN users u ON p.pm_id = u.user_id
-    LEFT JOIN programs prog ON p.program_id = prog.program_id
-    LEFT JOIN project_types pt ON p.project_type_id = pt.type_id
-""")
+# Get all data (project_with_pm joins the attached users database)
+df = projects_db.cached_fetch_frame(
+    "SELECT * FROM project_with_pm",
+    dtypes=PROJECT_FRAME_DTYPES,
+    parse_dates=PROJECT_DATE_COLUMNS
+)
 
-kpis = projects_db.fetchall("""
+kpi_df = projects_db.cached_fetch_frame("""
     SELECT
         k.*,
         p.name as project_name,
@@ -55,17 +51,14 @@ kpis = projects_db.fetchall("""
     FROM kpi_snapshots k
     JOIN projects p ON k.project_id = p.project_id
     ORDER BY k.snapshot_date DESC
-""")
+""", dtypes=KPI_FRAME_DTYPES, parse_dates=KPI_DATE_COLUMNS)
 
 projects_db.close()
 
-if not projects:
+if df.empty:
     st.warning("No project data available for reporting.")
     st.stop()
 
-df = pd.DataFrame([dict(p) for p in projects])
-kpi_df = pd.DataFrame([dict(k) for k in kpis]) if kpis else pd.DataFrame()
-
 # === REPORT SELECTOR ===
 st.markdown("### 📊 Select Report")
 
@@ -240,7 +233,6 @@ elif report_type == "KPI Dashboard":
         
         # KPI Trend Over Time
         st.markdown("### KPI Trends")
-        kpi_df['snapshot_date'] = pd.to_datetime(kpi_df['snapshot_date'])
         kpi_df = kpi_df.sort_values('snapshot_date')
         
         if len(kpi_df) > 1:
@@ -253,7 +245,10 @@ elif report_type == "KPI Dashboard":
                 labels={'snapshot_date': 'Date', 'on_time_percent': 'On-Time %'},
                 markers=True
             )
-            fig.add_hline(y=90, line_dash="dash", line_color="green", annotation_text="Target: 90%")
+            green = settings.kpi_threshold_green
+            yellow = settings.kpi_threshold_yellow
+            fig.add_hline(y=green, line_dash="dash", line_color="green", annotation_text=f"Target: {green:g}%")
+            fig.add_hline(y=yellow, line_dash="dot", line_color="orange", annotation_text=f"Warning: {yellow:g}%")
             st.plotly_chart(fig, use_container_width=True)
         
         # Recent KPIs Table
@@ -270,10 +265,7 @@ elif report_type == "Timeline Analysis":
     st.markdown("## 📅 Timeline Analysis")
     st.markdown(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*")
     
-    # Projects with dates
-    df['project_start_date'] = pd.to_datetime(df['project_start_date'], errors='coerce')
-    df['project_complete_date'] = pd.to_datetime(df['project_complete_date'], errors='coerce')
-    
+    # Projects with dates (already datetime64 from the typed fetch)
     has_dates = df[df['project_start_date'].notna() | df['project_complete_date'].notna()]
     
     if len(has_dates) == 0:
@@ -370,6 +362,7 @@ elif report_type == "Program Performance":
         for program in program_summary.index:
             program_data = programs[programs['program_name'] == program]
             status_counts = program_data['status'].value_counts()
+            status_counts = status_counts[status_counts > 0]  # Categorical counts include the other programs' statuses
             
             fig.add_trace(go.Bar(
                 name=program,
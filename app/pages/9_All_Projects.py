@@ -10,7 +10,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.vtrack import auth
-from src.vtrack.database import MasterProjectsDB, MasterUsersDB
+from src.vtrack.database import MasterProjectsDB, PROJECT_FRAME_DTYPES, PROJECT_DATE_COLUMNS
 from app.styles import apply_verizon_theme
 from app import sidebar
 
@@ -31,42 +31,33 @@ st.markdown("""
 projects_db = MasterProjectsDB()
 projects_db.connect()
 
-users_db = MasterUsersDB()
-users_db.connect()
-
 # Get all projects with related data
-projects = projects_db.fetchall("""
+df = projects_db.cached_fetch_frame("""
     SELECT
-        p.project_id,
-        p.name,
-        p.ccr_nfid,
-        p.status,
-        p.phase,
-        p.customer,
-        p.clli,
-        p.site_address,
-        p.current_queue,
-        p.system_type,
-        p.project_start_date,
-        p.project_complete_date,
-        prog.program_name,
-        pt.type_name as project_type,
-        u.full_name as pm_name,
-        p.created_at,
-        p.updated_at
-    FROM projects p
-    LEFT JOIN programs prog ON p.program_id = prog.program_id
-    LEFT JOIN project_types pt ON p.project_type_id = pt.type_id
-    LEFT JOIN users u ON p.pm_id = u.user_id
-    ORDER BY p.updated_at DESC
-""")
+        project_id,
+        name,
+        ccr_nfid,
+        status,
+        phase,
+        customer,
+        clli,
+        site_address,
+        current_queue,
+        system_type,
+        project_start_date,
+        project_complete_date,
+        program_name,
+        project_type,
+        pm_name,
+        created_at,
+        updated_at
+    FROM project_with_pm
+    ORDER BY updated_at DESC
+""", dtypes=PROJECT_FRAME_DTYPES, parse_dates=PROJECT_DATE_COLUMNS)
 
 projects_db.close()
-users_db.close()
 
-# Convert to DataFrame
-if projects:
-    df = pd.DataFrame([dict(p) for p in projects])
+if not df.empty:
 
     # Summary stats
     st.markdown("### 📊 Project Summary")
@@ -231,7 +222,7 @@ if projects:
     with stat_col1:
         st.markdown("**Projects by Status**")
         status_counts = filtered_df['status'].value_counts()
-        st.bar_chart(status_counts)
+        st.bar_chart(status_counts[status_counts > 0])  # Categorical counts include filtered-out statuses
 
     with stat_col2:
         st.markdown("**Projects by Type**")
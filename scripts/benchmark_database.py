@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Database performance benchmarks for Verizon Tracker
+Runs against throwaway databases in a temp directory - never touches G_DRIVE
+"""
+
+import sys
+import sqlite3
+import time
+import random
+import tempfile
+import threading
+import statistics
+import contextlib
+import io
+import os
+import json
+import tracemalloc
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.vtrack import bundles, database, ingest, sync
+from src.vtrack.database import Database, LocalProjectsDB, MASTER_DB_PRAGMAS, connection_pool
+from src.vtrack.records import ProjectRecord
+
+
+def make_db_class(pragmas: dict):
+    """Build a Database subclass carrying the given pragma profile"""
+    return type("BenchmarkDB", (Database,), {"PRAGMAS": pragmas})
+
+
+def seed_projects(db: Database, count: int):
+    """Create a projects table shaped like master and fill it"""
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS projects (
+            project_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            ccr_nfid TEXT UNIQUE NOT NULL,
+            pm_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'Active',
+            notes TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    db.conn.executemany(
+        "INSERT INTO projects (name, ccr_nfid, pm_id, status, notes) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"Project {i}", f"CCR-{i:06d}", random.randint(1, 20),
+             random.choice(['Active', 'On Hold', 'Completed']), "x" * 200)
+            for i in range(count)
+        ]
+    )
+    db.conn.commit()
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def benchmark_reads_under_writer(pragmas: dict, label: str, duration: float = 3.0, rows: int = 20000):
+    """
+    Measure read latency on one thread while another thread commits
+    single-row updates as fast as it can (the inbox-ingest pattern)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_class = make_db_class(pragmas)
+        db_path = str(Path(tmp) / "bench_master.db")
+
+        setup_db = db_class(db_path)
+        setup_db.connect()
+        seed_projects(setup_db, rows)
+        setup_db.close()
+
+        stop = threading.Event()
+        writes = {'count': 0, 'busy': 0}
+
+        def writer():
+            db = db_class(db_path)
+            db.connect()
+            while not stop.is_set():
+                try:
+                    db.execute(
+                        "UPDATE projects SET notes = ?, updated_at = CURRENT_TIMESTAMP WHERE project_id = ?",
+                        (f"edit {writes['count']}", random.randint(1, rows))
+                    )
+                    writes['count'] += 1
+                except Exception:
+                    writes['busy'] += 1
+            db.close()
+
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+
+        reader = db_class(db_path)
+        reader.connect()
+        latencies = []
+        read_errors = 0
+        deadline = time.perf_counter() + duration
+
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                reader.fetchall(
+                    "SELECT status, COUNT(*) as count FROM projects WHERE pm_id = ? GROUP BY status",
+                    (random.randint(1, 20),)
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                read_errors += 1
+
+        stop.set()
+        writer_thread.join()
+        reader.close()
+        connection_pool.close_idle(db_path)
+
+    print(f"\n{label}")
+    print("-" * 60)
+    if latencies:
+        print(f"  Reads completed:   {len(latencies)}")
+        print(f"  Read p50 / p95:    {statistics.median(latencies):.2f} ms / {percentile(latencies, 0.95):.2f} ms")
+        print(f"  Read max:          {max(latencies):.2f} ms")
+    print(f"  Read errors:       {read_errors}")
+    print(f"  Writer commits:    {writes['count']} ({writes['busy']} SQLITE_BUSY)")
+
+
+def run_concurrency_benchmark():
+    """Rollback journal (old default) vs the managed master profile"""
+    print("\n" + "="*60)
+    print("BENCHMARK: Read latency under a concurrent writer")
+    print("="*60)
+
+    benchmark_reads_under_writer({}, "Default pragmas (rollback journal)")
+    benchmark_reads_under_writer(MASTER_DB_PRAGMAS, "Master profile (WAL + tuned pragmas)")
+
+
+def run_batch_write_benchmark(rows: int = 20000):
+    """Per-statement commits vs one transaction vs executemany"""
+    print("\n" + "="*60)
+    print(f"BENCHMARK: Writing {rows} project rows")
+    print("="*60)
+
+    insert = "INSERT INTO projects (name, ccr_nfid, pm_id, status) VALUES (?, ?, ?, ?)"
+    params = [(f"Project {i}", f"CCR-{i:06d}", i % 20, 'Active') for i in range(rows)]
+
+    def per_row(db):
+        for row in params:
+            db.execute(insert, row)
+
+    def one_transaction(db):
+        with db.transaction():
+            for row in params:
+                db.execute(insert, row)
+
+    def batched(db):
+        with db.transaction():
+            db.executemany(insert, params)
+
+    db_class = make_db_class(MASTER_DB_PRAGMAS)
+    for label, writer in [("execute() per row", per_row),
+                          ("transaction() + execute()", one_transaction),
+                          ("transaction() + executemany()", batched)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = db_class(str(Path(tmp) / "bench_write.db"))
+            db.connect()
+            seed_projects(db, 0)
+            start = time.perf_counter()
+            writer(db)
+            elapsed = time.perf_counter() - start
+            db.close()
+            connection_pool.close_idle(db.db_path)
+        print(f"  {label:<32} {elapsed:8.2f} s  ({rows / elapsed:,.0f} rows/s)")
+
+
+def time_call(func, repeat: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def legacy_bootstrap():
+    """The pre-migration bootstrap: fresh connections, every CREATE and default insert"""
+    seeds = [
+        (database.MasterUsersDB, 'create_default_users'),
+        (database.MasterProjectsDB, 'create_default_data'),
+        (database.ConfigDB, 'create_default_config'),
+    ]
+    for db_class, seed in seeds:
+        db = db_class()
+        db.conn = sqlite3.connect(db.db_path)
+        db.conn.row_factory = sqlite3.Row
+        db._schema_v1()
+        getattr(db, seed)()
+        db.conn.close()
+
+
+def run_bootstrap_benchmark(repeat: int = 50):
+    """Per-rerun cost of the old full bootstrap vs the version-stamp check"""
+    print("\n" + "="*60)
+    print("BENCHMARK: Database bootstrap cost per Streamlit rerun")
+    print("="*60)
+
+    original_g_drive = database.G_DRIVE
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the master database classes at a scratch directory
+        database.G_DRIVE = Path(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                database.initialize_all_databases()
+
+                legacy = time_call(legacy_bootstrap, repeat)
+                full = time_call(database.initialize_all_databases, repeat)
+                stamp_check = time_call(database.databases_current, repeat)
+                database.ensure_databases_initialized()
+                guarded = time_call(database.ensure_databases_initialized, repeat)
+        finally:
+            database.G_DRIVE = original_g_drive
+            connection_pool.close_idle()
+
+    print(f"  Previous bootstrap (every rerun)  {legacy:8.3f} ms/rerun")
+    print(f"  initialize_all_databases()        {full:8.3f} ms/rerun")
+    print(f"  databases_current() stamp check   {stamp_check:8.3f} ms (first rerun per process)")
+    print(f"  ensure_databases_initialized()    {guarded:8.4f} ms/rerun")
+
+
+def seed_portfolio(db: Database, count: int):
+    """Fill the real master projects schema with fully populated rows"""
+    database.MasterProjectsDB._schema_v1(db)
+    statuses = ['Active', 'On Hold', 'Completed', 'Cancelled']
+    phases = ['Planning', 'Design', 'Construction', 'Testing', 'Closeout']
+    customers = [f"Customer {i}" for i in range(40)]
+    with db.transaction():
+        db.executemany("""
+            INSERT INTO projects (
+                name, ccr_nfid, program_id, project_type_id, pm_id, status, phase, notes,
+                nfid, customer, clli, rft_date, system_type, current_queue, site_address,
+                project_start_date, project_complete_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (f"Project {i}", f"CCR-{i:06d}", i % 3 + 1, i % 5 + 1, i % 20 + 1,
+             random.choice(statuses), random.choice(phases), f"Notes for project {i}",
+             f"NF{i:07d}", random.choice(customers), f"CLLI{i % 500:04d}", "2025-03-01",
+             random.choice(['DWDM', 'SONET', 'Ethernet']), random.choice(['Design', 'Field', 'QA']),
+             f"{i} Main Street, Springfield", "2025-01-15", "2025-09-30")
+            for i in range(count)
+        ])
+
+
+def measure_retained(load) -> tuple:
+    """Bytes still allocated after load() returns (its result is kept alive) and elapsed seconds"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, elapsed
+
+
+def run_record_memory_benchmark(rows: int = 10000):
+    """Session footprint of a loaded portfolio: dicts vs sqlite3.Row vs ProjectRecord"""
+    print("\n" + "="*60)
+    print(f"BENCHMARK: Memory held by {rows} loaded projects (SELECT * FROM projects)")
+    print("="*60)
+
+    query = "SELECT * FROM projects"
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db_class(MASTER_DB_PRAGMAS)(str(Path(tmp) / "bench_records.db"))
+        db.connect()
+        seed_portfolio(db, rows)
+
+        loaders = [
+            ("[dict(row) for row in fetchall()]", lambda: [dict(row) for row in db.fetchall(query)]),
+            ("fetchall() (sqlite3.Row)", lambda: db.fetchall(query)),
+            ("fetch_records(ProjectRecord)", lambda: db.fetch_records(query, (), ProjectRecord)),
+        ]
+        for label, load in loaders:
+            load()  # Warm the statement cache so it is not counted
+            retained, _ = measure_retained(load)
+            elapsed = min(time_call(load, 1) for _ in range(3))
+            print(f"  {label:<36} {retained / 1024:8,.0f} KiB  "
+                  f"({retained / rows:5.0f} B/project, load {elapsed:6.1f} ms)")
+
+        db.close()
+        connection_pool.close_idle(db.db_path)
+
+
+def seed_local_changes(local_db: LocalProjectsDB, count: int):
+    """Fill a PM's local database with pending projects and one KPI snapshot each"""
+    statuses = ['Active', 'On Hold', 'Completed']
+    with local_db.transaction():
+        local_db.executemany("""
+            INSERT INTO projects (
+                name, ccr_nfid, pm_id, status, phase, notes, customer, clli,
+                system_type, current_queue, site_address, project_start_date
+            ) VALUES (?, ?, 2, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (f"Project {i}", f"CCR-{i:06d}", random.choice(statuses), 'Construction',
+             f"Notes for project {i}", f"Customer {i % 40}", f"CLLI{i % 500:04d}",
+             'DWDM', 'Field', f"{i} Main Street, Springfield", "2025-01-15")
+            for i in range(count)
+        ])
+        local_db.executemany(
+            "INSERT INTO kpi_snapshots (local_project_id, snapshot_date, budget_status, schedule_status, on_time_percent) "
+            "VALUES (?, '2025-01-31', 'On Budget', 'On Schedule', ?)",
+            [(i + 1, random.uniform(50, 100)) for i in range(count)]
+        )
+
+
+def run_bundle_format_benchmark(projects: int = 10000):
+    """Pretty-printed JSON bundles vs streamed, compressed .vtb bundles"""
+    print("\n" + "="*60)
+    print(f"BENCHMARK: Sync bundle with {projects} projects and {projects} KPI snapshots")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local_db = LocalProjectsDB(2)
+        local_db.db_path = str(Path(tmp) / "bench_local.db")
+        local_db.connect()
+        local_db.initialize_schema()
+        seed_local_changes(local_db, projects)
+        rows = projects * 2
+
+        json_path = Path(tmp) / "bundle.json"
+        vtb_path = Path(tmp) / "bundle.vtb"
+
+        def write_json():
+            bundle = sync.create_sync_bundle(local_db, "pm")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(bundle, f, indent=2, default=str)
+
+        def write_vtb():
+            bundles.write_bundle(vtb_path, sync.pending_bundle_events(local_db, "pm"))
+
+        def stream_vtb():
+            for _ in bundles.iter_bundle(vtb_path):
+                pass
+
+        cases = [
+            ("JSON (indent=2)", json_path, write_json, lambda: bundles.load_bundle(json_path), None),
+            (".vtb (gzip frames)", vtb_path, write_vtb, lambda: bundles.load_bundle(vtb_path), stream_vtb),
+        ]
+        for label, path, write, load, stream in cases:
+            write_time = min(time_call(write, 1) for _ in range(3)) / 1000
+            read_time = min(time_call(load, 1) for _ in range(3)) / 1000
+            size = path.stat().st_size
+            print(f"  {label:<20} {size / (1024 * 1024):7.2f} MiB  "
+                  f"write {write_time:5.2f} s ({rows / write_time:9,.0f} rows/s)  "
+                  f"read {read_time:5.2f} s ({rows / read_time:9,.0f} rows/s)")
+            if stream:
+                stream_time = min(time_call(stream, 1) for _ in range(3)) / 1000
+                print(f"  {'':<20} {'':>11}  stream-read {stream_time:5.2f} s ({rows / stream_time:9,.0f} rows/s)")
+
+        local_db.close()
+        connection_pool.close_idle(local_db.db_path)
+
+
+def measure_peak(func) -> tuple:
+    """Peak bytes allocated while func() runs, and elapsed seconds"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def run_streaming_ingest_benchmark(projects: int = 200, sizes=(20000, 100000)):
+    """Peak memory of ingesting one bundle: json.load + apply vs streaming JSON vs streaming .vtb"""
+    print("\n" + "="*60)
+    print("BENCHMARK: Peak memory ingesting one bundle (KPI snapshots per bundle)")
+    print("="*60)
+
+    master_class = type("BenchMasterDB", (Database,), {
+        "PRAGMAS": MASTER_DB_PRAGMAS, "MIGRATIONS": database.MasterProjectsDB.MIGRATIONS
+    })
+
+    for kpis in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            bundle = {
+                'username': 'pm', 'user_id': 2,
+                'projects': [{'local_id': i + 1, 'name': f"Project {i}", 'ccr_nfid': f"CCR-{i:06d}",
+                              'pm_id': 2, 'status': 'Active', 'notes': f"Notes for project {i}"}
+                             for i in range(projects)],
+                'kpi_snapshots': [{'local_snapshot_id': i, 'local_project_id': i % projects + 1,
+                                   'snapshot_date': "2025-01-31", 'budget_status': 'On Budget',
+                                   'schedule_status': 'On Schedule', 'on_time_percent': random.uniform(50, 100),
+                                   'notes': f"Weekly snapshot {i}"}
+                                  for i in range(kpis)],
+            }
+            json_path = Path(tmp) / "bundle.json"
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(bundle, f, indent=2)
+            vtb_path = Path(tmp) / "bundle.vtb"
+            bundles.write_bundle(vtb_path, bundles.bundle_events(bundle))
+            del bundle
+
+            def load_then_apply(db):
+                ingest.apply_bundle(db, bundles.load_bundle(json_path))
+
+            def stream(path):
+                def run(db):
+                    context = ingest.bundle_context(bundles.iter_records(path, tables=ingest.PROJECT_TABLES))
+                    ingest.apply_records(db, bundles.iter_records(path), context)
+                return run
+
+            print(f"\n  {kpis:,} KPI snapshots ({json_path.stat().st_size / (1024 * 1024):.1f} MiB JSON, "
+                  f"{vtb_path.stat().st_size / (1024 * 1024):.1f} MiB .vtb)")
+            for label, run in [("json.load + apply", load_then_apply),
+                               ("streaming JSON", stream(json_path)),
+                               ("streaming .vtb", stream(vtb_path))]:
+                db = master_class(str(Path(tmp) / f"bench_ingest_{label.split()[0]}.db"))
+                db.connect()
+                db.migrate()
+                peak, _ = measure_peak(lambda: run(db))
+                db.execute("DELETE FROM kpi_snapshots")
+                elapsed = min(time_call(lambda: run(db), 1) for _ in range(2)) / 1000
+                db.close()
+                connection_pool.close_idle(db.db_path)
+                print(f"    {label:<20} peak {peak / (1024 * 1024):7.2f} MiB  "
+                      f"{elapsed:5.2f} s ({kpis / elapsed:9,.0f} KPIs/s)")
+
+
+def run_parallel_ingest_benchmark(files: int = 48, kpis_per_file: int = 2000, worker_counts=(1, 4, 8)):
+    """Inbox throughput with 1, 4 and 8 decoding processes feeding the single master writer"""
+    print("\n" + "="*60)
+    print(f"BENCHMARK: Processing {files} bundles x {kpis_per_file} KPI snapshots "
+          f"({os.cpu_count()} CPUs available)")
+    print("="*60)
+
+    original_g_drive = database.G_DRIVE
+    with tempfile.TemporaryDirectory() as tmp:
+        database.G_DRIVE = Path(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                database.initialize_all_databases()
+
+            for workers in worker_counts:
+                inbox_dir = Path(tmp) / f"inbox_{workers}"
+                inbox_dir.mkdir()
+                for n in range(files):
+                    projects = [{'local_id': i + 1, 'name': f"Project {n}-{i}", 'ccr_nfid': f"CCR-{n:03d}-{i:03d}",
+                                 'pm_id': 2, 'status': 'Active'} for i in range(20)]
+                    kpis = [{'local_snapshot_id': i, 'local_project_id': i % 20 + 1, 'snapshot_date': "2025-01-31",
+                             'on_time_percent': random.uniform(50, 100), 'notes': f"Snapshot {i}"}
+                            for i in range(kpis_per_file)]
+                    bundles.write_bundle(inbox_dir / f"sync_pm{n:03d}_{workers}.vtb", bundles.bundle_events({
+                        'username': f"pm{n}", 'user_id': n + 100, 'projects': projects, 'kpi_snapshots': kpis
+                    }))
+
+                totals = ingest.ingest_inbox(inbox_dir, Path(tmp) / "archive", workers=workers)
+                elapsed = totals['duration']
+                print(f"  {workers} worker{'s' if workers > 1 else ' '}  {elapsed:6.2f} s  "
+                      f"{totals['files_processed'] / elapsed:6.1f} files/s  "
+                      f"{totals['kpis_applied'] / elapsed:9,.0f} KPIs/s")
+        finally:
+            database.G_DRIVE = original_g_drive
+            connection_pool.close_idle()
+
+
+if __name__ == "__main__":
+    run_concurrency_benchmark()
+    run_batch_write_benchmark()
+    run_bootstrap_benchmark()
+    run_record_memory_benchmark()
+    run_bundle_format_benchmark()
+    run_streaming_ingest_benchmark()
+    run_parallel_ingest_benchmark()
@@ -69,8 +69,11 @@ def generate_sample_projects(count=50):
     types = projects_db.fetchall("SELECT type_id FROM project_types")
     type_ids = [t['type_id'] for t in types] if types else [None]
     
+    # Existing CCR/NFIDs in one query instead of a lookup per generated row
+    existing_ids = {p['ccr_nfid'] for p in projects_db.fetchall("SELECT ccr_nfid FROM projects")}
+    
     # Generate projects
-    created = 0
+    rows = []
     skipped = 0
     
     for i in range(count):
@@ -78,14 +81,10 @@ def generate_sample_projects(count=50):
         ccr_nfid = f"CCR-{random.randint(10000, 99999)}"
         
         # Check if exists
-        existing = projects_db.fetchone(
-            "SELECT project_id FROM projects WHERE ccr_nfid = ?",
-            (ccr_nfid,)
-        )
-        
-        if existing:
+        if ccr_nfid in existing_ids:
             skipped += 1
             continue
+        existing_ids.add(ccr_nfid)
         
         # Random project data
         name = random.choice(PROJECT_NAMES) + f" - {random.randint(1, 999)}"
@@ -116,29 +115,34 @@ def generate_sample_projects(count=50):
         else:
             complete_date = None
         
-        try:
-            projects_db.execute("""
+        rows.append((
+            name, ccr_nfid,
+            random.choice(program_ids) if program_ids else None,
+            random.choice(type_ids) if type_ids else None,
+            random.choice(user_ids),
+            status, phase,
+            f"Sample project {i+1} for testing purposes",
+            customer, clli, site_address, system_type, current_queue,
+            start_date.strftime('%Y-%m-%d'),
+            complete_date.strftime('%Y-%m-%d') if complete_date else None
+        ))
+    
+    # Insert the whole batch with one commit
+    created = 0
+    try:
+        with projects_db.transaction():
+            projects_db.executemany("""
                 INSERT INTO projects (
                     name, ccr_nfid, program_id, project_type_id, pm_id,
                     status, phase, notes, customer, clli, site_address,
                     system_type, current_queue, project_start_date, project_complete_date
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                name, ccr_nfid,
-                random.choice(program_ids) if program_ids else None,
-                random.choice(type_ids) if type_ids else None,
-                random.choice(user_ids),
-                status, phase,
-                f"Sample project {i+1} for testing purposes",
-                customer, clli, site_address, system_type, current_queue,
-                start_date.strftime('%Y-%m-%d'),
-                complete_date.strftime('%Y-%m-%d') if complete_date else None
-            ))
-            created += 1
-            
-        except Exception as e:
-            print(f"Error creating project {i+1}: {e}")
-            skipped += 1
+            """, rows)
+        created = len(rows)
+        
+    except Exception as e:
+        print(f"Error creating projects: {e}")
+        skipped += len(rows)
     
     projects_db.close()
     users_db.close()
@@ -166,7 +170,7 @@ def generate_sample_kpis():
     budget_statuses = ["On Budget", "Over Budget", "Under Budget"]
     schedule_statuses = ["On Schedule", "Behind Schedule", "Ahead of Schedule"]
     
-    created = 0
+    rows = []
     
     # Create 1-3 KPI snapshots per project
     for project in projects:
@@ -176,24 +180,28 @@ def generate_sample_kpis():
             snapshot_date = datetime.now() - timedelta(days=random.randint(1, 90))
             on_time_percent = random.randint(70, 100)
             
-            try:
-                projects_db.execute("""
-                    INSERT INTO kpi_snapshots (
-                        project_id, snapshot_date, budget_status, schedule_status,
-                        on_time_percent, notes
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    project['project_id'],
-                    snapshot_date.strftime('%Y-%m-%d'),
-                    random.choice(budget_statuses),
-                    random.choice(schedule_statuses),
-                    on_time_percent,
-                    f"KPI snapshot {i+1}"
-                ))
-                created += 1
-                
-            except Exception as e:
-                print(f"Error creating KPI: {e}")
+            rows.append((
+                project['project_id'],
+                snapshot_date.strftime('%Y-%m-%d'),
+                random.choice(budget_statuses),
+                random.choice(schedule_statuses),
+                on_time_percent,
+                f"KPI snapshot {i+1}"
+            ))
+    
+    created = 0
+    try:
+        with projects_db.transaction():
+            projects_db.executemany("""
+                INSERT INTO kpi_snapshots (
+                    project_id, snapshot_date, budget_status, schedule_status,
+                    on_time_percent, notes
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+        created = len(rows)
+        
+    except Exception as e:
+        print(f"Error creating KPIs: {e}")
     
     projects_db.close()
     
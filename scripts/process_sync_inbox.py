@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Process the sync inbox without the Streamlit UI
+Applies every pending bundle to master and archives it (for cron / scheduled tasks)
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.vtrack import ingest
+from src.vtrack.database import ensure_databases_initialized
+
+
+def print_progress(done: int, total: int, file_stats: dict):
+    if file_stats['deferred']:
+        print(f"  ⏳ [{done}/{total}] {file_stats['file']}: waiting for an earlier part, left in the inbox")
+        return
+    if file_stats['duplicate']:
+        print(f"  ⏭️  [{done}/{total}] {file_stats['file']}: already applied, archived without changes")
+        return
+    status = "✅" if file_stats['success'] else "❌"
+    print(f"  {status} [{done}/{total}] {file_stats['file']}: "
+          f"{file_stats['projects_inserted']} new, {file_stats['projects_updated']} updated, "
+          f"{file_stats['projects_skipped']} skipped; {file_stats['kpis_applied']} KPIs, "
+          f"{file_stats['dependencies_applied']} dependencies, {file_stats['contacts_applied']} contacts "
+          f"({file_stats['duration']:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending sync bundles to master")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="bundle decoding processes (default: ingest_workers setting, capped at the CPU count)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("Verizon Tracker - Sync Inbox Processor")
+    print("="*60 + "\n")
+
+    ensure_databases_initialized()
+    workers = args.workers or ingest.default_ingest_workers()
+    totals = ingest.ingest_inbox(progress=print_progress, workers=workers)
+
+    for error in totals['errors']:
+        print(f"  ⚠️  {error}")
+
+    print("\n" + "="*60)
+    print(f"Processed {totals['files_processed']} of {totals['files']} files "
+          f"({totals['projects_inserted']} new, {totals['projects_updated']} updated, "
+          f"{totals['kpis_applied']} KPIs, {totals['dependencies_applied']} dependencies, "
+          f"{totals['contacts_applied']} contacts) in {totals['duration']:.2f}s")
+    if totals['files_deferred']:
+        print(f"Deferred {totals['files_deferred']} bundle parts until their earlier parts are applied")
+    if totals['files_duplicate']:
+        print(f"Skipped {totals['files_duplicate']} already-applied duplicate files")
+    print("="*60 + "\n")
+
+    sys.exit(1 if totals['files_failed'] else 0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Rebuild master_projects.db by replaying the sync archive
+Starts from a backup (or an empty master) and re-applies every archived bundle after it
+"""
+
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.vtrack import ingest, replay
+from src.vtrack.backup import BACKUP_DIR, BackupManager
+from src.vtrack.database import G_DRIVE
+
+
+def print_progress(done: int, total: int, bundle_stats: dict):
+    if bundle_stats['duplicate']:
+        print(f"  ⏭️  [{done}/{total}] {bundle_stats['file']}: already in the base, skipped")
+        return
+    status = "✅" if bundle_stats['success'] else "❌"
+    print(f"  {status} [{done}/{total}] {bundle_stats['file']}: "
+          f"{bundle_stats['projects_inserted']} new, {bundle_stats['projects_updated']} updated; "
+          f"{bundle_stats['kpis_applied']} KPIs ({bundle_stats['duration']:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild master from a backup plus the archived sync bundles")
+    base_group = parser.add_mutually_exclusive_group()
+    base_group.add_argument("--backup", help="backup folder name to start from (see the Backup page)")
+    base_group.add_argument("--base", type=Path, help="master_projects.db snapshot to start from")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="database to create (default: a timestamped file next to master)")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="archived file name or content hash to leave out (repeatable)")
+    parser.add_argument("--scan", action="store_true",
+                        help="find bundles by reading the archive packs instead of master's archive index")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="bundle decoding processes (default: ingest_workers setting, capped at the CPU count)")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("Verizon Tracker - Master Rebuild")
+    print("="*60 + "\n")
+
+    base, since = args.base, None
+    if args.backup:
+        backup = next((b for b in BackupManager.list_backups() if b['backup_folder_name'] == args.backup), None)
+        base = BACKUP_DIR / args.backup / "master" / "master_projects.db"
+        if backup is None or not base.exists():
+            print(f"❌ Backup {args.backup} has no master_projects.db")
+            sys.exit(1)
+        since = datetime.strptime(backup['created_at'], '%Y-%m-%d %H:%M:%S').timestamp()
+
+    output = args.output or G_DRIVE / f"master_projects_rebuilt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    workers = args.workers or ingest.default_ingest_workers()
+    print(f"Base: {base or 'empty master'}")
+    print(f"Output: {output}\n")
+
+    totals = replay.rebuild_master(output, base, None if args.scan else replay.MASTER_DB_PATH,
+                                   workers=workers, exclude=set(args.exclude), since=since,
+                                   progress=print_progress)
+
+    for error in totals['errors']:
+        print(f"  ⚠️  {error}")
+
+    print("\n" + "="*60)
+    print(f"Replayed {totals['bundles_applied']} of {totals['bundles']} bundles "
+          f"({totals['archived']} archived, found via {totals['source']}, {totals['bundles_excluded']} excluded) "
+          f"in {totals['duration']:.2f}s - {totals['bundles_per_sec']:.1f} bundles/sec with {workers} workers")
+    print(f"{totals['projects_inserted']} new, {totals['projects_updated']} updated projects; "
+          f"{totals['kpis_applied']} KPIs, {totals['dependencies_applied']} dependencies, "
+          f"{totals['contacts_applied']} contacts")
+    print(f"Stop the app and the inbox daemon, then replace {G_DRIVE / 'master_projects.db'} with {output}")
+    print("="*60 + "\n")
+
+    sys.exit(1 if totals['bundles_failed'] else 0)
@@ -4,7 +4,16 @@ Comprehensive test suite for Verizon Tracker
 Tests all major functionality
 """
 
+import os
 import sys
+import gzip
+import json
+import time
+import shutil
+import sqlite3
+import tempfile
+import subprocess
+import threading
 from pathlib import Path
 
 # Add project root to path
@@ -12,9 +21,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.vtrack.database import (
     MasterUsersDB, MasterProjectsDB, LocalProjectsDB, ConfigDB,
-    initialize_all_databases
+    Database, initialize_all_databases, ensure_databases_initialized, reset_bootstrap,
+    connection_pool, query_cache,
+    PROJECT_FRAME_DTYPES, PROJECT_DATE_COLUMNS
 )
-from src.vtrack import auth, sync
+from src.vtrack import archive, auth, sync, ingest, inbox, bundles, inbox_daemon, replay
+from src.vtrack.backup import BACKUP_DIR, BackupManager, copy_database
+from src.vtrack.records import KpiSnapshotRecord, ProjectRecord
+from src.vtrack.settings import SettingsCache, settings
 
 def test_database_initialization():
     """Test 1: Database Initialization"""
@@ -25,6 +39,21 @@ def test_database_initialization():
     try:
         initialize_all_databases()
         print("✅ Databases initialized successfully")
+
+        # A fresh install has no database files at all yet
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copytree(Path(__file__).parent.parent / "src", Path(tmp) / "src",
+                            ignore=shutil.ignore_patterns("__pycache__"))
+            result = subprocess.run([sys.executable, "-c", (
+                "from src.vtrack.database import MasterProjectsDB, ensure_databases_initialized\n"
+                "ensure_databases_initialized()\n"
+                "db = MasterProjectsDB(); db.connect()\n"
+                "print(db.fetchone('SELECT COUNT(*) FROM project_with_pm')[0])"
+            )], cwd=tmp, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"❌ Bootstrap on an empty data directory failed: {result.stderr.strip().splitlines()[-1:]}")
+                return False
+        print("✅ Databases bootstrap from an empty data directory")
         return True
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
@@ -221,6 +250,1570 @@ def test_user_management():
         return False
 
 
+def test_connection_pool():
+    """Test 8: Connection Pool"""
+    print("\n" + "="*60)
+    print("TEST 8: Connection Pool")
+    print("="*60)
+
+    try:
+        # Prime the pool, then reconnect - the handle must be reused
+        projects_db = MasterProjectsDB()
+        first = projects_db.connect()
+        projects_db.close()
+
+        before = connection_pool.stats()
+        projects_db = MasterProjectsDB()
+        second = projects_db.connect()
+        projects_db.fetchone("SELECT COUNT(*) as count FROM projects")
+
+        # A second checkout on the same thread must not share the busy handle
+        other_db = MasterProjectsDB()
+        third = other_db.connect()
+        other_db.close()
+        projects_db.close()
+        after = connection_pool.stats()
+
+        if second is not first:
+            print("❌ Pooled connection was not reused")
+            return False
+        if third is second:
+            print("❌ In-use connection was handed out twice")
+            return False
+        if after['hits'] <= before['hits']:
+            print("❌ Pool hit counter did not increase")
+            return False
+        print(f"✅ Pool reuse working: {after['hits']} hits, {after['misses']} misses, "
+              f"{after['open_handles']} open handles")
+
+        # Reaping with a zero timeout closes every idle handle
+        connection_pool.reap_idle(max_idle_seconds=0)
+        if connection_pool.stats()['idle'] != 0:
+            print("❌ Idle connections were not reaped")
+            return False
+        print("✅ Idle connections reaped")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Connection pool test failed: {e}")
+        return False
+
+
+def test_batch_transactions():
+    """Test 9: Batch Transactions"""
+    print("\n" + "="*60)
+    print("TEST 9: Batch Transactions")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(str(Path(tmp) / "txn_test.db"))
+            db.connect()
+            db.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+
+            # executemany inside a transaction commits once at the end
+            with db.transaction():
+                db.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(500)])
+            count = db.fetchone("SELECT COUNT(*) as count FROM items")['count']
+            if count != 500:
+                print(f"❌ Expected 500 rows after batch insert, found {count}")
+                return False
+            print("✅ executemany batch committed 500 rows")
+
+            # A failure rolls back the whole block
+            try:
+                with db.transaction():
+                    db.execute("INSERT INTO items (name) VALUES ('rolled back')")
+                    db.execute("INSERT INTO items (name) VALUES ('item 0')")  # UNIQUE violation
+            except Exception:
+                pass
+            if db.fetchone("SELECT COUNT(*) as count FROM items WHERE name = 'rolled back'")['count'] != 0:
+                print("❌ Failed transaction was not rolled back")
+                return False
+            print("✅ Failed transaction rolled back")
+
+            # A failing nested block only undoes itself
+            with db.transaction():
+                db.execute("INSERT INTO items (name) VALUES ('outer')")
+                try:
+                    with db.transaction():
+                        db.execute("INSERT INTO items (name) VALUES ('inner')")
+                        raise ValueError("abort inner")
+                except ValueError:
+                    pass
+            names = {r['name'] for r in db.fetchall("SELECT name FROM items WHERE name IN ('outer', 'inner')")}
+            if names != {'outer'}:
+                print(f"❌ Nested savepoint handling wrong: {names}")
+                return False
+            print("✅ Nested transaction rolled back to savepoint")
+
+            db.close()
+            connection_pool.close_idle(str(Path(tmp) / "txn_test.db"))
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Batch transaction test failed: {e}")
+        return False
+
+
+def test_schema_migrations():
+    """Test 10: Schema Migrations"""
+    print("\n" + "="*60)
+    print("TEST 10: Schema Migrations")
+    print("="*60)
+
+    try:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+
+        version = projects_db.schema_version()
+        latest = MasterProjectsDB.latest_schema_version()
+        if version != latest:
+            print(f"❌ Master schema at version {version}, expected {latest}")
+            return False
+        print(f"✅ Master projects schema at version {version}")
+
+        # Re-running is a no-op once the database is current
+        if projects_db.migrate():
+            print("❌ Migrations re-applied on a current database")
+            return False
+        print("✅ Migrations are applied only once")
+
+        # Two processes starting together both see the old version; the second must not re-apply it
+        with tempfile.TemporaryDirectory() as tmp:
+            race_class = type("RaceDB", (Database,), {"MIGRATIONS": [
+                (1, "Slow table", lambda db: (time.sleep(0.3), db.execute("CREATE TABLE race (id INTEGER)"))),
+                (2, "Added column", ["ALTER TABLE race ADD COLUMN note TEXT"]),
+            ]})
+            path = str(Path(tmp) / "race.db")
+            outcomes = []
+
+            def migrate_once():
+                db = race_class(path)
+                db.connect()
+                try:
+                    outcomes.append(db.migrate())
+                except Exception as e:
+                    outcomes.append(e)
+                finally:
+                    db.close()
+                    connection_pool.close_idle(path)
+
+            threads = [threading.Thread(target=migrate_once) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if sorted(map(str, outcomes)) != ['[1, 2]', '[]']:
+                print(f"❌ Concurrent migrate() re-applied migrations: {outcomes}")
+                return False
+        print("✅ Concurrent migrate() runs apply each migration once")
+
+        # A restored backup that predates the current schema is migrated by the running process
+        backup_folder = BACKUP_DIR / f"test_restore_{int(time.time() * 1000)}"
+        (backup_folder / "local").mkdir(parents=True)
+        old_local = type("OldLocalDB", (LocalProjectsDB,), {"MIGRATIONS": LocalProjectsDB.MIGRATIONS[:1]})(9999)
+        old_local.db_path = str(backup_folder / "local" / "my_projects_9999.db")
+        old_local.connect()
+        old_local.migrate()
+        old_local.close()
+        connection_pool.close_idle(old_local.db_path)
+        restored = LocalProjectsDB(9999)
+        try:
+            ok, message = BackupManager.restore_backup(backup_folder.name, restore_local=True)
+            restored.connect()
+            version = restored.schema_version()
+            restored.close()
+        finally:
+            connection_pool.close_idle(restored.db_path)
+            shutil.rmtree(backup_folder, ignore_errors=True)
+            for leftover in Path(restored.db_path).parent.glob("my_projects_9999.db*"):
+                leftover.unlink()
+        if not ok or version != LocalProjectsDB.latest_schema_version():
+            print(f"❌ Restored local database left at version {version}: {message}")
+            return False
+        reset_bootstrap()
+        if not ensure_databases_initialized() or ensure_databases_initialized():
+            print("❌ reset_bootstrap() did not make the next call re-check the schema")
+            return False
+        print("✅ Restore migrates restored databases and re-arms the bootstrap check")
+
+        # Dashboard filters should use the hot-path indexes
+        plan = projects_db.fetchall(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM projects WHERE pm_id = ? AND status = 'Active'",
+            (2,)
+        )
+        plan_text = " ".join(row['detail'] for row in plan)
+        if "idx_projects_pm_status" not in plan_text:
+            print(f"❌ PM/status filter not using index: {plan_text}")
+            return False
+        print("✅ PM/status filter uses idx_projects_pm_status")
+
+        projects_db.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Schema migration test failed: {e}")
+        return False
+
+
+def test_cross_database_views():
+    """Test 11: Cross-Database Views"""
+    print("\n" + "="*60)
+    print("TEST 11: Cross-Database Views")
+    print("="*60)
+
+    try:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+
+        # Users are reachable through the attached schema
+        users = projects_db.fetchone("SELECT COUNT(*) as count FROM users_db.users")
+        print(f"✅ Attached users database: {users['count']} users")
+
+        projects = projects_db.fetchall("SELECT * FROM project_with_pm")
+        missing = [p['ccr_nfid'] for p in projects if p['pm_name'] is None]
+        if missing:
+            print(f"❌ {len(missing)} projects missing PM name in project_with_pm")
+            return False
+        print(f"✅ project_with_pm joined {len(projects)} projects to their PMs")
+
+        activities = projects_db.fetchall("SELECT user_name FROM activity_with_user LIMIT 5")
+        print(f"✅ activity_with_user returned {len(activities)} rows")
+
+        # Attachments are read-only, so master's write lock never covers them
+        try:
+            projects_db.execute("UPDATE users_db.users SET active = active")
+            print("❌ Attached users database accepted a write through master")
+            return False
+        except sqlite3.OperationalError:
+            projects_db.conn.rollback()
+
+        config_db = ConfigDB()
+        config_db.connect()
+        original = config_db.get_config("test_key")
+        with projects_db.transaction():
+            projects_db.fetchone("SELECT COUNT(*) as count FROM users_db.users")
+            config_db.set_config("test_key", "written during a master transaction")
+        if original is not None:
+            config_db.set_config("test_key", original)
+        config_db.close()
+        print("✅ Users and config stay writable while master holds its write lock")
+
+        projects_db.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Cross-database view test failed: {e}")
+        return False
+
+
+def test_typed_frames():
+    """Test 12: Typed DataFrame Fetch"""
+    print("\n" + "="*60)
+    print("TEST 12: Typed DataFrame Fetch")
+    print("="*60)
+
+    try:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+
+        df = projects_db.fetch_frame(
+            "SELECT * FROM project_with_pm",
+            dtypes=PROJECT_FRAME_DTYPES,
+            parse_dates=PROJECT_DATE_COLUMNS,
+            chunk_size=7
+        )
+        count = projects_db.fetchone("SELECT COUNT(*) as count FROM projects")['count']
+        if len(df) != count:
+            print(f"❌ fetch_frame returned {len(df)} rows, expected {count}")
+            return False
+        print(f"✅ fetch_frame returned {len(df)} rows across chunks")
+
+        if str(df['status'].dtype) != 'category' or not str(df['updated_at'].dtype).startswith('datetime64'):
+            print(f"❌ Unexpected dtypes: status={df['status'].dtype}, updated_at={df['updated_at'].dtype}")
+            return False
+        print("✅ status is categorical and updated_at is datetime64")
+
+        empty = projects_db.fetch_frame(
+            "SELECT * FROM project_with_pm WHERE 1 = 0",
+            dtypes=PROJECT_FRAME_DTYPES,
+            parse_dates=PROJECT_DATE_COLUMNS
+        )
+        if not empty.empty or 'status' not in empty.columns:
+            print("❌ Empty result lost its columns")
+            return False
+        print("✅ Empty result keeps typed columns")
+
+        projects_db.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Typed frame test failed: {e}")
+        return False
+
+
+def test_record_types():
+    """Test 13: Compact Record Types"""
+    print("\n" + "="*60)
+    print("TEST 13: Compact Record Types")
+    print("="*60)
+
+    try:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+
+        rows = projects_db.fetchall("SELECT *, 'master' as source FROM projects ORDER BY project_id LIMIT 5")
+        records = projects_db.fetch_records(
+            "SELECT *, 'master' as source FROM projects ORDER BY project_id LIMIT 5", (), ProjectRecord
+        )
+        projects_db.close()
+
+        if [dict(r) for r in rows] != [dict(r) for r in records]:
+            print("❌ ProjectRecord contents differ from sqlite3.Row")
+            return False
+        print(f"✅ {len(records)} ProjectRecords match their dict equivalents")
+
+        if records:
+            record = records[0]
+            if hasattr(record, '__dict__') or record.get('pm_name', 'N/A') != 'N/A':
+                print("❌ ProjectRecord carries a __dict__ or reports unselected columns")
+                return False
+            try:
+                record.name = "changed"
+                print("❌ ProjectRecord accepted an assignment")
+                return False
+            except AttributeError:
+                print("✅ Records are slotted and read-only")
+
+        # Every master column has a slot, so plain SELECT * rows need no overflow dict
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+        plain = projects_db.fetch_records("SELECT * FROM projects LIMIT 5", (), ProjectRecord)
+        kpis = projects_db.fetch_records("SELECT * FROM kpi_snapshots LIMIT 5", (), KpiSnapshotRecord)
+        projects_db.close()
+        if any(record._extra is not None for record in plain + kpis):
+            print(f"❌ Master columns spilled into _extra: {[record._extra for record in plain + kpis]}")
+            return False
+        print("✅ Master project and KPI rows fit their slots")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Record type test failed: {e}")
+        return False
+
+
+def test_query_cache():
+    """Test 14: Shared Query Cache"""
+    print("\n" + "="*60)
+    print("TEST 14: Shared Query Cache")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "cache_test.db")
+            db = Database(db_path)
+            db.connect()
+            db.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT)")
+            db.execute("INSERT INTO items (name) VALUES ('first')")
+
+            query = "SELECT COUNT(*) as count FROM items"
+            before = query_cache.stats()
+            db.cached_fetchall(query)
+            rows = db.cached_fetchall(query)
+            after = query_cache.stats()
+            if after['hits'] - before['hits'] != 1 or rows[0]['count'] != 1:
+                print("❌ Repeated query was not served from the cache")
+                return False
+            print("✅ Repeated query served from the cache")
+
+            # A commit from another connection must invalidate the entry
+            writer = sqlite3.connect(db_path)
+            writer.execute("INSERT INTO items (name) VALUES ('second')")
+            writer.commit()
+            writer.close()
+
+            rows = db.cached_fetchall(query)
+            if rows[0]['count'] != 2:
+                print(f"❌ Stale cached result after external write: {rows[0]['count']}")
+                return False
+            print("✅ External commit invalidated the cached result")
+
+            db.close()
+            connection_pool.close_idle(db_path)
+            query_cache.clear()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Query cache test failed: {e}")
+        return False
+
+
+def test_cached_settings():
+    """Test 15: Cached Settings"""
+    print("\n" + "="*60)
+    print("TEST 15: Cached Settings")
+    print("="*60)
+
+    try:
+        config_db = ConfigDB()
+        config_db.connect()
+        original = config_db.get_config("kpi_threshold_yellow")
+
+        green = settings.kpi_threshold_green
+        loads = settings.loads
+        for _ in range(100):
+            settings.kpi_threshold_green
+        if settings.loads != loads or not isinstance(green, float):
+            print("❌ Repeated reads reloaded config.db or returned an untyped value")
+            return False
+        print(f"✅ kpi_threshold_green = {green} served from the snapshot")
+
+        # Writes through ConfigDB refresh the snapshot
+        config_db.set_config("kpi_threshold_yellow", "65")
+        if settings.kpi_threshold_yellow != 65.0:
+            print(f"❌ Snapshot not refreshed after set_config: {settings.kpi_threshold_yellow}")
+            return False
+        print("✅ set_config refreshed the cached value")
+
+        # Unparseable values fall back to the declared default
+        config_db.set_config("kpi_threshold_yellow", "not a number")
+        if settings.kpi_threshold_yellow != 70.0:
+            print("❌ Invalid setting did not fall back to its default")
+            return False
+        print("✅ Invalid value falls back to the default")
+
+        # Writes from another process never call invalidate(); data_version catches them
+        other = sqlite3.connect(config_db.db_path)
+        other.execute("UPDATE config_settings SET setting_value = '55' WHERE setting_key = 'kpi_threshold_yellow'")
+        other.commit()
+        other.close()
+        if settings.kpi_threshold_yellow != 55.0:
+            print(f"❌ Write from another connection not seen: {settings.kpi_threshold_yellow}")
+            return False
+        print("✅ Write from another process picked up through data_version")
+
+        # A failed load serves defaults but is retried on the next read
+        attempts = []
+
+        def flaky_loader():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("unable to open database file")
+            return {'ingest_workers': '2'}
+
+        flaky = SettingsCache(flaky_loader, version=lambda: 0)
+        if (flaky.ingest_workers, flaky.ingest_workers) != (4, 2):
+            print("❌ Failed settings load was cached")
+            return False
+        print("✅ Failed load not cached")
+
+        config_db.set_config("kpi_threshold_yellow", original)
+        config_db.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ Cached settings test failed: {e}")
+        return False
+
+
+def test_change_log_sync():
+    """Test 16: Change Log Sync"""
+    print("\n" + "="*60)
+    print("TEST 16: Change Log Sync")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            local_db = LocalProjectsDB(2)
+            local_db.db_path = str(Path(tmp) / "my_projects_test.db")
+            local_db.connect()
+            local_db.initialize_schema()
+
+            local_db.execute(
+                "INSERT INTO projects (name, ccr_nfid, pm_id) VALUES (?, ?, ?)",
+                ("Change Log Project", "CCR-LOG-001", 2)
+            )
+            bundle = sync.create_sync_bundle(local_db, "pm_test")
+            if len(bundle['projects']) != 1 or bundle['change_seq'] < 1:
+                print(f"❌ Bundle did not pick up the logged insert: {bundle}")
+                return False
+            print(f"✅ Bundle built from change log through seq {bundle['change_seq']}")
+
+            # An edit made while the bundle is in flight must stay pending
+            local_db.execute("UPDATE projects SET status = 'On Hold' WHERE ccr_nfid = 'CCR-LOG-001'")
+            sync.mark_items_as_synced(local_db, bundle['change_seq'])
+
+            pending = local_db.fetchall("SELECT * FROM pending_changes")
+            if len(pending) != 1 or pending[0]['sync_status'] != 'updated':
+                print(f"❌ Mid-sync edit was lost: {[dict(p) for p in pending]}")
+                return False
+            print("✅ Mid-sync edit stays pending after acknowledgement")
+
+            sync.mark_items_as_synced(local_db)
+            if sum(sync.get_pending_sync_counts(local_db).values()) != 0:
+                print("❌ Pending changes remain after full acknowledgement")
+                return False
+            print("✅ Watermark acknowledgement clears pending changes")
+
+            local_db.close()
+            connection_pool.close_idle(local_db.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Change log sync test failed: {e}")
+        return False
+
+
+def test_inbox_ingest():
+    """Test 17: Inbox Ingest"""
+    print("\n" + "="*60)
+    print("TEST 17: Inbox Ingest")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("IngestMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "ingest_master.db"))
+            master.connect()
+            master.migrate()
+
+            inbox = Path(tmp) / "inbox"
+            archive = Path(tmp) / "archive"
+            inbox.mkdir()
+
+            def project(ccr_nfid, name, status='Active'):
+                return {'name': name, 'ccr_nfid': ccr_nfid, 'pm_id': 2, 'status': status}
+
+            first = inbox / "sync_pm_1.json"
+            first.write_text(json.dumps({'username': 'pm', 'projects': [
+                project('CCR-ING-1', 'Ingest One'), project('CCR-ING-2', 'Ingest Two')
+            ]}))
+            stats = ingest.ingest_file(master, first, archive)
+            archived = master.fetchone("SELECT pack_file FROM sync_archive_index WHERE file_name = ?", (first.name,))
+            if not stats['success'] or stats['projects_inserted'] != 2 or first.exists() \
+                    or not archived or not (archive / archived['pack_file']).exists():
+                print(f"❌ First bundle not applied and archived: {stats}")
+                return False
+            print("✅ New projects inserted and file archived")
+
+            second = inbox / "sync_pm_2.json"
+            second.write_text(json.dumps({'username': 'pm', 'projects': [
+                project('CCR-ING-1', 'Ingest One Renamed', 'On Hold'), project('CCR-ING-3', 'Bad', 'Unknown')
+            ]}))
+            stats = ingest.ingest_file(master, second, archive)
+            renamed = master.fetchone("SELECT name, status FROM projects WHERE ccr_nfid = 'CCR-ING-1'")
+            if (stats['projects_updated'], stats['projects_skipped']) != (1, 1) or renamed['status'] != 'On Hold':
+                print(f"❌ Upsert or validation wrong: {stats}")
+                return False
+            print("✅ Existing project upserted, invalid project skipped")
+
+            # Child records reference local IDs; project_keys covers parents not in the bundle
+            kpi = {'local_snapshot_id': 7, 'local_project_id': 11, 'snapshot_date': '2025-01-31',
+                   'budget_status': 'On Budget', 'schedule_status': 'On Schedule', 'on_time_percent': 95}
+            third = inbox / "sync_pm_3.json"
+            third.write_text(json.dumps({
+                'username': 'pm', 'user_id': 2, 'projects': [],
+                'project_keys': {'11': 'CCR-ING-2', '12': 'CCR-ING-1'},
+                'kpi_snapshots': [kpi],
+                'project_dependencies': [{'local_dependency_id': 3, 'local_project_id': 11,
+                                          'depends_on_local_project_id': 12}],
+                'project_contacts': [{'local_contact_id': 4, 'local_project_id': 99,
+                                      'contact_name': 'Orphan', 'contact_role': 'Engineer'}]
+            }))
+            ingest.ingest_file(master, third, archive)
+
+            # Re-sending the same KPI updates it instead of duplicating it
+            kpi['on_time_percent'] = 80
+            fourth = inbox / "sync_pm_4.json"
+            fourth.write_text(json.dumps({'username': 'pm', 'user_id': 2, 'projects': [],
+                                          'project_keys': {'11': 'CCR-ING-2'}, 'kpi_snapshots': [kpi]}))
+            stats = ingest.ingest_file(master, fourth, archive)
+
+            kpis = master.fetchall("""
+                SELECT k.on_time_percent FROM kpi_snapshots k
+                JOIN projects p ON k.project_id = p.project_id WHERE p.ccr_nfid = 'CCR-ING-2'
+            """)
+            deps = master.fetchone("SELECT COUNT(*) as count FROM project_dependencies")['count']
+            contacts = master.fetchone("SELECT COUNT(*) as count FROM project_contacts")['count']
+            if [k['on_time_percent'] for k in kpis] != [80] or deps != 1 or contacts != 0:
+                print(f"❌ Child records wrong: kpis={[dict(k) for k in kpis]} deps={deps} contacts={contacts}")
+                return False
+            print("✅ KPIs and dependencies remapped to master IDs, re-sends upserted, orphans skipped")
+
+            # Without a resolvable sender there is no upsert key, so re-sends must not pile up
+            for name in ("sync_ghost_1.json", "sync_ghost_2.json"):
+                (inbox / name).write_text(json.dumps({
+                    'username': 'ghost', 'projects': [], 'project_keys': {'11': 'CCR-ING-2'},
+                    'project_contacts': [{'local_contact_id': 5, 'local_project_id': 11,
+                                          'contact_name': 'Ghost', 'contact_role': 'Engineer'}],
+                    'sync_timestamp': name
+                }))
+                stats = ingest.ingest_file(master, inbox / name, archive)
+            ghosts = master.fetchone("SELECT COUNT(*) as count FROM project_contacts WHERE contact_name = 'Ghost'")['count']
+            if ghosts != 0 or stats['children_skipped'] != 1:
+                print(f"❌ Child rows from an unknown sender were inserted: {ghosts} {stats['errors']}")
+                return False
+            print("✅ Child rows from an unknown sender skipped instead of duplicated")
+
+            master.close()
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Inbox ingest test failed: {e}")
+        return False
+
+
+def test_inbox_manifest():
+    """Test 18: Inbox Manifest"""
+    print("\n" + "="*60)
+    print("TEST 18: Inbox Manifest")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("ManifestMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "manifest_master.db"))
+            master.connect()
+            master.migrate()
+            inbox_dir = Path(tmp) / "inbox"
+            archive = Path(tmp) / "archive"
+            inbox_dir.mkdir()
+
+            dropped = {'username': 'pm', 'user_id': 2, 'sync_timestamp': '2025-01-31T09:00:00',
+                       'projects': [{'name': f"P{i}", 'ccr_nfid': f"CCR-MAN-{i}", 'pm_id': 2, 'status': 'Active'}
+                                    for i in range(7)],
+                       'kpi_snapshots': [{'local_snapshot_id': 1}]}
+            synced = inbox_dir / "sync_pm_1.json"
+            synced.write_text(json.dumps(dropped))
+            inbox.record_bundle(master, synced, dropped)
+
+            # Copied in by hand (never indexed) and an unreadable file
+            (inbox_dir / "sync_pm_2.json").write_text(json.dumps({'username': 'pm', 'projects': []}))
+            (inbox_dir / "sync_broken.json").write_text("{not json")
+
+            refreshed = inbox.refresh_manifest(master, inbox_dir)
+            entries = {entry['file_name']: entry for entry in inbox.pending_bundles(master)}
+            if refreshed != {'indexed': 2, 'removed': 0} or len(entries) != 3:
+                print(f"❌ Refresh should only parse unindexed files: {refreshed}")
+                return False
+            first = entries['sync_pm_1.json']
+            if (first['total_items'], len(first['project_preview'])) != (8, inbox.PREVIEW_PROJECTS) \
+                    or not entries['sync_broken.json']['error']:
+                print(f"❌ Manifest summary wrong: {first}")
+                return False
+            print("✅ Dropped bundle indexed on write, stray files indexed once on refresh")
+
+            if inbox.refresh_manifest(master, inbox_dir) != {'indexed': 0, 'removed': 0}:
+                print("❌ Unchanged inbox was re-parsed")
+                return False
+            print("✅ Unchanged inbox refresh parses nothing")
+
+            ingest.ingest_file(master, synced, archive)
+            (inbox_dir / "sync_broken.json").unlink()
+            inbox.refresh_manifest(master, inbox_dir)
+            if inbox.pending_count(master) != 1:
+                print(f"❌ Processed or deleted files left in manifest: {inbox.pending_count(master)}")
+                return False
+            print("✅ Processed and deleted files dropped from the manifest")
+
+            master.close()
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Inbox manifest test failed: {e}")
+        return False
+
+
+def test_bundle_format():
+    """Test 19: Compressed Bundle Format"""
+    print("\n" + "="*60)
+    print("TEST 19: Compressed Bundle Format")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            local_db = LocalProjectsDB(2)
+            local_db.db_path = str(Path(tmp) / "my_projects_bundle.db")
+            local_db.connect()
+            local_db.initialize_schema()
+            with local_db.transaction():
+                local_db.executemany(
+                    "INSERT INTO projects (name, ccr_nfid, pm_id) VALUES (?, ?, ?)",
+                    [(f"Bundle Project {i}", f"CCR-VTB-{i:04d}", 2) for i in range(25)]
+                )
+                local_db.execute(
+                    "INSERT INTO kpi_snapshots (local_project_id, snapshot_date, on_time_percent) VALUES (1, '2025-01-31', 91.5)"
+                )
+
+            expected = sync.create_sync_bundle(local_db, "pm_test")
+            path = Path(tmp) / "sync_pm_test.vtb"
+            written = bundles.write_bundle(path, sync.pending_bundle_events(local_db, "pm_test"))
+            loaded = bundles.load_bundle(path)
+            loaded['sync_timestamp'] = expected['sync_timestamp']
+            if loaded != expected or written['counts']['projects'] != 25 \
+                    or len(written['preview']['projects']) != bundles.PREVIEW_ROWS:
+                print(f"❌ Streamed .vtb bundle does not round-trip: {written['counts']}")
+                return False
+            if loaded['project_keys'] != {'1': 'CCR-VTB-0000'}:
+                print(f"❌ project_keys lost: {loaded['project_keys']}")
+                return False
+            print(f"✅ Streamed bundle round-trips ({written['size_bytes']} bytes, "
+                  f"{len(json.dumps(expected, indent=2, default=str))} as JSON)")
+
+            truncated = Path(tmp) / "truncated.vtb"
+            with gzip.open(path, 'rb') as source, gzip.open(truncated, 'wb') as target:
+                target.write(source.read()[:-20])
+            try:
+                bundles.load_bundle(truncated)
+                print("❌ Truncated bundle was accepted")
+                return False
+            except ValueError:
+                print("✅ Truncated bundle rejected")
+
+            local_db.close()
+            connection_pool.close_idle(local_db.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Bundle format test failed: {e}")
+        return False
+
+
+def test_streaming_ingest():
+    """Test 20: Streaming Ingest"""
+    print("\n" + "="*60)
+    print("TEST 20: Streaming Ingest")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            bundle = {
+                'username': 'pm', 'user_id': 2, 'change_seq': 12345,
+                'projects': [{'local_id': i + 1, 'name': f"Stream {i} — “quoted”", 'ccr_nfid': f"CCR-STR-{i}",
+                              'pm_id': 2, 'status': 'Active', 'notes': None} for i in range(5)],
+                'kpi_snapshots': [{'local_snapshot_id': i, 'local_project_id': i % 5 + 1,
+                                   'snapshot_date': f"2025-01-{i % 28 + 1:02d}", 'on_time_percent': 90.25}
+                                  for i in range(1, 23)],
+                'project_dependencies': [],
+                'project_keys': {'1': 'CCR-STR-0'}
+            }
+
+            # Tiny read chunks force every value across a chunk boundary
+            json_path = Path(tmp) / "sync_pm_stream.json"
+            json_path.write_text(json.dumps(bundle, indent=2), encoding='utf-8')
+            original_chunk = bundles.JSON_READ_CHUNK
+            bundles.JSON_READ_CHUNK = 7
+            try:
+                streamed = list(bundles.iter_records(json_path))
+            finally:
+                bundles.JSON_READ_CHUNK = original_chunk
+            if streamed != list(bundles.bundle_records(bundle)):
+                print("❌ Incremental JSON parser disagrees with json.load")
+                return False
+            print(f"✅ Incremental JSON parser yields {len(streamed)} records identical to json.load")
+
+            master_class = type("StreamMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "stream_master.db"))
+            master.connect()
+            master.migrate()
+
+            # project_keys is written after the child tables in .vtb bundles
+            vtb_path = Path(tmp) / "sync_pm_stream.vtb"
+            bundles.write_bundle(vtb_path, bundles.bundle_events(bundle))
+            context = ingest.bundle_context(bundles.iter_records(vtb_path, tables=('projects',)))
+            stats = ingest.apply_records(master, bundles.iter_records(vtb_path), context, batch_size=4)
+            kpis = master.fetchone("SELECT COUNT(*) as count FROM kpi_snapshots")['count']
+            if (stats['projects_inserted'], stats['kpis_applied'], kpis) != (5, 22, 22):
+                print(f"❌ Batched streaming ingest wrong: {stats}")
+                return False
+            print("✅ Bundle applied in batches of 4 with every KPI remapped")
+
+            master.close()
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Streaming ingest test failed: {e}")
+        return False
+
+
+def test_parallel_ingest():
+    """Test 21: Parallel Inbox Ingest"""
+    print("\n" + "="*60)
+    print("TEST 21: Parallel Inbox Ingest")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox_dir = Path(tmp) / "inbox"
+            archive = Path(tmp) / "archive"
+            inbox_dir.mkdir()
+            ccr_nfid = f"CCR-PAR-{int(time.time() * 1000)}"
+
+            # Same project edited in three successive bundles; the last must win
+            for i, status in enumerate(['Active', 'On Hold', 'Completed']):
+                path = inbox_dir / f"sync_pm_{i}.vtb"
+                bundles.write_bundle(path, bundles.bundle_events({
+                    'username': 'pm', 'user_id': 2,
+                    'projects': [{'local_id': 1, 'name': f"Parallel {i}", 'ccr_nfid': ccr_nfid,
+                                  'pm_id': 2, 'status': status}]
+                }))
+                os.utime(path, (1000 + i, 1000 + i))
+            broken = inbox_dir / "sync_pm_9.json"
+            broken.write_text("{broken")
+            os.utime(broken, (2000, 2000))
+
+            totals = ingest.ingest_inbox(inbox_dir, archive, workers=2)
+            order = [file_stats['file'] for file_stats in totals['file_stats']]
+            if order != ['sync_pm_0.vtb', 'sync_pm_1.vtb', 'sync_pm_2.vtb', 'sync_pm_9.json'] \
+                    or (totals['files_processed'], totals['files_failed']) != (3, 1):
+                print(f"❌ Files not applied in order: {order} {totals['files_failed']} failed")
+                return False
+
+            master = MasterProjectsDB()
+            master.connect()
+            project = master.fetchone("SELECT name, status FROM projects WHERE ccr_nfid = ?", (ccr_nfid,))
+            master.execute("DELETE FROM projects WHERE ccr_nfid = ?", (ccr_nfid,))
+            master.execute("DELETE FROM sync_ingest_log WHERE file_name LIKE 'sync_pm_%.vtb' AND dropped_at < 2000")
+            master.execute("DELETE FROM sync_ingest_ledger WHERE file_name IN (?, ?, ?, ?)", tuple(order))
+            master.execute("DELETE FROM sync_archive_index WHERE file_name IN (?, ?, ?, ?)", tuple(order))
+            master.close()
+            if project['status'] != 'Completed' or not broken.exists():
+                print(f"❌ Wrong final state: {dict(project)}")
+                return False
+            print("✅ 2 workers decoded bundles, writer applied them oldest first; bad file left in inbox")
+
+            # A file another ingest run took after listing is reported, not fatal to the run
+            gone = inbox_dir / "sync_pm_gone.vtb"
+            file_stats = list(ingest._ingest_parallel([gone, broken], archive, 2))
+            if [stats['file'] for stats in file_stats] != [gone.name, broken.name] \
+                    or "no longer in the inbox" not in file_stats[0]['errors'][0]:
+                print(f"❌ Vanished file aborted the run: {file_stats}")
+                return False
+            print("✅ File claimed by another run reported as gone; the rest of the run continued")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Parallel ingest test failed: {e}")
+        return False
+
+
+def test_inbox_daemon():
+    """Test 22: Inbox Watcher Daemon"""
+    print("\n" + "="*60)
+    print("TEST 22: Inbox Watcher Daemon")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox_dir = Path(tmp) / "inbox"
+            inbox_dir.mkdir()
+            stop = threading.Event()
+
+            watcher = inbox_daemon.InboxWatcher(inbox_dir)
+            writer = threading.Timer(0.2, lambda: (inbox_dir / "sync_pm_new.json").write_text('{"username": '))
+            writer.start()
+            started = time.monotonic()
+            woke = watcher.wait(5.0, stop)
+            mode = watcher.mode
+            watcher.close()
+            if mode == "inotify" and (not woke or time.monotonic() - started > 2):
+                print("❌ inotify watcher did not wake on a new file")
+                return False
+            print(f"✅ Watcher ({mode}) woke after {time.monotonic() - started:.2f}s")
+
+            # A JSON bundle still being written is held back until it settles
+            ready, settling = inbox_daemon.ready_files(inbox_dir, {}, settle_seconds=60)
+            if ready or settling != 1:
+                print(f"❌ Unsettled JSON bundle was not held back: {ready}")
+                return False
+
+            failed = {}
+            totals, _ = inbox_daemon.process_ready(inbox_dir, Path(tmp) / "archive", failed, settle_seconds=0)
+            retry, _ = inbox_daemon.ready_files(inbox_dir, failed, settle_seconds=0)
+            if totals['files_failed'] != 1 or retry:
+                print(f"❌ Failed bundle would be retried unchanged: {failed}")
+                return False
+            (inbox_dir / "sync_pm_new.json").write_text('{"username": "pm", "projects": []}')
+            os.utime(inbox_dir / "sync_pm_new.json", (time.time() - 5, time.time() - 5))
+            retry, _ = inbox_daemon.ready_files(inbox_dir, failed, settle_seconds=0)
+            if len(retry) != 1:
+                print("❌ Rewritten bundle was not retried")
+                return False
+            print("✅ Unsettled JSON held back; failed bundle retried only after it changes")
+
+            # Files taken by another run after the listing, and failed cycles, don't stop the daemon
+            listing = ingest.pending_inbox_files
+            cycle = inbox_daemon.process_ready
+            calls = []
+
+            def flaky_cycle(*args, **kwargs):
+                calls.append(len(calls))
+                if len(calls) == 1:
+                    raise sqlite3.OperationalError("database is locked")
+                stop.set()
+                return None, 0
+
+            try:
+                ingest.pending_inbox_files = lambda inbox: [inbox / "sync_pm_gone.vtb"] + listing(inbox)
+                ready, _ = inbox_daemon.ready_files(inbox_dir, {}, settle_seconds=0)
+                inbox_daemon.process_ready = flaky_cycle
+                inbox_daemon.run(inbox_dir, Path(tmp) / "archive", poll_interval=0.05,
+                                 force_polling=True, stop=stop)
+            finally:
+                ingest.pending_inbox_files = listing
+                inbox_daemon.process_ready = cycle
+            if [path.name for path in ready] != ["sync_pm_new.json"] or len(calls) != 2:
+                print(f"❌ Daemon did not survive a vanished file or failed cycle: {ready} {calls}")
+                return False
+            print("✅ Vanished files skipped; daemon kept watching after a failed cycle")
+
+            master = MasterProjectsDB()
+            master.connect()
+            master.execute("DELETE FROM sync_ingest_ledger WHERE file_name = 'sync_pm_new.json'")
+            master.execute("DELETE FROM sync_archive_index WHERE file_name = 'sync_pm_new.json'")
+            master.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Inbox daemon test failed: {e}")
+        return False
+
+
+def test_pull_sync():
+    """Test 23: Master-to-Local Pull Sync"""
+    print("\n" + "="*60)
+    print("TEST 23: Master-to-Local Pull Sync")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("PullMasterDB", (Database,), {
+                "MIGRATIONS": MasterProjectsDB.MIGRATIONS,
+                "change_sequence_head": MasterProjectsDB.change_sequence_head
+            })
+            master = master_class(str(Path(tmp) / "pull_master.db"))
+            master.connect()
+            master.migrate()
+
+            local_db = LocalProjectsDB(2)
+            local_db.db_path = str(Path(tmp) / "my_projects_pull.db")
+            local_db.connect()
+            local_db.initialize_schema()
+
+            # Push two local projects and a KPI to master
+            local_db.executemany(
+                "INSERT INTO projects (name, ccr_nfid, pm_id, status) VALUES (?, ?, 2, 'Active')",
+                [("Pull One", "CCR-PULL-1"), ("Pull Two", "CCR-PULL-2")]
+            )
+            local_db.execute(
+                "INSERT INTO kpi_snapshots (local_project_id, snapshot_date, budget_status) VALUES (1, '2025-01-31', 'On Budget')"
+            )
+            bundle = sync.create_sync_bundle(local_db, "pm_test")
+            ingest.apply_bundle(master, bundle)
+            sync.mark_items_as_synced(local_db, bundle['change_seq'])
+
+            # Changes made in master by someone else
+            master.execute("UPDATE projects SET status = 'On Hold' WHERE ccr_nfid = 'CCR-PULL-1'")
+            master.executemany(
+                "INSERT INTO projects (name, ccr_nfid, pm_id, status) VALUES (?, ?, ?, 'Active')",
+                [("Imported", "CCR-PULL-3", 2), ("Other PM", "CCR-PULL-4", 3)]
+            )
+            master.execute("""
+                INSERT INTO kpi_snapshots (project_id, snapshot_date, budget_status)
+                SELECT project_id, '2025-02-28', 'Over Budget' FROM projects WHERE ccr_nfid = 'CCR-PULL-3'
+            """)
+
+            stats = sync.pull_master_changes(local_db, master)
+            statuses = {row['ccr_nfid']: row['status'] for row in local_db.fetchall("SELECT ccr_nfid, status FROM projects")}
+            kpi = local_db.fetchone("""
+                SELECT p.ccr_nfid FROM kpi_snapshots k JOIN projects p ON k.local_project_id = p.local_id
+                WHERE k.budget_status = 'Over Budget'
+            """)
+            own_kpi = local_db.fetchone("SELECT master_snapshot_id FROM kpi_snapshots WHERE local_snapshot_id = 1")
+            if (statuses != {'CCR-PULL-1': 'On Hold', 'CCR-PULL-2': 'Active', 'CCR-PULL-3': 'Active'}
+                    or not kpi or kpi['ccr_nfid'] != 'CCR-PULL-3' or own_kpi['master_snapshot_id'] is None):
+                print(f"❌ First pull wrong: {statuses} {stats}")
+                return False
+            if sum(sync.get_pending_sync_counts(local_db).values()) != 0:
+                print("❌ Pulled rows were logged as local changes")
+                return False
+            print(f"✅ Pulled {stats['projects']} projects and {stats['kpis']} KPIs; nothing queued to push back")
+
+            stats = sync.pull_master_changes(local_db, master)
+            if stats['projects'] + stats['kpis'] != 0 or stats['from_seq'] != stats['through_seq']:
+                print(f"❌ Second pull was not empty: {stats}")
+                return False
+            print("✅ Pull with no master changes reads nothing")
+
+            # Unpushed local edits win over master changes to the same row
+            local_db.execute("UPDATE projects SET phase = 'Local Edit' WHERE ccr_nfid = 'CCR-PULL-2'")
+            master.execute("UPDATE projects SET phase = 'Master Edit' WHERE ccr_nfid IN ('CCR-PULL-2', 'CCR-PULL-3')")
+            stats = sync.pull_master_changes(local_db, master)
+            phases = {row['ccr_nfid']: row['phase'] for row in local_db.fetchall("SELECT ccr_nfid, phase FROM projects")}
+            if (stats['projects'], stats['skipped']) != (1, 1) or phases['CCR-PULL-2'] != 'Local Edit' \
+                    or phases['CCR-PULL-3'] != 'Master Edit':
+                print(f"❌ Conflict handling wrong: {phases} {stats}")
+                return False
+            print("✅ Only changed rows pulled; rows with unpushed edits kept local")
+
+            # A pulled row edited locally updates the master row it came from
+            local_db.execute("UPDATE kpi_snapshots SET budget_status = 'On Budget' WHERE budget_status = 'Over Budget'")
+            bundle = sync.create_sync_bundle(local_db, "pm_test")
+            ingest.apply_bundle(master, bundle)
+            sync.mark_items_as_synced(local_db, bundle['change_seq'])
+            kpis = [row['budget_status'] for row in master.fetchall("""
+                SELECT k.budget_status FROM kpi_snapshots k JOIN projects p ON k.project_id = p.project_id
+                WHERE p.ccr_nfid = 'CCR-PULL-3'
+            """)]
+            if kpis != ['On Budget']:
+                print(f"❌ Pushed edit of a pulled KPI did not update the master row: {kpis}")
+                return False
+            print("✅ Pushed edit of a pulled KPI updated the master row instead of copying it")
+
+            local_db.close()
+            master.close()
+            connection_pool.close_idle(local_db.db_path)
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Pull sync test failed: {e}")
+        return False
+
+
+def test_ingest_ledger():
+    """Test 24: Idempotent Ingest Ledger"""
+    print("\n" + "="*60)
+    print("TEST 24: Idempotent Ingest Ledger")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("LedgerMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "ledger_master.db"))
+            master.connect()
+            master.migrate()
+
+            inbox_dir = Path(tmp) / "inbox"
+            archive = Path(tmp) / "archive"
+            inbox_dir.mkdir()
+            content = json.dumps({'username': 'pm', 'user_id': 2, 'projects': [
+                {'name': 'Ledger One', 'ccr_nfid': 'CCR-LED-1', 'pm_id': 2, 'status': 'Active'},
+                {'name': 'Boom', 'ccr_nfid': 'CCR-LED-2', 'pm_id': 2, 'status': 'Active'}
+            ]})
+
+            # A failure inside the transaction writes nothing and is recorded
+            master.execute("""
+                CREATE TRIGGER fail_boom BEFORE INSERT ON projects WHEN NEW.name = 'Boom'
+                BEGIN SELECT RAISE(ABORT, 'master unavailable'); END
+            """)
+            first = inbox_dir / "sync_pm_1.json"
+            first.write_text(content)
+            stats = ingest.ingest_file(master, first, archive)
+            count = master.fetchone("SELECT COUNT(*) as count FROM projects")['count']
+            ledger = master.fetchone("SELECT status, attempts FROM sync_ingest_ledger")
+            if stats['success'] or count != 0 or ledger['status'] != 'failed':
+                print(f"❌ Failed ingest left rows or no ledger entry: {count} {dict(ledger)}")
+                return False
+
+            master.execute("DROP TRIGGER fail_boom")
+            stats = ingest.ingest_file(master, first, archive)
+            ledger = master.fetchone("SELECT status, attempts, projects FROM sync_ingest_ledger")
+            if not stats['success'] or (ledger['status'], ledger['attempts'], ledger['projects']) != ('applied', 2, 2):
+                print(f"❌ Retry not recorded as applied: {dict(ledger)}")
+                return False
+            print("✅ Failed bundle rolled back, retried from the start and recorded as applied")
+
+            # The same bytes dropped again (also under the same name) are archived untouched
+            seq_before = master.fetchone("SELECT seq FROM change_sequence")['seq']
+            duplicates = 0
+            for name in ("sync_pm_2.json", "sync_pm_1.json"):
+                (inbox_dir / name).write_text(content)
+                stats = ingest.ingest_file(master, inbox_dir / name, archive)
+                duplicates += stats['success'] and stats['duplicate']
+            seq_after = master.fetchone("SELECT seq FROM change_sequence")['seq']
+            archived = sorted(row['file_name'] for row in master.fetchall("SELECT file_name FROM sync_archive_index"))
+            stored = master.fetchone("SELECT COUNT(DISTINCT pack_offset) as count FROM sync_archive_index")['count']
+            if duplicates != 2 or seq_after != seq_before or len(archived) != 3 or stored != 1:
+                print(f"❌ Duplicates were re-applied: {duplicates} {archived}")
+                return False
+            print(f"✅ Re-submitted bundles skipped without writes, archived as {archived}")
+
+            # A run waiting on the write lock sees the ledger row the winning run committed
+            racing = inbox_dir / "sync_pm_3.json"
+            racing.write_text(json.dumps({'username': 'pm', 'projects': [
+                {'name': 'Race', 'ccr_nfid': 'CCR-LED-3', 'pm_id': 2, 'status': 'Active'}
+            ]}))
+            result = {}
+
+            def loser():
+                other = master_class(master.db_path)
+                other.connect()
+                result.update(ingest.ingest_file(other, racing, archive))
+                other.close()
+
+            with master.transaction():
+                thread = threading.Thread(target=loser)
+                thread.start()
+                time.sleep(0.3)
+                master.execute("""
+                    INSERT INTO sync_ingest_ledger (bundle_hash, file_name, status, first_seen_at)
+                    VALUES (?, ?, 'applied', 0)
+                """, (bundles.bundle_digest(racing), racing.name))
+            thread.join()
+            raced = master.fetchone("SELECT COUNT(*) as count FROM projects WHERE ccr_nfid = 'CCR-LED-3'")['count']
+            gone = ingest.ingest_file(master, racing, archive)
+            if not (result['success'] and result['duplicate']) or raced != 0 or racing.exists() \
+                    or gone['success'] or 'no longer in the inbox' not in gone['errors'][0]:
+                print(f"❌ Concurrent ingest applied the bundle twice: {result} {raced} {gone['errors']}")
+                return False
+            print("✅ Ledger re-checked under the write lock; a file another run took is reported as gone")
+
+            master.close()
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Ingest ledger test failed: {e}")
+        return False
+
+
+def test_chunked_bundles():
+    """Test 25: Resumable Chunked Sync Bundles"""
+    print("\n" + "="*60)
+    print("TEST 25: Resumable Chunked Sync Bundles")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("PartsMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "parts_master.db"))
+            master.connect()
+            master.migrate()
+
+            local_db = LocalProjectsDB(2)
+            local_db.db_path = str(Path(tmp) / "my_projects_parts.db")
+            local_db.connect()
+            local_db.initialize_schema()
+            with local_db.transaction():
+                local_db.executemany(
+                    "INSERT INTO projects (name, ccr_nfid, pm_id, status) VALUES (?, ?, 2, 'Active')",
+                    [(f"Part Project {i}", f"CCR-PART-{i:03d}") for i in range(25)]
+                )
+                local_db.executemany(
+                    "INSERT INTO kpi_snapshots (local_project_id, snapshot_date, on_time_percent) VALUES (?, '2025-03-31', 90)",
+                    [(local_id,) for local_id in range(1, 26)]
+                )
+
+            outbox = Path(tmp) / "outbox"
+            inbox_dir = Path(tmp) / "inbox"
+            archive = Path(tmp) / "archive"
+            staging, manifest = sync.stage_sync_parts(local_db, "pm_test", outbox, max_rows=10)
+            rows = [part['rows'] for part in manifest['parts']]
+            if rows != [10, 10, 10, 10, 10]:
+                print(f"❌ Parts not bounded by max_rows: {rows}")
+                return False
+
+            # The upload stops after two parts, then resumes with the third
+            real_copy = sync.shutil.copyfile
+            copies = []
+
+            def flaky_copy(source, target):
+                if len(copies) == 2:
+                    raise OSError("G: drive unavailable")
+                copies.append(Path(source).name)
+                return real_copy(source, target)
+
+            sync.shutil.copyfile = flaky_copy
+            try:
+                sync.upload_staged_bundle(staging, inbox_dir)
+                print("❌ Interrupted upload did not raise")
+                return False
+            except OSError:
+                pass
+            finally:
+                sync.shutil.copyfile = real_copy
+
+            resumed = sync.resume_outbox_uploads("pm_test", outbox, inbox_dir)
+            uploaded = sorted(path.name for path in inbox_dir.iterdir())
+            if resumed != 1 or len(uploaded) != 5 or staging.exists():
+                print(f"❌ Upload did not resume: {uploaded}")
+                return False
+            print(f"✅ {len(rows)} parts staged; interrupted upload resumed at part 3 of 5")
+
+            # A part is held back while an earlier part of its bundle is waiting
+            parts = ingest.pending_inbox_files(inbox_dir)
+            stats = ingest.ingest_file(master, parts[3], archive)
+            if not stats['deferred'] or not parts[3].exists():
+                print(f"❌ Out-of-order part was applied: {stats}")
+                return False
+
+            for part in parts:
+                stats = ingest.ingest_file(master, part, archive)
+                if not stats['success']:
+                    print(f"❌ Part {part.name} failed: {stats['errors']}")
+                    return False
+            projects = master.fetchone("SELECT COUNT(*) as count FROM projects")['count']
+            kpis = master.fetchone("SELECT COUNT(*) as count FROM kpi_snapshots")['count']
+            if (projects, kpis) != (25, 25):
+                print(f"❌ Parts applied incompletely: {projects} projects, {kpis} KPIs")
+                return False
+            print("✅ Parts applied in order, KPIs remapped to projects sent in earlier parts")
+
+            local_db.close()
+            master.close()
+            connection_pool.close_idle(local_db.db_path)
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Chunked bundle test failed: {e}")
+        return False
+
+
+def test_fair_share_scheduling():
+    """Test 26: Fair-Share Inbox Scheduling"""
+    print("\n" + "="*60)
+    print("TEST 26: Fair-Share Inbox Scheduling")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox_dir = Path(tmp)
+            files = []
+
+            def drop(name, size, mtime):
+                path = inbox_dir / name
+                with open(path, 'wb') as f:
+                    f.truncate(size)
+                os.utime(path, (mtime, mtime))
+                files.append(path)
+
+            # One PM's large backlog dropped first, then two small syncs
+            for i in range(3):
+                drop(f"sync_big_pm_20250101_00000{i}.vtb", 3 * 1024 * 1024, 1000 + i)
+            drop("sync_alice_20250101_000010.vtb", 2048, 1010)
+            drop("sync_bob_20250101_000011.p0001.vtb", 4096, 1011)
+            drop("sync_bob_20250101_000011.p0002.vtb", 4096, 1011)
+
+            order = [path.name for path in ingest.schedule_inbox_files(files, pinned=[])]
+            expected = [
+                "sync_alice_20250101_000010.vtb",
+                "sync_bob_20250101_000011.p0001.vtb", "sync_bob_20250101_000011.p0002.vtb",
+                "sync_big_pm_20250101_000000.vtb", "sync_big_pm_20250101_000001.vtb",
+                "sync_big_pm_20250101_000002.vtb"
+            ]
+            if order != expected:
+                print(f"❌ Small syncs still wait behind the backlog: {order}")
+                return False
+            print("✅ Small syncs from other PMs go ahead of a large backlog; each PM keeps its order")
+
+            order = [path.name for path in ingest.schedule_inbox_files(files, pinned=["big_pm"])]
+            if order[:3] != expected[3:]:
+                print(f"❌ Pinned PM not served first: {order}")
+                return False
+            print("✅ Pinned PM's queue processed first")
+
+            # Pins saved on the inbox page reach a running daemon's next pass without a restart
+            settings.kpi_threshold_green  # the daemon's snapshot, loaded before the pins change
+            config_path = ConfigDB().db_path
+            page = sqlite3.connect(config_path)
+            original = page.execute(
+                "SELECT setting_value FROM config_settings WHERE setting_key = 'ingest_pinned_users'"
+            ).fetchone()
+            page.execute("""
+                INSERT INTO config_settings (setting_key, setting_value) VALUES ('ingest_pinned_users', 'bob')
+                ON CONFLICT(setting_key) DO UPDATE SET setting_value = excluded.setting_value
+            """)
+            page.commit()
+            try:
+                order = [path.name for path in ingest.schedule_inbox_files(files)]
+            finally:
+                if original is None:
+                    page.execute("DELETE FROM config_settings WHERE setting_key = 'ingest_pinned_users'")
+                else:
+                    page.execute("UPDATE config_settings SET setting_value = ? WHERE setting_key = 'ingest_pinned_users'", original)
+                page.commit()
+                page.close()
+            if order[:2] != expected[1:3]:
+                print(f"❌ Pins saved elsewhere not used by the next scheduling pass: {order}")
+                return False
+            print("✅ Pins saved by another process used on the next scheduling pass")
+
+            master_class = type("QueueMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "queue_master.db"))
+            master.connect()
+            master.migrate()
+            now = time.time()
+            master.executemany(
+                "INSERT INTO sync_inbox_manifest (file_name, username, size_bytes, file_mtime) VALUES (?, ?, ?, ?)",
+                [("a.vtb", "alice", 100, now - 60), ("b.vtb", "alice", 50, now - 30), ("c.vtb", "bob", 10, now - 5)]
+            )
+            master.executemany(
+                "INSERT INTO sync_ingest_log (file_name, username, applied_at, latency_seconds) VALUES (?, ?, ?, ?)",
+                [("x.vtb", "bob", now, 4.0), ("y.vtb", "bob", now, 8.0)]
+            )
+            queues = {queue['username']: queue for queue in ingest.queue_stats(master)}
+            master.close()
+            connection_pool.close_idle(master.db_path)
+            if (queues['alice']['pending'], queues['alice']['pending_bytes']) != (2, 150) \
+                    or queues['alice']['oldest_wait'] < 59 or (queues['bob']['applied'], queues['bob']['p95_wait']) != (2, 8.0):
+                print(f"❌ Queue metrics wrong: {queues}")
+                return False
+            print("✅ Per-PM pending counts and queue waits reported")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Fair-share scheduling test failed: {e}")
+        return False
+
+
+def test_column_deltas():
+    """Test 27: Column-Level Project Deltas"""
+    print("\n" + "="*60)
+    print("TEST 27: Column-Level Project Deltas")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("DeltaMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "delta_master.db"))
+            master.connect()
+            master.migrate()
+
+            local_db = LocalProjectsDB(2)
+            local_db.db_path = str(Path(tmp) / "my_projects_delta.db")
+            local_db.connect()
+            local_db.initialize_schema()
+
+            local_db.executemany(
+                "INSERT INTO projects (name, ccr_nfid, pm_id, status, notes) VALUES (?, ?, 2, 'Active', 'Original')",
+                [("Delta One", "CCR-DELTA-1"), ("Delta Two", "CCR-DELTA-2"), ("Delta Three", "CCR-DELTA-3")]
+            )
+            bundle = sync.create_sync_bundle(local_db, "pm_test")
+            ingest.apply_bundle(master, bundle)
+            sync.mark_items_as_synced(local_db, bundle['change_seq'])
+
+            # Re-saving unchanged values (as the dashboard does) is not a change
+            local_db.execute("UPDATE projects SET name = name, status = status, updated_at = CURRENT_TIMESTAMP")
+            if sum(sync.get_pending_sync_counts(local_db).values()) != 0:
+                print("❌ Saving unchanged rows was logged as a change")
+                return False
+            print("✅ Updates that change no tracked column are not logged")
+
+            local_db.execute("UPDATE projects SET notes = 'Edited' WHERE ccr_nfid = 'CCR-DELTA-1'")
+            local_db.execute("UPDATE projects SET notes = 'Edited again' WHERE ccr_nfid = 'CCR-DELTA-1'")
+            local_db.execute("UPDATE projects SET status = 'Paused' WHERE ccr_nfid = 'CCR-DELTA-2'")
+            master.execute("UPDATE projects SET status = 'On Hold' WHERE ccr_nfid = 'CCR-DELTA-1'")
+
+            bundle = sync.create_sync_bundle(local_db, "pm_test")
+            updates = {update['ccr_nfid']: update['changes'] for update in bundle['project_updates']}
+            if bundle['projects'] or updates != {'CCR-DELTA-1': {'notes': 'Edited again'},
+                                                 'CCR-DELTA-2': {'status': 'Paused'}}:
+                print(f"❌ Bundle did not carry column deltas: {bundle['projects']} {updates}")
+                return False
+            print("✅ Edited projects ship only their changed columns")
+
+            stats = ingest.apply_bundle(master, bundle)
+            rows = {row['ccr_nfid']: (row['status'], row['notes'])
+                    for row in master.fetchall("SELECT ccr_nfid, status, notes FROM projects")}
+            master.close()
+            local_db.close()
+            connection_pool.close_idle(master.db_path)
+            connection_pool.close_idle(local_db.db_path)
+            if rows['CCR-DELTA-1'] != ('On Hold', 'Edited again') or rows['CCR-DELTA-2'] != ('Active', 'Original') \
+                    or (stats['projects_updated'], stats['projects_skipped']) != (1, 1):
+                print(f"❌ Deltas applied wrongly: {rows} {stats}")
+                return False
+            print("✅ Master updates only the changed columns; concurrent master edits survive")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Column delta test failed: {e}")
+        return False
+
+
+def test_packed_archive():
+    """Test 28: Packed Sync Archive"""
+    print("\n" + "="*60)
+    print("TEST 28: Packed Sync Archive")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("ArchiveMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "archive_master.db"))
+            master.connect()
+            master.migrate()
+
+            inbox_dir = Path(tmp) / "inbox"
+            archive_dir = Path(tmp) / "archive"
+            inbox_dir.mkdir()
+            archive_dir.mkdir()
+            bundle = {'username': 'pm', 'user_id': 2, 'projects': [
+                {'name': 'Packed One', 'ccr_nfid': 'CCR-PACK-1', 'pm_id': 2, 'status': 'Active'}
+            ]}
+
+            # Files archived one per file by earlier versions, two days apart
+            loose_json = archive_dir / "sync_pm_20250101_090000.json"
+            loose_json.write_text(json.dumps(bundle))
+            loose_vtb = archive_dir / "sync_pm_20250103_090000.vtb"
+            bundles.write_bundle(loose_vtb, bundles.bundle_events(bundle))
+            originals = {path.name: path.read_bytes() for path in (loose_json, loose_vtb)}
+            day = 24 * 3600
+            os.utime(loose_json, (time.time() - 2 * day, time.time() - 2 * day))
+
+            packed = archive.pack_loose_files(master, archive_dir)
+            entries = {row['file_name']: dict(row) for row in master.fetchall("SELECT * FROM sync_archive_index")}
+            left = sorted(path.suffix for path in archive_dir.iterdir())
+            if packed != 2 or left != ['.pack', '.pack'] or set(entries) != set(originals):
+                print(f"❌ Loose files not packed: {packed} {left} {list(entries)}")
+                return False
+            if any(archive.read_archived_bundle(entry, archive_dir) != originals[name]
+                   for name, entry in entries.items()):
+                print("❌ Archived bundles do not read back byte for byte")
+                return False
+            print("✅ Loose archive files moved into daily packs and read back unchanged")
+
+            new_file = inbox_dir / "sync_pm_20250104_090000.json"
+            new_file.write_text(json.dumps(dict(bundle, sync_timestamp='later')))
+            stats = ingest.ingest_file(master, new_file, archive_dir)
+            recent = archive.recent_bundles(master, limit=2)
+            pack = archive_dir / recent[0]['pack_file']
+            if not stats['success'] or new_file.exists() or recent[0]['file_name'] != new_file.name \
+                    or archive.archived_count(master) != 3:
+                print(f"❌ Processed bundle not packed and indexed: {stats['errors']} {recent}")
+                return False
+            gzip.decompress(pack.read_bytes())
+            extracted = archive.extract_archived_bundle(recent[0], Path(tmp) / "extracted", archive_dir)
+            if ingest.ingest_file(master, extracted, archive_dir)['duplicate'] is not True:
+                print("❌ Extracted bundle does not match the applied one")
+                return False
+            print(f"✅ Processed bundle appended to {pack.name}; recent list served from the index")
+
+            master.close()
+            connection_pool.close_idle(master.db_path)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Packed archive test failed: {e}")
+        return False
+
+
+def test_archive_replay():
+    """Test 29: Master Rebuild by Archive Replay"""
+    print("\n" + "="*60)
+    print("TEST 29: Master Rebuild by Archive Replay")
+    print("="*60)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            master_class = type("ReplayMasterDB", (Database,), {"MIGRATIONS": MasterProjectsDB.MIGRATIONS})
+            master = master_class(str(Path(tmp) / "replay_master.db"))
+            master.connect()
+            master.migrate()
+
+            inbox_dir = Path(tmp) / "inbox"
+            archive_dir = Path(tmp) / "archive"
+            inbox_dir.mkdir()
+
+            def drop(name, projects):
+                bundle = {'username': 'pm', 'user_id': 2, 'projects': [
+                    {'name': project_name, 'ccr_nfid': ccr_nfid, 'pm_id': 2, 'status': status}
+                    for ccr_nfid, project_name, status in projects
+                ]}
+                path = inbox_dir / name
+                if path.suffix == bundles.VTB_SUFFIX:
+                    bundles.write_bundle(path, bundles.bundle_events(bundle))
+                else:
+                    path.write_text(json.dumps(bundle))
+                return ingest.ingest_file(master, path, archive_dir)['success']
+
+            drop("sync_pm_20250101_090000.json", [("CCR-RP-1", "Replay One", "Active")])
+            base = Path(tmp) / "base.db"
+            copy_database(Path(master.db_path), base)
+            drop("sync_pm_20250102_090000.vtb", [("CCR-RP-1", "Replay One", "On Hold"), ("CCR-RP-2", "Replay Two", "Active")])
+            drop("sync_pm_20250103_090000.json", [("CCR-RP-2", "Bad Merge", "Cancelled")])
+
+            def projects(path):
+                db = Database(str(path))
+                db.connect()
+                rows = {row['ccr_nfid']: (row['name'], row['status'])
+                        for row in db.fetchall("SELECT ccr_nfid, name, status FROM projects WHERE ccr_nfid LIKE 'CCR-RP-%'")}
+                db.close()
+                connection_pool.close_idle(str(path))
+                return rows
+
+            live = projects(master.db_path)
+            master.close()
+            connection_pool.close_idle(master.db_path)
+
+            totals = replay.rebuild_master(Path(tmp) / "rebuilt.db", base, Path(master.db_path), archive_dir,
+                                           workers=2, exclude={"sync_pm_20250103_090000.json"})
+            rebuilt = projects(Path(tmp) / "rebuilt.db")
+            if (totals['source'], totals['bundles'], totals['bundles_applied'], totals['bundles_excluded']) != ('index', 1, 1, 1) \
+                    or rebuilt != {'CCR-RP-1': ('Replay One', 'On Hold'), 'CCR-RP-2': ('Replay Two', 'Active')}:
+                print(f"❌ Replay onto the base went wrong: {rebuilt} {totals['errors']}")
+                return False
+            print(f"✅ Base plus archive rebuilt without the bad bundle ({totals['bundles_per_sec']:.1f} bundles/sec)")
+
+            totals = replay.rebuild_master(Path(tmp) / "scanned.db", None, None, archive_dir)
+            if (totals['source'], totals['bundles_applied']) != ('scan', 3) or projects(Path(tmp) / "scanned.db") != live:
+                print(f"❌ Replay from scanned packs differs from master: {totals['errors']}")
+                return False
+            print("✅ Packs scanned without an index replay to the same projects as master")
+
+            # The index row is written by a hook inside the bundle's transaction, so a
+            # failing hook rolls the bundle back with it
+            hooked = master_class(str(Path(tmp) / "hooked.db"))
+            hooked.connect()
+            hooked.migrate()
+            entry = replay.archived_entries(None, archive_dir)[0][0]
+            prepared = replay._prepare_entry(entry, archive_dir, Path(tmp) / "scratch")
+
+            def failing_hook(stats):
+                hooked.execute(archive.INSERT_INDEX_SQL, tuple(entry[column] for column in archive.INDEX_COLUMNS))
+                raise RuntimeError("index write failed")
+
+            stats = ingest.apply_prepared_bundle(hooked, prepared, entry['file_name'], on_applied=failing_hook)
+            leftovers = (hooked.fetchone("SELECT COUNT(*) as count FROM projects")['count'],
+                         hooked.fetchone("SELECT COUNT(*) as count FROM sync_archive_index")['count'],
+                         ingest.ledger_entry(hooked, prepared['digest'])['status'])
+            hooked.close()
+            connection_pool.close_idle(hooked.db_path)
+            if stats['success'] or leftovers != (0, 0, 'failed'):
+                print(f"❌ Bundle committed without its index row: {leftovers}")
+                return False
+            print("✅ Bundle and its archive index row commit together")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Archive replay test failed: {e}")
+        return False
+
+
 def run_all_tests():
     """Run all tests"""
     print("\n" + "="*60)
@@ -235,6 +1828,28 @@ def run_all_tests():
         ("Configuration Operations", test_config_operations),
         ("Sync Operations", test_sync_operations),
         ("User Management", test_user_management),
+        ("Connection Pool", test_connection_pool),
+        ("Batch Transactions", test_batch_transactions),
+        ("Schema Migrations", test_schema_migrations),
+        ("Cross-Database Views", test_cross_database_views),
+        ("Typed DataFrame Fetch", test_typed_frames),
+        ("Compact Record Types", test_record_types),
+        ("Shared Query Cache", test_query_cache),
+        ("Cached Settings", test_cached_settings),
+        ("Change Log Sync", test_change_log_sync),
+        ("Inbox Ingest", test_inbox_ingest),
+        ("Inbox Manifest", test_inbox_manifest),
+        ("Compressed Bundle Format", test_bundle_format),
+        ("Streaming Ingest", test_streaming_ingest),
+        ("Parallel Inbox Ingest", test_parallel_ingest),
+        ("Inbox Watcher Daemon", test_inbox_daemon),
+        ("Master-to-Local Pull Sync", test_pull_sync),
+        ("Idempotent Ingest Ledger", test_ingest_ledger),
+        ("Resumable Chunked Sync Bundles", test_chunked_bundles),
+        ("Fair-Share Inbox Scheduling", test_fair_share_scheduling),
+        ("Column-Level Project Deltas", test_column_deltas),
+        ("Packed Sync Archive", test_packed_archive),
+        ("Master Rebuild by Archive Replay", test_archive_replay),
     ]
     
     results = []
@@ -6,6 +6,7 @@ Logs user activities for timeline and audit purposes
 from datetime import datetime
 from typing import Optional
 from .database import MasterProjectsDB
+from .records import ActivityRecord
 import streamlit as st
 
 
@@ -60,7 +61,7 @@ class ActivityLogger:
             db = MasterProjectsDB()
             db.connect()
 
-            activities = db.fetchall("""
+            activities = db.fetch_records("""
                 SELECT
                     ua.activity_id,
                     ua.activity_type,
@@ -73,7 +74,7 @@ class ActivityLogger:
                 WHERE ua.user_id = ?
                 ORDER BY ua.created_at DESC
                 LIMIT ?
-            """, (user_id, limit))
+            """, (user_id, limit), ActivityRecord)
 
             db.close()
 
@@ -94,42 +95,28 @@ class ActivityLogger:
             List of activity records with user info
         """
         try:
-            from .database import MasterUsersDB
-
             projects_db = MasterProjectsDB()
             projects_db.connect()
 
-            users_db = MasterUsersDB()
-            users_db.connect()
-
-            # Get activities with user and project names
-            activities = projects_db.fetchall("""
+            # Single joined query - users come from the attached users database
+            activities = projects_db.fetch_records("""
                 SELECT
-                    ua.activity_id,
-                    ua.user_id,
-                    ua.activity_type,
-                    ua.activity_description,
-                    ua.related_project_id,
-                    ua.created_at,
-                    p.name as project_name
-                FROM user_activity ua
-                LEFT JOIN projects p ON ua.related_project_id = p.project_id
-                ORDER BY ua.created_at DESC
+                    activity_id,
+                    user_id,
+                    activity_type,
+                    activity_description,
+                    related_project_id,
+                    created_at,
+                    project_name,
+                    user_name
+                FROM activity_with_user
+                ORDER BY created_at DESC
                 LIMIT ?
-            """, (limit,))
-
-            # Enrich with user names
-            result = []
-            for activity in activities:
-                user = users_db.fetchone("SELECT full_name FROM users WHERE user_id = ?", (activity['user_id'],))
-                activity_dict = dict(activity)
-                activity_dict['user_name'] = user['full_name'] if user else 'Unknown User'
-                result.append(activity_dict)
+            """, (limit,), ActivityRecord)
 
             projects_db.close()
-            users_db.close()
 
-            return result
+            return activities
 
         except Exception as e:
             return []
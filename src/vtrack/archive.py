@@ -0,0 +1,238 @@
+"""
+Packed sync archive for Verizon Tracker
+Processed bundles are appended to daily pack files and indexed in master
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .bundles import JSON_SUFFIX, MAGIC, VTB_SUFFIX, bundle_digest, bundle_files, bundle_username
+from .database import MasterProjectsDB, ARCHIVE
+
+
+# A pack is a series of gzip members, one per archived bundle: .vtb files
+# (already a gzip stream) are stored byte for byte, JSON bundles are
+# compressed on the way in. sync_archive_index records where each one is.
+PACK_SUFFIX = ".pack"
+PACK_DATE_FORMAT = "%Y%m%d"
+
+# Bytes copied per chunk when appending a bundle to a pack
+PACK_COPY_CHUNK = 1024 * 1024
+
+# Processed syncs listed on the inbox page
+RECENT_BUNDLES = 10
+
+INDEX_COLUMNS = [
+    'file_name', 'bundle_hash', 'username', 'dropped_at', 'archived_at',
+    'pack_file', 'pack_offset', 'packed_bytes', 'size_bytes'
+]
+
+INSERT_INDEX_SQL = f"""
+    INSERT INTO sync_archive_index ({', '.join(INDEX_COLUMNS)})
+    VALUES ({', '.join('?' for _ in INDEX_COLUMNS)})
+"""
+
+
+def pack_path(archive_dir: Path, archived_at: float) -> Path:
+    """Pack file that bundles archived at the given time are appended to (one per day)"""
+    return archive_dir / f"bundles_{datetime.fromtimestamp(archived_at).strftime(PACK_DATE_FORMAT)}{PACK_SUFFIX}"
+
+
+def _append_member(pack_file: Path, sync_file: Path) -> tuple:
+    """
+    Append a bundle to a pack as one gzip member
+
+    A failed append is truncated away so the pack never ends in a partial
+    member.
+
+    Returns:
+        (offset, length) of the member in the pack
+    """
+    pack_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(pack_file, 'ab') as pack, open(sync_file, 'rb') as source:
+        offset = pack.seek(0, os.SEEK_END)
+        try:
+            if sync_file.suffix == VTB_SUFFIX:
+                shutil.copyfileobj(source, pack, PACK_COPY_CHUNK)
+            else:
+                with gzip.GzipFile(filename=sync_file.name, mode='wb', fileobj=pack) as member:
+                    shutil.copyfileobj(source, member, PACK_COPY_CHUNK)
+            pack.flush()
+            os.fsync(pack.fileno())
+        except BaseException:
+            pack.truncate(offset)
+            raise
+        return offset, pack.tell() - offset
+
+
+def archive_bundle(projects_db: MasterProjectsDB, sync_file: Path, archive_dir: Path = ARCHIVE,
+                   digest: Optional[str] = None, username: Optional[str] = None,
+                   archived_at: Optional[float] = None):
+    """
+    Append a processed bundle to its daily pack and index it
+
+    Must run inside a projects_db transaction: the write lock serializes
+    appends from concurrent ingest runs, and the index row commits with
+    the caller's other bookkeeping. The caller deletes the inbox file once
+    that transaction has committed; a crash in between leaves an unindexed
+    member behind and the file is archived again on the next run. A bundle
+    whose bytes are already packed (a re-submitted duplicate) is indexed
+    against the stored copy instead of being appended again.
+
+    Args:
+        projects_db: Connected master projects database, in a transaction
+        sync_file: Processed bundle file
+        archive_dir: Directory holding the packs
+        digest: bundle_digest() of the file, if already known
+        username: Sending PM (parsed from the file name if omitted)
+        archived_at: Archive time (now if omitted); picks the pack
+    """
+    stat = sync_file.stat()
+    digest = digest or bundle_digest(sync_file)
+    archived_at = archived_at or time.time()
+
+    stored = projects_db.fetchone("""
+        SELECT pack_file, pack_offset, packed_bytes FROM sync_archive_index
+        WHERE bundle_hash = ? ORDER BY bundle_id LIMIT 1
+    """, (digest,))
+    if stored and (archive_dir / stored['pack_file']).exists():
+        location = (stored['pack_file'], stored['pack_offset'], stored['packed_bytes'])
+    else:
+        pack_file = pack_path(archive_dir, archived_at)
+        location = (pack_file.name, *_append_member(pack_file, sync_file))
+
+    projects_db.execute(INSERT_INDEX_SQL, (
+        sync_file.name, digest, username or bundle_username(sync_file),
+        stat.st_mtime, archived_at, *location, stat.st_size
+    ))
+
+
+def read_archived_bundle(entry: Dict[str, Any], archive_dir: Path = ARCHIVE) -> bytes:
+    """Original bytes of an archived bundle, from its sync_archive_index row"""
+    with open(archive_dir / entry['pack_file'], 'rb') as pack:
+        pack.seek(entry['pack_offset'])
+        member = pack.read(entry['packed_bytes'])
+    return member if Path(entry['file_name']).suffix == VTB_SUFFIX else gzip.decompress(member)
+
+
+def extract_archived_bundle(entry: Dict[str, Any], dest_dir: Path, archive_dir: Path = ARCHIVE) -> Path:
+    """Write an archived bundle back out under its original file name"""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    target = dest_dir / entry['file_name']
+    target.write_bytes(read_archived_bundle(entry, archive_dir))
+    return target
+
+
+def recent_bundles(projects_db: MasterProjectsDB, limit: int = RECENT_BUNDLES) -> List[Dict[str, Any]]:
+    """Index rows of the most recently archived bundles, newest first"""
+    rows = projects_db.fetchall(
+        "SELECT * FROM sync_archive_index ORDER BY archived_at DESC LIMIT ?", (limit,)
+    )
+    return [dict(row) for row in rows]
+
+
+def archived_count(projects_db: Optional[MasterProjectsDB] = None) -> int:
+    """Number of processed bundles in the archive index"""
+    owns_connection = projects_db is None
+    if owns_connection:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+    try:
+        row = projects_db.fetchone("SELECT COUNT(*) as count FROM sync_archive_index")
+        return row['count'] if row else 0
+    finally:
+        if owns_connection:
+            projects_db.close()
+
+
+def pack_loose_files(projects_db: MasterProjectsDB, archive_dir: Path = ARCHIVE) -> int:
+    """
+    Move bundle files archived one per file (before packs) into packs
+
+    Files are packed oldest first, each into the pack for the day it was
+    archived, and indexed with that time.
+
+    Returns:
+        Number of files packed
+    """
+    loose = sorted(bundle_files(archive_dir), key=lambda path: (path.stat().st_mtime, path.name))
+    for sync_file in loose:
+        with projects_db.transaction():
+            archive_bundle(projects_db, sync_file, archive_dir, archived_at=sync_file.stat().st_mtime)
+        sync_file.unlink()
+    return len(loose)
+
+
+def _member_name(raw: bytes) -> Optional[str]:
+    """File name stored in a gzip member header (FNAME), if any"""
+    flags = raw[3] if len(raw) > 3 else 0
+    position = 10
+    if flags & 0x04:  # FEXTRA
+        position += 2 + int.from_bytes(raw[10:12], 'little')
+    if not flags & 0x08:  # FNAME
+        return None
+    end = raw.find(b'\0', position)
+    return raw[position:end].decode('latin-1') if end > position else None
+
+
+def _pack_members(pack_file: Path) -> Iterator[Tuple[int, bytes, bytes]]:
+    """
+    (offset, raw member, decompressed member) for each gzip member in a
+    pack, in append order; a truncated member at the end is ignored
+    """
+    offset = 0
+    leftover = b''
+    with open(pack_file, 'rb') as pack:
+        while True:
+            data = leftover or pack.read(PACK_COPY_CHUNK)
+            if not data:
+                return
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            raw, content = [], []
+            while True:
+                content.append(decompressor.decompress(data))
+                if decompressor.eof:
+                    leftover = decompressor.unused_data
+                    raw.append(data[:len(data) - len(leftover)])
+                    break
+                raw.append(data)
+                data = pack.read(PACK_COPY_CHUNK)
+                if not data:
+                    return
+            member = b''.join(raw)
+            yield offset, member, b''.join(content)
+            offset += len(member)
+
+
+def scan_packs(archive_dir: Path = ARCHIVE) -> List[Dict[str, Any]]:
+    """
+    Rebuild sync_archive_index entries by reading the packs themselves
+
+    For when the index in master cannot be trusted. Entries come back in
+    append order; file names are taken from the member headers (or made
+    up from the pack position), archive times are the pack's day and the
+    sender is parsed from the file name.
+    """
+    entries = []
+    for pack_file in sorted(archive_dir.glob(f"*{PACK_SUFFIX}")):
+        day = datetime.strptime(pack_file.stem.split('_')[-1], PACK_DATE_FORMAT).timestamp()
+        for offset, member, content in _pack_members(pack_file):
+            is_vtb = content.startswith(MAGIC)
+            original = member if is_vtb else content
+            suffix = VTB_SUFFIX if is_vtb else JSON_SUFFIX
+            name = (_member_name(member) or '').removesuffix('.part')
+            if Path(name).suffix != suffix:
+                name = f"{pack_file.stem}_{offset}{suffix}"
+            entries.append({
+                'file_name': name, 'bundle_hash': hashlib.sha256(original).hexdigest(),
+                'username': bundle_username(Path(name)), 'dropped_at': None, 'archived_at': day,
+                'pack_file': pack_file.name, 'pack_offset': offset, 'packed_bytes': len(member),
+                'size_bytes': len(original)
+            })
+    return entries
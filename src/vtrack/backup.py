@@ -5,10 +5,14 @@ Create and restore database backups
 
 import shutil
 import json
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
-from .database import DATA_DIR, G_DRIVE, LOCAL_DRIVE
+from .database import (
+    DATA_DIR, G_DRIVE, LOCAL_DRIVE, LocalProjectsDB, connection_pool, query_cache,
+    ensure_databases_initialized, reset_bootstrap
+)
 import streamlit as st
 
 
@@ -17,6 +21,21 @@ BACKUP_DIR = DATA_DIR / "backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def copy_database(source: Path, dest: Path):
+    """
+    Copy a SQLite database with the online backup API.
+    Unlike a file copy this includes commits still held in the WAL file and
+    writes into a live destination database safely.
+    """
+    src_conn = sqlite3.connect(str(source))
+    dest_conn = sqlite3.connect(str(dest))
+    try:
+        src_conn.backup(dest_conn)
+    finally:
+        dest_conn.close()
+        src_conn.close()
+
+
 class BackupManager:
     """Manage database backups"""
 
@@ -57,7 +76,7 @@ class BackupManager:
             for db_file in G_DRIVE.glob("*.db"):
                 dest = backup_folder / "master" / db_file.name
                 dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(db_file, dest)
+                copy_database(db_file, dest)
                 metadata['files_backed_up'].append(f"master/{db_file.name}")
 
             # Optionally backup local databases
@@ -65,7 +84,7 @@ class BackupManager:
                 for db_file in LOCAL_DRIVE.glob("*.db"):
                     dest = backup_folder / "local" / db_file.name
                     dest.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(db_file, dest)
+                    copy_database(db_file, dest)
                     metadata['files_backed_up'].append(f"local/{db_file.name}")
 
             # Backup project templates
@@ -161,6 +180,10 @@ Files:
             if not backup_folder.exists():
                 return False, "Backup not found"
 
+            # Drop pooled handles and cached results so nothing outlives the file it points at
+            connection_pool.close_idle()
+            query_cache.clear()
+
             # Restore master databases
             master_backup = backup_folder / "master"
             if master_backup.exists():
@@ -169,17 +192,21 @@ Files:
                     # Create backup of current before overwriting
                     if dest.exists():
                         backup_current = dest.parent / f"{dest.stem}_pre_restore_{datetime.now().strftime('%Y%m%d%H%M%S')}.db"
-                        shutil.copy2(dest, backup_current)
+                        copy_database(dest, backup_current)
 
-                    shutil.copy2(db_file, dest)
+                    copy_database(db_file, dest)
 
             # Optionally restore local databases
+            restored_users = []
             if restore_local:
                 local_backup = backup_folder / "local"
                 if local_backup.exists():
                     for db_file in local_backup.glob("*.db"):
                         dest = LOCAL_DRIVE / db_file.name
-                        shutil.copy2(db_file, dest)
+                        copy_database(db_file, dest)
+                        user_id = db_file.stem.removeprefix("my_projects_")
+                        if user_id.isdigit():
+                            restored_users.append(int(user_id))
 
             # Restore templates
             templates_backup = backup_folder / "templates"
@@ -187,6 +214,15 @@ Files:
                 templates_dir = G_DRIVE / "project_templates"
                 shutil.copytree(templates_backup, templates_dir, dirs_exist_ok=True)
 
+            # A backup taken before a schema change is migrated now, not on the next process start
+            reset_bootstrap()
+            ensure_databases_initialized()
+            for user_id in restored_users:
+                local_db = LocalProjectsDB(user_id)
+                local_db.connect()
+                local_db.initialize_schema()
+                local_db.close()
+
             return True, f"Backup restored successfully from {backup_folder_name}"
 
         except Exception as e:
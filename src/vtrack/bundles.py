@@ -0,0 +1,426 @@
+"""
+Sync bundle file formats for Verizon Tracker
+Streaming writer and reader for compressed .vtb bundles, with JSON as a fallback
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import re
+import struct
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# A .vtb file is a gzip stream holding MAGIC followed by frames. Each frame
+# is a 1-byte kind, a 4-byte big-endian payload length and a compact JSON
+# payload:
+#   H  header     {"version": 1, "bundle": {username, user_id, change_seq, ...}}
+#   T  table      {"table": name, "columns": [...]}, followed by its rows
+#   R  rows       [[values in the table's column order], ...], up to ROWS_PER_FRAME
+#   F  field      {"key": name, "value": ...} for other top-level entries (project_keys)
+#   E  end        {"rows": {table: count}}; a file without it is truncated
+MAGIC = b"VTB\x01"
+FORMAT_VERSION = 1
+FRAME_HEADER = struct.Struct(">cI")
+
+VTB_SUFFIX = ".vtb"
+JSON_SUFFIX = ".json"
+BUNDLE_SUFFIXES = (VTB_SUFFIX, JSON_SUFFIX)
+
+# Compressed output is handed to gzip in blocks of this size
+WRITE_BUFFER_BYTES = 256 * 1024
+
+# Parts of a multi-part bundle are named {stem}.p0001.vtb, {stem}.p0002.vtb, ...
+# and must be applied in part order
+PART_STEM = re.compile(r"^(?P<bundle>.+)\.p(?P<part>\d{4,})$")
+
+# Rows batched into one R frame (one json.loads per batch when reading)
+ROWS_PER_FRAME = 500
+
+# Rows per table kept by write_bundle() for manifest previews
+PREVIEW_ROWS = 5
+
+# Characters read per chunk by the incremental JSON bundle parser
+JSON_READ_CHUNK = 64 * 1024
+
+# Bytes read per chunk when hashing a bundle file
+DIGEST_READ_CHUNK = 1024 * 1024
+
+# A bundle is a stream of (kind, name, value) events:
+#   ('header', None, dict), ('table', name, columns), ('row', name, values),
+#   ('field', key, value)
+BundleEvent = Tuple[str, Optional[str], Any]
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def write_bundle(path: Path, events: Iterable[BundleEvent]) -> Dict[str, Any]:
+    """
+    Stream bundle events into a compressed .vtb file
+
+    The file is written under a .part name and renamed when complete, so
+    the inbox never shows a half-written bundle.
+
+    Args:
+        path: Destination file
+        events: Bundle events, header first
+
+    Returns:
+        Dictionary with the header, per-table row counts, the first
+        PREVIEW_ROWS rows of each table (as dicts) and the file size
+    """
+    partial = path.with_name(path.name + ".part")
+    header: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+    preview: Dict[str, List[Dict[str, Any]]] = {}
+    columns: Dict[str, List[str]] = {}
+    pending_rows: List[list] = []
+    buffer = bytearray(MAGIC)
+
+    def frame(kind: bytes, payload: Any):
+        data = _encode(payload)
+        buffer.extend(FRAME_HEADER.pack(kind, len(data)))
+        buffer.extend(data)
+
+    def flush_rows():
+        if pending_rows:
+            frame(b'R', pending_rows)
+            pending_rows.clear()
+
+    try:
+        with gzip.open(partial, 'wb') as out:
+            for kind, name, value in events:
+                if kind == 'row':
+                    counts[name] += 1
+                    if counts[name] <= PREVIEW_ROWS:
+                        preview[name].append(dict(zip(columns[name], value)))
+                    pending_rows.append(list(value))
+                    if len(pending_rows) >= ROWS_PER_FRAME:
+                        flush_rows()
+                elif kind == 'table':
+                    flush_rows()
+                    columns[name] = list(value)
+                    counts.setdefault(name, 0)
+                    preview.setdefault(name, [])
+                    frame(b'T', {'table': name, 'columns': columns[name]})
+                elif kind == 'header':
+                    header = dict(value)
+                    frame(b'H', {'version': FORMAT_VERSION, 'bundle': header})
+                elif kind == 'field':
+                    flush_rows()
+                    frame(b'F', {'key': name, 'value': value})
+                else:
+                    raise ValueError(f"Unknown bundle event '{kind}'")
+
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    out.write(buffer)
+                    buffer.clear()
+
+            flush_rows()
+            frame(b'E', {'rows': counts})
+            out.write(buffer)
+
+        partial.replace(path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    return {'header': header, 'counts': counts, 'preview': preview, 'size_bytes': path.stat().st_size}
+
+
+def iter_bundle(path: Path, tables: Optional[Collection[str]] = None) -> Iterator[BundleEvent]:
+    """
+    Stream events back out of a .vtb file without loading it
+
+    Args:
+        path: Bundle file
+        tables: Only decode and yield rows of these tables (None for all);
+            other row frames are skipped without being parsed
+
+    Raises:
+        ValueError: If the file is not a .vtb bundle, has an unsupported
+            version, or is truncated
+    """
+    with gzip.open(path, 'rb') as stream:
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path.name} is not a {VTB_SUFFIX} bundle")
+
+        table = None
+        counts: Dict[str, int] = {}
+        while True:
+            prefix = stream.read(FRAME_HEADER.size)
+            if len(prefix) < FRAME_HEADER.size:
+                raise ValueError(f"{path.name} is truncated")
+            kind, length = FRAME_HEADER.unpack(prefix)
+            payload = stream.read(length)
+            if len(payload) < length:
+                raise ValueError(f"{path.name} is truncated")
+
+            if kind == b'R':
+                if tables is None or table in tables:
+                    rows = json.loads(payload)
+                    counts[table] += len(rows)
+                    for row in rows:
+                        yield 'row', table, row
+                continue
+
+            value = json.loads(payload)
+            if kind == b'T':
+                table = value['table']
+                if tables is None or table in tables:
+                    counts.setdefault(table, 0)
+                yield 'table', table, value['columns']
+            elif kind == b'H':
+                if value.get('version') != FORMAT_VERSION:
+                    raise ValueError(f"{path.name} has unsupported bundle version {value.get('version')}")
+                yield 'header', None, value['bundle']
+            elif kind == b'F':
+                yield 'field', value['key'], value['value']
+            elif kind == b'E':
+                expected = {name: count for name, count in value['rows'].items() if name in counts}
+                if expected != counts:
+                    raise ValueError(f"{path.name} row counts do not match its trailer")
+                return
+            else:
+                raise ValueError(f"{path.name} has an unknown frame type {kind!r}")
+
+
+def bundle_events(bundle: Dict[str, Any]) -> Iterator[BundleEvent]:
+    """Events for an in-memory bundle (lists of rows become tables, dicts become fields)"""
+    yield 'header', None, {
+        key: value for key, value in bundle.items()
+        if not isinstance(value, (list, dict))
+    }
+
+    for key, value in bundle.items():
+        if isinstance(value, list):
+            columns = list(dict.fromkeys(column for row in value for column in row))
+            yield 'table', key, columns
+            for row in value:
+                yield 'row', key, [row.get(column) for column in columns]
+        elif isinstance(value, dict):
+            yield 'field', key, value
+
+
+def collect_bundle(events: Iterable[BundleEvent]) -> Dict[str, Any]:
+    """Materialize bundle events into the dict shape used by JSON bundles"""
+    bundle: Dict[str, Any] = {}
+    columns: Dict[str, List[str]] = {}
+    for kind, name, value in events:
+        if kind == 'row':
+            bundle[name].append(dict(zip(columns[name], value)))
+        elif kind == 'table':
+            columns[name] = value
+            bundle[name] = []
+        elif kind == 'header':
+            bundle.update(value)
+        elif kind == 'field':
+            bundle[name] = value
+    return bundle
+
+
+def load_bundle(path: Path) -> Dict[str, Any]:
+    """Read a .vtb or JSON bundle into a dict"""
+    if path.suffix == VTB_SUFFIX:
+        return collect_bundle(iter_bundle(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bundle_records(bundle: Dict[str, Any],
+                   tables: Optional[Collection[str]] = None) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Records of an in-memory bundle, in the shape iter_records() yields
+
+    Yields ('row', table, row dict) for each row of a list entry and
+    ('field', key, value) for every other top-level entry.
+    """
+    for key, value in bundle.items():
+        if isinstance(value, list):
+            if tables is None or key in tables:
+                for row in value:
+                    yield 'row', key, row
+        else:
+            yield 'field', key, value
+
+
+def iter_records(path: Path, tables: Optional[Collection[str]] = None) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Stream a bundle file (either format) one record at a time
+
+    Memory use depends on the largest single record, not on the size of
+    the bundle.
+
+    Args:
+        path: Bundle file
+        tables: Only yield rows of these tables (None for all)
+
+    Yields:
+        ('row', table, row dict) and ('field', key, value) tuples in file
+        order; .vtb header entries are yielded as fields first
+    """
+    if path.suffix != VTB_SUFFIX:
+        yield from _iter_json_records(path, tables)
+        return
+
+    columns: Dict[str, List[str]] = {}
+    for kind, name, value in iter_bundle(path, tables):
+        if kind == 'row':
+            yield 'row', name, dict(zip(columns[name], value))
+        elif kind == 'table':
+            columns[name] = value
+        elif kind == 'header':
+            for key, header_value in value.items():
+                yield 'field', key, header_value
+        else:
+            yield 'field', name, value
+
+
+class _JsonStream:
+    """Character reader that decodes one JSON value at a time from a file"""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(JSON_READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Malformed bundle: expected '{char}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the value at the cursor, reading more of the file as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise ValueError("Malformed bundle: truncated value")
+            self._fill()
+
+
+def _iter_json_records(path: Path, tables: Optional[Collection[str]]) -> Iterator[Tuple[str, str, Any]]:
+    """Incremental parser for JSON bundles: top-level object, row lists decoded element by element"""
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+
+        while True:
+            key = stream.value()
+            stream.expect(':')
+
+            if stream.peek() == '[':
+                stream.pos += 1
+                if stream.peek() == ']':
+                    stream.pos += 1
+                else:
+                    while True:
+                        row = stream.value()
+                        if tables is None or key in tables:
+                            yield 'row', key, row
+                        if stream.peek() == ',':
+                            stream.pos += 1
+                            continue
+                        stream.expect(']')
+                        break
+            else:
+                yield 'field', key, stream.value()
+
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return
+
+
+def bundle_digest(path: Path) -> str:
+    """SHA-256 of a bundle file's bytes (identifies re-submitted bundles)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(DIGEST_READ_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def part_file_name(stem: str, part: int, suffix: str = VTB_SUFFIX) -> str:
+    """File name of part `part` (1-based) of a multi-part bundle"""
+    return f"{stem}.p{part:04d}{suffix}"
+
+
+def bundle_part(path: Path) -> Optional[Tuple[str, int]]:
+    """(bundle stem, part number) for a part file, or None for a single-file bundle"""
+    match = PART_STEM.match(path.stem)
+    if not match:
+        return None
+    return match.group('bundle'), int(match.group('part'))
+
+
+def bundle_username(path: Path) -> str:
+    """PM username in a bundle file name (sync_{username}_{date}_{time}[.pNNNN])"""
+    part = bundle_part(path)
+    pieces = (part[0] if part else path.stem).split('_')
+    if len(pieces) >= 4 and pieces[0] == 'sync':
+        return '_'.join(pieces[1:-2])
+    return 'Unknown'
+
+
+def earlier_parts(path: Path) -> List[Path]:
+    """Earlier parts of the same multi-part bundle still present next to path, lowest first"""
+    part = bundle_part(path)
+    if part is None:
+        return []
+    stem, number = part
+    earlier = []
+    for candidate in path.parent.glob(glob.escape(stem) + ".p*"):
+        other = bundle_part(candidate)
+        if is_bundle_file(candidate) and other and other[0] == stem and other[1] < number:
+            earlier.append((other[1], candidate))
+    return [candidate for _, candidate in sorted(earlier)]
+
+
+def is_bundle_file(path: Path) -> bool:
+    return path.suffix in BUNDLE_SUFFIXES
+
+
+def bundle_files(directory: Path) -> List[Path]:
+    """Bundle files (either format) in a directory"""
+    if not directory.exists():
+        return []
+    return [path for path in directory.iterdir() if path.is_file() and is_bundle_file(path)]
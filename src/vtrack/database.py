@@ -5,9 +5,12 @@ Handles all database operations for master and local databases
 
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterable
 
 # Directory paths
 BASE_DIR = Path(__file__).parent.parent.parent
@@ -16,37 +19,494 @@ LOCAL_DRIVE = DATA_DIR / "LOCAL_DRIVE"
 G_DRIVE = DATA_DIR / "G_DRIVE"
 SYNC_INBOX = G_DRIVE / "SYNC_INBOX"
 ARCHIVE = G_DRIVE / "ARCHIVE"
+SYNC_OUTBOX = LOCAL_DRIVE / "SYNC_OUTBOX"
 
 # Ensure directories exist
-for directory in [DATA_DIR, LOCAL_DRIVE, G_DRIVE, SYNC_INBOX, ARCHIVE]:
+for directory in [DATA_DIR, LOCAL_DRIVE, G_DRIVE, SYNC_INBOX, ARCHIVE, SYNC_OUTBOX]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# SQLite pragma profiles applied to every new connection.
+# WAL lets readers proceed while a writer commits; it relies on a shared-memory
+# index, so every process opening a WAL database must run on the same host
+# (switch journal_mode to 'DELETE' if master files are opened over SMB/NFS).
+MASTER_DB_PRAGMAS = {
+    'busy_timeout': 10000,  # ms to wait on a locked database before SQLITE_BUSY
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # Safe with WAL; fsync on checkpoint, not every commit
+    'cache_size': -32000,  # Negative = KiB (32 MB page cache)
+    'mmap_size': 268435456,  # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY'
+}
+
+LOCAL_DB_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -8000,
+    'mmap_size': 67108864,
+    'temp_store': 'MEMORY'
+}
+
+CONFIG_DB_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -2000,
+    'mmap_size': 0,
+    'temp_store': 'MEMORY'
+}
+
+# Column typing for fetch_frame() - low-cardinality text as categoricals,
+# SQLite date/timestamp strings as native datetime64
+FRAME_CHUNK_SIZE = 5000
+PROJECT_FRAME_DTYPES = {'status': 'category', 'phase': 'category'}
+PROJECT_DATE_COLUMNS = ['rft_date', 'project_start_date', 'project_complete_date', 'created_at', 'updated_at']
+KPI_FRAME_DTYPES = {'budget_status': 'category', 'schedule_status': 'category'}
+KPI_DATE_COLUMNS = ['snapshot_date', 'created_at']
+
+# Connection pool settings
+POOL_IDLE_TIMEOUT = 300  # Seconds an idle pooled connection stays open
+POOL_MAX_IDLE_PER_KEY = 4  # Idle connections kept per (database, thread)
+POOL_REAP_INTERVAL = 30  # Minimum seconds between idle sweeps
+
+# Shared query cache
+QUERY_CACHE_MAX_ENTRIES = 64  # Result sets kept across all sessions (LRU)
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of SQLite connections keyed by database path and thread.
+    Database.connect() checks a connection out and Database.close() returns it,
+    so repeated open/close cycles on the same file reuse one handle.
+    """
+
+    def __init__(self, idle_timeout: float = POOL_IDLE_TIMEOUT,
+                 max_idle_per_key: int = POOL_MAX_IDLE_PER_KEY):
+        self.idle_timeout = idle_timeout
+        self.max_idle_per_key = max_idle_per_key
+        self._lock = threading.Lock()
+        self._idle: Dict[tuple, List[tuple]] = {}  # key -> [(conn, released_at)]
+        self._in_use = 0
+        self._last_reap = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.reaped = 0
+
+    @staticmethod
+    def _key(db_path: str) -> tuple:
+        return (os.path.abspath(db_path), threading.get_ident())
+
+    def acquire(self, db_path: str, factory) -> sqlite3.Connection:
+        """
+        Check out a connection for the current thread
+
+        Args:
+            db_path: Path of the database file
+            factory: Callable that opens a new connection on a pool miss
+
+        Returns:
+            sqlite3 connection owned by the caller until release()
+        """
+        key = self._key(db_path)
+
+        with self._lock:
+            self._maybe_reap()
+            idle = self._idle.get(key)
+            if idle:
+                conn, _ = idle.pop()
+                self.hits += 1
+                self._in_use += 1
+                return conn
+            self.misses += 1
+
+        conn = factory()
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def release(self, db_path: str, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back any open transaction"""
+        key = self._key(db_path)
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken handle - drop it instead of pooling it
+            with self._lock:
+                self._in_use -= 1
+            self._close_quietly(conn)
+            return
+
+        with self._lock:
+            self._in_use -= 1
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append((conn, time.monotonic()))
+                conn = None
+            self._maybe_reap()
+
+        if conn is not None:
+            self._close_quietly(conn)
+
+    def reap_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        """
+        Close idle connections older than the timeout or owned by dead threads
+
+        Returns:
+            Number of connections closed
+        """
+        with self._lock:
+            stale = self._collect_stale(max_idle_seconds)
+
+        for conn in stale:
+            self._close_quietly(conn)
+        return len(stale)
+
+    def close_idle(self, db_path: Optional[str] = None) -> int:
+        """
+        Close every idle connection, optionally only those for one database.
+        Used before database files are replaced on disk (e.g. backup restore).
+
+        Returns:
+            Number of connections closed
+        """
+        target = os.path.abspath(db_path) if db_path else None
+        closed = []
+
+        with self._lock:
+            for key in list(self._idle.keys()):
+                if target is None or key[0] == target:
+                    closed.extend(conn for conn, _ in self._idle.pop(key))
+
+        for conn in closed:
+            self._close_quietly(conn)
+        return len(closed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool hit/miss counters and open handle counts"""
+        with self._lock:
+            idle = sum(len(conns) for conns in self._idle.values())
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                'in_use': self._in_use,
+                'idle': idle,
+                'open_handles': self._in_use + idle,
+                'reaped': self.reaped
+            }
+
+    def _maybe_reap(self):
+        """Sweep idle connections at most once per POOL_REAP_INTERVAL (lock held)"""
+        now = time.monotonic()
+        if now - self._last_reap < POOL_REAP_INTERVAL:
+            return
+        stale = self._collect_stale(None)
+        for conn in stale:
+            self._close_quietly(conn)
+
+    def _collect_stale(self, max_idle_seconds: Optional[float]) -> List[sqlite3.Connection]:
+        """Remove and return stale idle connections (lock held)"""
+        timeout = self.idle_timeout if max_idle_seconds is None else max_idle_seconds
+        now = time.monotonic()
+        alive_threads = {t.ident for t in threading.enumerate()}
+        stale = []
+
+        for key in list(self._idle.keys()):
+            keep = []
+            for conn, released_at in self._idle[key]:
+                if key[1] not in alive_threads or now - released_at >= timeout:
+                    stale.append(conn)
+                else:
+                    keep.append((conn, released_at))
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+        self._last_reap = now
+        self.reaped += len(stale)
+        return stale
+
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# Shared pool used by every Database instance in this process
+connection_pool = ConnectionPool()
+
+
+class QueryCache:
+    """
+    Process-wide read cache shared by every Streamlit session.
+    Results are keyed by (database, query, params) and stamped with the
+    database's PRAGMA data_version, so they are reused until some connection
+    - in this process or another - commits a change to that file.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        from collections import OrderedDict
+
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (token, result)
+        self._fill_locks: Dict[tuple, threading.Lock] = {}
+        self._probes: Dict[str, tuple] = {}  # db path -> (conn, schemas, lock)
+        self.hits = 0
+        self.misses = 0
+
+    def fetch(self, db: 'Database', key: tuple, loader):
+        """
+        Return a cached result for key, running loader() on a miss
+
+        Concurrent misses for the same key wait for a single loader() call
+        instead of all querying SQLite.
+
+        Args:
+            db: Connected database the query runs against
+            key: Hashable description of the query (kind, SQL, params, options)
+            loader: Callable that runs the query on db
+
+        Returns:
+            The cached or freshly loaded result
+        """
+        if db.in_transaction:
+            # Uncommitted writes are only visible on db's own connection
+            return loader()
+
+        cache_key = (os.path.abspath(db.db_path),) + key
+        with self._lock:
+            fill_lock = self._fill_locks.setdefault(cache_key, threading.Lock())
+
+        with fill_lock:
+            # Read the version before querying: a commit that lands mid-query
+            # then just causes one extra reload instead of a stale entry
+            token = self.data_version(db)
+            with self._lock:
+                entry = self._entries.get(cache_key)
+                if entry is not None and entry[0] == token:
+                    self._entries.move_to_end(cache_key)
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            result = loader()
+
+            with self._lock:
+                self._entries[cache_key] = (token, result)
+                self._entries.move_to_end(cache_key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._fill_locks.pop(evicted, None)
+            return result
+
+    def data_version(self, db: 'Database') -> tuple:
+        """
+        Current change token for db's file and every database attached to it
+
+        Uses a dedicated probe connection that never writes: data_version on a
+        connection only moves when *other* connections commit, so a probe
+        shared by all threads sees every write, including this process's own.
+        """
+        path = os.path.abspath(db.db_path)
+        with self._lock:
+            probe = self._probes.get(path)
+        if probe is None:
+            conn = db._open_connection()
+            schemas = [row[1] for row in conn.execute("PRAGMA database_list") if row[1] != 'temp']
+            probe = (conn, schemas, threading.Lock())
+            with self._lock:
+                probe = self._probes.setdefault(path, probe)
+            if probe[0] is not conn:
+                ConnectionPool._close_quietly(conn)
+
+        conn, schemas, probe_lock = probe
+        with probe_lock:
+            return tuple(conn.execute(f"PRAGMA {schema}.data_version").fetchone()[0] for schema in schemas)
+
+    def clear(self):
+        """Drop every cached result and probe (e.g. after database files are replaced)"""
+        with self._lock:
+            self._entries.clear()
+            self._fill_locks.clear()
+            probes = list(self._probes.values())
+            self._probes.clear()
+
+        for conn, _, _ in probes:
+            ConnectionPool._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counters and entry count"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+
+# Shared result cache used by the portfolio-wide pages
+query_cache = QueryCache()
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Dict[str, Any]):
+    """Apply a pragma profile to an open connection (busy_timeout first)"""
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}").fetchall()
+
 
 class Database:
     """Base database class with common operations"""
 
+    # Pragma profile applied when the pool opens a new connection
+    PRAGMAS: Dict[str, Any] = {}
+
+    # Numbered schema migrations: (version, description, step) where step is a
+    # list of SQL statements or a method taking the database instance
+    MIGRATIONS: List[tuple] = []
+
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.conn = None
+        self._transaction_depth = 0
 
     def connect(self):
-        """Establish database connection"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        """Check out a pooled database connection for this thread"""
+        if self.conn is None:
+            self.conn = connection_pool.acquire(self.db_path, self._open_connection)
         self.conn.row_factory = sqlite3.Row
         return self.conn
 
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a new connection (called by the pool on a miss)"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        apply_pragmas(conn, self.PRAGMAS)
+        return conn
+
+    def get_pragmas(self) -> Dict[str, Any]:
+        """Read back the current value of every pragma in this database's profile"""
+        return {
+            name: self.conn.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in self.PRAGMAS
+        }
+
     def close(self):
-        """Close database connection"""
+        """Return database connection to the pool"""
         if self.conn:
-            self.conn.close()
+            connection_pool.release(self.db_path, self.conn)
+            self.conn = None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into a single commit
+
+        Statements run inside the block are committed together when it exits
+        and rolled back if it raises. Nested blocks become savepoints, so an
+        inner failure only undoes the inner block.
+        """
+        depth = self._transaction_depth
+        savepoint = f"vtrack_sp_{depth}"
+
+        if depth == 0:
+            # Take the write lock up front so a read->write upgrade can't deadlock
+            self.conn.execute("BEGIN IMMEDIATE")
+        else:
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.conn.rollback()
+            else:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.conn.commit()
+            else:
+                self.conn.execute(f"RELEASE {savepoint}")
+
+    @property
+    def in_transaction(self) -> bool:
+        """True while inside a transaction() block"""
+        return self._transaction_depth > 0
+
+    def _autocommit(self):
+        """Commit unless an enclosing transaction() will do it"""
+        if self._transaction_depth == 0:
+            self.conn.commit()
 
     def execute(self, query: str, params: tuple = ()):
-        """Execute a query and commit"""
+        """Execute a query and commit (deferred inside transaction())"""
         cursor = self.conn.cursor()
         cursor.execute(query, params)
-        self.conn.commit()
+        self._autocommit()
+        return cursor
+
+    def executemany(self, query: str, seq_of_params: Iterable[tuple]):
+        """Execute a query once per parameter tuple with a single commit"""
+        cursor = self.conn.cursor()
+        cursor.executemany(query, seq_of_params)
+        self._autocommit()
         return cursor
 
+    def schema_version(self) -> int:
+        """Get the schema version stamped in PRAGMA user_version"""
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @classmethod
+    def latest_schema_version(cls) -> int:
+        """Highest version defined in MIGRATIONS"""
+        return max((version for version, _, _ in cls.MIGRATIONS), default=0)
+
+    def migrate(self) -> List[int]:
+        """
+        Apply pending migrations in version order
+
+        Each migration runs in its own transaction together with the
+        user_version bump, so a failure leaves the database at the last
+        fully applied version. The version is read again under the write
+        lock, so a migration another process (the app and the inbox daemon
+        starting together) applied meanwhile is skipped.
+
+        Returns:
+            List of versions applied
+        """
+        current = self.schema_version()
+        applied = []
+
+        for version, description, step in sorted(self.MIGRATIONS, key=lambda m: m[0]):
+            if version <= current:
+                continue
+
+            with self.transaction():
+                if self.schema_version() >= version:
+                    continue
+                if callable(step):
+                    step(self)
+                else:
+                    for statement in step:
+                        self.execute(statement)
+                self.execute(f"PRAGMA user_version = {int(version)}")
+
+            applied.append(version)
+
+        return applied
+
     def fetchall(self, query: str, params: tuple = ()):
         """Fetch all results from a query"""
         cursor = self.conn.cursor()
@@ -59,15 +519,120 @@ class Database:
         cursor.execute(query, params)
         return cursor.fetchone()
 
+    def fetch_records(self, query: str, params: tuple = (), record_type=None):
+        """
+        Fetch all results as compact record objects instead of sqlite3.Row
+
+        Args:
+            query: SQL query
+            params: Query parameters
+            record_type: Record subclass from vtrack.records (e.g. ProjectRecord)
+
+        Returns:
+            List of record_type instances
+        """
+        from .records import record_factory
+
+        cursor = self.conn.cursor()
+        cursor.row_factory = record_factory(record_type)
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def fetch_frame(self, query: str, params: tuple = (), dtypes: Optional[Dict[str, Any]] = None,
+                    parse_dates: Optional[List[str]] = None, chunk_size: int = FRAME_CHUNK_SIZE):
+        """
+        Run a query straight into a pandas DataFrame
+
+        Rows are read as plain tuples in chunks and appended column by column,
+        skipping the per-record sqlite3.Row and dict that
+        pd.DataFrame([dict(r) for r in rows]) builds.
+
+        Args:
+            query: SQL query
+            params: Query parameters
+            dtypes: Column -> dtype to apply (e.g. {'status': 'category'})
+            parse_dates: Columns to convert to datetime64 (unparseable values become NaT)
+            chunk_size: Rows fetched from the cursor per batch
+
+        Returns:
+            DataFrame with the query's columns (empty but typed if no rows)
+        """
+        import pandas as pd
+
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+
+        columns = [description[0] for description in cursor.description]
+        data = [[] for _ in columns]
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for column_data, values in zip(data, zip(*rows)):
+                column_data.extend(values)
+
+        # Keyed by position so duplicate column names survive
+        frame = pd.DataFrame({i: column_data for i, column_data in enumerate(data)},
+                             columns=range(len(columns)))
+        frame.columns = columns
+
+        for column in parse_dates or []:
+            if column in frame.columns:
+                frame[column] = pd.to_datetime(frame[column], errors='coerce', format='ISO8601')
+
+        for column, dtype in (dtypes or {}).items():
+            if column in frame.columns:
+                frame[column] = frame[column].astype(dtype)
+
+        return frame
+
+    def cached_fetchall(self, query: str, params: tuple = ()):
+        """
+        fetchall() through the shared query cache
+
+        Rows are reused across sessions until the database changes. Use for
+        read-only portfolio queries that many users run with the same params.
+        """
+        return list(query_cache.fetch(
+            self, ('fetchall', query, tuple(params)),
+            lambda: self.fetchall(query, params)
+        ))
+
+    def cached_fetch_frame(self, query: str, params: tuple = (), dtypes: Optional[Dict[str, Any]] = None,
+                           parse_dates: Optional[List[str]] = None):
+        """
+        fetch_frame() through the shared query cache
+
+        Each caller gets its own copy of the cached frame, so pages can add or
+        reassign columns without affecting other sessions.
+        """
+        key = (
+            'frame', query, tuple(params),
+            tuple(sorted((dtypes or {}).items())), tuple(parse_dates or ())
+        )
+        frame = query_cache.fetch(
+            self, key,
+            lambda: self.fetch_frame(query, params, dtypes=dtypes, parse_dates=parse_dates)
+        )
+        return frame.copy()
+
 
 class MasterUsersDB(Database):
     """Master users database - stores all user credentials and roles"""
 
+    PRAGMAS = MASTER_DB_PRAGMAS
+
     def __init__(self):
         db_path = G_DRIVE / "master_users.db"
         super().__init__(str(db_path))
 
     def initialize_schema(self):
+        """Create users table and apply pending migrations"""
+        self.migrate()
+
+    def _schema_v1(self):
         """Create users table"""
         self.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -106,15 +671,83 @@ class MasterUsersDB(Database):
                 VALUES (?, ?, ?, ?, ?, ?)
             """, ("pmuser", hashed.decode('utf-8'), "PM User", "pm@verizon.com", "Sr. Project Manager", 1))
 
+    MIGRATIONS = [
+        (1, "Base schema", _schema_v1),
+        (2, "Default users", create_default_users),
+    ]
+
 
 class MasterProjectsDB(Database):
     """Master projects database - central repository for all project data"""
 
+    PRAGMAS = MASTER_DB_PRAGMAS
+
+    # Aliases master_users.db and config.db are attached under on every connection.
+    # They are attached read-only: BEGIN IMMEDIATE takes the write lock on every
+    # attached file, so a writable attachment would block user and setting
+    # changes for as long as an ingest holds master's write lock. Writes to
+    # them go through MasterUsersDB and ConfigDB.
+    USERS_SCHEMA = "users_db"
+    CONFIG_SCHEMA = "config_db"
+
+    # Cross-database views, created per connection (TEMP views may span attached files)
+    SHARED_VIEWS = {
+        "project_with_pm": """
+            SELECT
+                p.*,
+                u.full_name as pm_name,
+                u.role as pm_role,
+                prog.program_name,
+                pt.type_name as project_type
+            FROM main.projects p
+            LEFT JOIN users_db.users u ON p.pm_id = u.user_id
+            LEFT JOIN main.programs prog ON p.program_id = prog.program_id
+            LEFT JOIN main.project_types pt ON p.project_type_id = pt.type_id
+        """,
+        "activity_with_user": """
+            SELECT
+                ua.*,
+                COALESCE(u.full_name, 'Unknown User') as user_name,
+                p.name as project_name
+            FROM main.user_activity ua
+            LEFT JOIN users_db.users u ON ua.user_id = u.user_id
+            LEFT JOIN main.projects p ON ua.related_project_id = p.project_id
+        """
+    }
+
+    # Tables PMs pull into their local databases, with their primary keys
+    PULLED_TABLES = [
+        ('projects', 'project_id'),
+        ('kpi_snapshots', 'snapshot_id'),
+        ('project_dependencies', 'dependency_id'),
+        ('project_contacts', 'contact_id'),
+    ]
+
     def __init__(self):
         db_path = G_DRIVE / "master_projects.db"
         super().__init__(str(db_path))
 
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open master with the users and config databases attached read-only"""
+        conn = super()._open_connection()
+
+        attachments = [
+            (G_DRIVE / "master_users.db", self.USERS_SCHEMA),
+            (G_DRIVE / "config.db", self.CONFIG_SCHEMA)
+        ]
+        for path, alias in attachments:
+            conn.execute("ATTACH DATABASE ? AS " + alias, (f"{path.resolve().as_uri()}?mode=ro",))
+
+        for name, body in self.SHARED_VIEWS.items():
+            conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {name} AS {body}")
+
+        return conn
+
     def initialize_schema(self):
+        """Create all master tables and apply pending migrations"""
+        self.migrate()
+
+    def _schema_v1(self):
         """Create all master tables"""
 
         # Programs table
@@ -302,16 +935,178 @@ class MasterProjectsDB(Database):
             except sqlite3.IntegrityError:
                 pass  # Already exists
 
+    def _schema_v7(self):
+        """
+        Trigger-maintained change sequence for pull sync
+
+        Every insert or update on a pulled table stamps the row with the next
+        value of change_sequence.seq, so a PM's local database can fetch just
+        the rows changed since the sequence number it last pulled. Existing
+        rows start at 1 and are picked up by a first full pull.
+        """
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS change_sequence (
+                sequence_id INTEGER PRIMARY KEY CHECK(sequence_id = 1),
+                seq INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.execute("INSERT OR IGNORE INTO change_sequence (sequence_id, seq) VALUES (1, 1)")
+
+        for table, key in MasterProjectsDB.PULLED_TABLES:
+            self.execute(f"ALTER TABLE {table} ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 1")
+
+            # The inner UPDATE changes change_seq, so the WHEN clause stops it re-firing
+            for operation, condition in (('insert', ''), ('update', 'WHEN NEW.change_seq IS OLD.change_seq')):
+                self.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_seq_{operation}
+                    AFTER {operation.upper()} ON {table}
+                    {condition}
+                    BEGIN
+                        UPDATE change_sequence SET seq = seq + 1 WHERE sequence_id = 1;
+                        UPDATE {table}
+                        SET change_seq = (SELECT seq FROM change_sequence WHERE sequence_id = 1)
+                        WHERE {key} = NEW.{key};
+                    END
+                """)
+
+        self.execute("CREATE INDEX IF NOT EXISTS idx_projects_pm_change_seq ON projects(pm_id, change_seq)")
+        for table, _ in MasterProjectsDB.PULLED_TABLES[1:]:
+            self.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table}(change_seq)")
+
+    def change_sequence_head(self) -> int:
+        """Last change sequence number stamped on a pulled row"""
+        result = self.fetchone("SELECT seq FROM change_sequence WHERE sequence_id = 1")
+        return result['seq'] if result else 0
+
+    MIGRATIONS = [
+        (1, "Base schema", _schema_v1),
+        (2, "Hot-path indexes", [
+            "CREATE INDEX IF NOT EXISTS idx_projects_pm_status ON projects(pm_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status)",
+            "CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects(updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_kpi_project_date ON kpi_snapshots(project_id, snapshot_date)",
+            "CREATE INDEX IF NOT EXISTS idx_kpi_snapshot_date ON kpi_snapshots(snapshot_date)",
+            "CREATE INDEX IF NOT EXISTS idx_activity_user_created ON user_activity(user_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_activity_created ON user_activity(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_dependencies_project ON project_dependencies(project_id)",
+            "CREATE INDEX IF NOT EXISTS idx_contacts_project ON project_contacts(project_id)",
+        ]),
+        (3, "Default programs and project types", create_default_data),
+        (4, "Sync source keys for ingested child records", [
+            "ALTER TABLE kpi_snapshots ADD COLUMN source_user_id INTEGER",
+            "ALTER TABLE kpi_snapshots ADD COLUMN source_local_id INTEGER",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_kpi_source ON kpi_snapshots(source_user_id, source_local_id)",
+            "ALTER TABLE project_dependencies ADD COLUMN source_user_id INTEGER",
+            "ALTER TABLE project_dependencies ADD COLUMN source_local_id INTEGER",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_dependencies_source ON project_dependencies(source_user_id, source_local_id)",
+            "ALTER TABLE project_contacts ADD COLUMN source_user_id INTEGER",
+            "ALTER TABLE project_contacts ADD COLUMN source_local_id INTEGER",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_source ON project_contacts(source_user_id, source_local_id)",
+        ]),
+        (5, "Sync inbox manifest", [
+            """
+            CREATE TABLE IF NOT EXISTS sync_inbox_manifest (
+                file_name TEXT PRIMARY KEY,
+                username TEXT,
+                user_id INTEGER,
+                sync_timestamp TEXT,
+                projects INTEGER DEFAULT 0,
+                kpis INTEGER DEFAULT 0,
+                dependencies INTEGER DEFAULT 0,
+                contacts INTEGER DEFAULT 0,
+                size_bytes INTEGER,
+                file_mtime REAL,
+                project_preview TEXT,
+                error TEXT,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ]),
+        (6, "Sync ingest latency log", [
+            """
+            CREATE TABLE IF NOT EXISTS sync_ingest_log (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_name TEXT NOT NULL,
+                username TEXT,
+                dropped_at REAL,
+                applied_at REAL NOT NULL,
+                latency_seconds REAL,
+                apply_seconds REAL,
+                projects INTEGER DEFAULT 0,
+                kpis INTEGER DEFAULT 0,
+                dependencies INTEGER DEFAULT 0,
+                contacts INTEGER DEFAULT 0
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_ingest_log_applied ON sync_ingest_log(applied_at)",
+        ]),
+        (7, "Change sequence for pull sync", _schema_v7),
+        (8, "Sync ingest ledger", [
+            """
+            CREATE TABLE IF NOT EXISTS sync_ingest_ledger (
+                bundle_hash TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                username TEXT,
+                status TEXT NOT NULL CHECK(status IN ('applied', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 1,
+                projects INTEGER DEFAULT 0,
+                kpis INTEGER DEFAULT 0,
+                dependencies INTEGER DEFAULT 0,
+                contacts INTEGER DEFAULT 0,
+                error TEXT,
+                first_seen_at REAL NOT NULL,
+                applied_at REAL
+            )
+            """,
+        ]),
+        (9, "Packed sync archive index", [
+            """
+            CREATE TABLE IF NOT EXISTS sync_archive_index (
+                bundle_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_name TEXT NOT NULL,
+                bundle_hash TEXT NOT NULL,
+                username TEXT,
+                dropped_at REAL,
+                archived_at REAL NOT NULL,
+                pack_file TEXT NOT NULL,
+                pack_offset INTEGER NOT NULL,
+                packed_bytes INTEGER NOT NULL,
+                size_bytes INTEGER
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_archive_archived_at ON sync_archive_index(archived_at)",
+            "CREATE INDEX IF NOT EXISTS idx_archive_user ON sync_archive_index(username, archived_at)",
+            "CREATE INDEX IF NOT EXISTS idx_archive_hash ON sync_archive_index(bundle_hash)",
+        ]),
+    ]
+
 
 class LocalProjectsDB(Database):
     """Local user database - mirrors master structure with sync tracking"""
 
+    PRAGMAS = LOCAL_DB_PRAGMAS
+
+    # Tables pushed to master in sync bundles, with their local primary keys
+    SYNCED_TABLES = [
+        ('projects', 'local_id'),
+        ('kpi_snapshots', 'local_snapshot_id'),
+        ('project_dependencies', 'local_dependency_id'),
+        ('project_contacts', 'local_contact_id'),
+    ]
+
+    # Project columns whose edits are never shipped to master as deltas
+    DELTA_IGNORED_COLUMNS = ('local_id', 'master_project_id', 'sync_status', 'created_at', 'updated_at')
+
     def __init__(self, user_id: int):
         db_path = LOCAL_DRIVE / f"my_projects_{user_id}.db"
         super().__init__(str(db_path))
         self.user_id = user_id
 
     def initialize_schema(self):
+        """Create local tables and apply pending migrations"""
+        self.migrate()
+
+    def _schema_v1(self):
         """Create local tables with sync_status fields"""
 
         # Local projects table
@@ -411,15 +1206,172 @@ class LocalProjectsDB(Database):
             )
         """)
 
+    def _schema_v3(self):
+        """
+        Trigger-maintained change log replacing sync_status scans
+
+        Every insert or update on a synced table appends (table, row, seq) to
+        change_log. Rows logged after sync_watermark.acked_seq are pending;
+        the sync_status column is kept for old bundles but no longer read.
+        """
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                operation TEXT NOT NULL CHECK(operation IN ('insert', 'update')),
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.execute("CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log(table_name, row_id)")
+
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS sync_watermark (
+                watermark_id INTEGER PRIMARY KEY CHECK(watermark_id = 1),
+                acked_seq INTEGER NOT NULL DEFAULT 0,
+                acked_at TIMESTAMP
+            )
+        """)
+        self.execute("INSERT OR IGNORE INTO sync_watermark (watermark_id, acked_seq) VALUES (1, 0)")
+
+        for table, key in self.SYNCED_TABLES:
+            # Carry over rows that were still pending under sync_status
+            self.execute(f"""
+                INSERT INTO change_log (table_name, row_id, operation)
+                SELECT '{table}', {key}, CASE sync_status WHEN 'new' THEN 'insert' ELSE 'update' END
+                FROM {table}
+                WHERE sync_status IN ('new', 'updated')
+                ORDER BY {key}
+            """)
+
+            for operation in ('insert', 'update'):
+                self.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_log_{operation}
+                    AFTER {operation.upper()} ON {table}
+                    BEGIN
+                        INSERT INTO change_log (table_name, row_id, operation)
+                        VALUES ('{table}', NEW.{key}, '{operation}');
+                    END
+                """)
+
+        self.execute("""
+            CREATE VIEW IF NOT EXISTS pending_changes AS
+            SELECT
+                table_name,
+                row_id,
+                CASE WHEN MAX(operation = 'insert') = 1 THEN 'new' ELSE 'updated' END AS sync_status,
+                MAX(seq) AS last_seq
+            FROM change_log
+            WHERE seq > (SELECT acked_seq FROM sync_watermark WHERE watermark_id = 1)
+            GROUP BY table_name, row_id
+        """)
+
+    def _schema_v5(self):
+        """
+        Column-level change tracking for projects
+
+        The projects update trigger records which tracked columns an UPDATE
+        actually changed (comma-separated in change_log.changed_columns) and
+        logs nothing when none did, so saving an unchanged row is no longer
+        a pending change. The trigger lists the columns present when it is
+        created; a migration adding a project column must recreate it.
+        """
+        self.execute("ALTER TABLE change_log ADD COLUMN changed_columns TEXT")
+
+        columns = [
+            row['name'] for row in self.fetchall("PRAGMA table_info(projects)")
+            if row['name'] not in self.DELTA_IGNORED_COLUMNS
+        ]
+        changed = " || ".join(
+            f"CASE WHEN NEW.{column} IS NOT OLD.{column} THEN '{column},' ELSE '' END" for column in columns
+        )
+
+        self.execute("DROP TRIGGER IF EXISTS trg_projects_log_update")
+        self.execute(f"""
+            CREATE TRIGGER trg_projects_log_update
+            AFTER UPDATE ON projects
+            WHEN {' OR '.join(f'NEW.{column} IS NOT OLD.{column}' for column in columns)}
+            BEGIN
+                INSERT INTO change_log (table_name, row_id, operation, changed_columns)
+                VALUES ('projects', NEW.local_id, 'update', rtrim({changed}, ','));
+            END
+        """)
+
+    def change_log_head(self) -> int:
+        """Highest change sequence number written so far (0 if none)"""
+        result = self.fetchone("SELECT COALESCE(MAX(seq), 0) as seq FROM change_log")
+        return result['seq']
+
+    def sync_watermark(self) -> int:
+        """Sequence number up to which changes have been acknowledged as synced"""
+        result = self.fetchone("SELECT acked_seq FROM sync_watermark WHERE watermark_id = 1")
+        return result['acked_seq'] if result else 0
+
+    def acknowledge_changes(self, through_seq: int):
+        """
+        Mark every change up to through_seq as synced
+
+        Changes logged after through_seq (e.g. edits made while a bundle was
+        being written) stay pending for the next sync.
+
+        Args:
+            through_seq: Last change sequence number included in the bundle
+        """
+        with self.transaction():
+            self.execute("""
+                UPDATE sync_watermark
+                SET acked_seq = MAX(acked_seq, ?), acked_at = CURRENT_TIMESTAMP
+                WHERE watermark_id = 1
+            """, (through_seq,))
+            # Acknowledged entries are never read again
+            self.execute("DELETE FROM change_log WHERE seq <= ?", (through_seq,))
+
+    def pull_watermark(self) -> int:
+        """Master change sequence number this database has pulled up to"""
+        result = self.fetchone("SELECT pulled_seq FROM sync_watermark WHERE watermark_id = 1")
+        return result['pulled_seq'] if result else 0
+
+    MIGRATIONS = [
+        (1, "Base schema", _schema_v1),
+        (2, "Sync and dashboard indexes", [
+            "CREATE INDEX IF NOT EXISTS idx_projects_sync_status ON projects(sync_status)",
+            "CREATE INDEX IF NOT EXISTS idx_projects_pm_status ON projects(pm_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects(updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_kpi_sync_status ON kpi_snapshots(sync_status)",
+            "CREATE INDEX IF NOT EXISTS idx_kpi_project_date ON kpi_snapshots(local_project_id, snapshot_date)",
+            "CREATE INDEX IF NOT EXISTS idx_dependencies_sync_status ON project_dependencies(sync_status)",
+            "CREATE INDEX IF NOT EXISTS idx_dependencies_project ON project_dependencies(local_project_id)",
+            "CREATE INDEX IF NOT EXISTS idx_work_packages_sync_status ON work_packages(sync_status)",
+            "CREATE INDEX IF NOT EXISTS idx_contacts_sync_status ON project_contacts(sync_status)",
+            "CREATE INDEX IF NOT EXISTS idx_contacts_project ON project_contacts(local_project_id)",
+        ]),
+        (3, "Change log and sync watermark", _schema_v3),
+        (4, "Pull sync watermark and master keys", [
+            "ALTER TABLE sync_watermark ADD COLUMN pulled_seq INTEGER NOT NULL DEFAULT 0",
+            "ALTER TABLE sync_watermark ADD COLUMN pulled_at TIMESTAMP",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_master_id ON projects(master_project_id)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_kpi_master_id ON kpi_snapshots(master_snapshot_id)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_dependencies_master_id ON project_dependencies(master_dependency_id)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_master_id ON project_contacts(master_contact_id)",
+        ]),
+        (5, "Column-level project change tracking", _schema_v5),
+    ]
+
 
 class ConfigDB(Database):
     """Configuration database for application settings"""
 
+    PRAGMAS = CONFIG_DB_PRAGMAS
+
     def __init__(self):
         db_path = G_DRIVE / "config.db"
         super().__init__(str(db_path))
 
     def initialize_schema(self):
+        """Create config table and apply pending migrations"""
+        self.migrate()
+
+    def _schema_v1(self):
         """Create config table"""
         self.execute("""
             CREATE TABLE IF NOT EXISTS config_settings (
@@ -449,44 +1401,124 @@ class ConfigDB(Database):
             except sqlite3.IntegrityError:
                 pass  # Already exists
 
+    MIGRATIONS = [
+        (1, "Base schema", _schema_v1),
+        (2, "Default settings", create_default_config),
+    ]
+
     def get_config(self, key: str) -> Optional[str]:
-        """Get a configuration value"""
+        """Get a configuration value (hot paths should read vtrack.settings instead)"""
         result = self.fetchone("SELECT setting_value FROM config_settings WHERE setting_key = ?", (key,))
         return result['setting_value'] if result else None
 
     def set_config(self, key: str, value: str):
-        """Set a configuration value"""
+        """Set a configuration value, keeping its description"""
         self.execute("""
-            INSERT OR REPLACE INTO config_settings (setting_key, setting_value, updated_at)
+            INSERT INTO config_settings (setting_key, setting_value, updated_at)
             VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(setting_key) DO UPDATE SET
+                setting_value = excluded.setting_value,
+                updated_at = excluded.updated_at
         """, (key, value))
+        self._settings_changed()
+
+    def add_config(self, key: str, value: str, description: str = ""):
+        """Add a new configuration setting (raises IntegrityError if the key exists)"""
+        self.execute("""
+            INSERT INTO config_settings (setting_key, setting_value, description)
+            VALUES (?, ?, ?)
+        """, (key, value, description))
+        self._settings_changed()
+
+    @contextmanager
+    def transaction(self):
+        """transaction() that also refreshes cached settings once the outermost block commits"""
+        with super().transaction():
+            yield self
+        if not self.in_transaction:
+            self._settings_changed()
+
+    def _settings_changed(self):
+        """Invalidate the shared settings snapshot after a committed write"""
+        if self.in_transaction:
+            return  # transaction() invalidates after the commit
+
+        from .settings import settings
+        settings.invalidate()
+
+
+def _all_master_databases() -> List[Database]:
+    # Master last: it attaches the users and config files read-only, which
+    # fails if they have not been created yet
+    return [MasterUsersDB(), ConfigDB(), MasterProjectsDB()]
 
 
 def initialize_all_databases():
     """Initialize all databases with their schemas and default data"""
 
-    # Master Users DB
-    users_db = MasterUsersDB()
-    users_db.connect()
-    users_db.initialize_schema()
-    users_db.create_default_users()
-    users_db.close()
-
-    # Master Projects DB
-    projects_db = MasterProjectsDB()
-    projects_db.connect()
-    projects_db.initialize_schema()
-    projects_db.create_default_data()
-    projects_db.close()
-
-    # Config DB
-    config_db = ConfigDB()
-    config_db.connect()
-    config_db.initialize_schema()
-    config_db.create_default_config()
-    config_db.close()
-
-    print(" All databases initialized successfully!")
+    # Default users/programs/settings are seeded by migrations, so they are
+    # inserted once per database rather than re-attempted on every call
+    for db in _all_master_databases():
+        db.connect()
+        db.initialize_schema()
+        db.close()
+
+    print(" All databases initialized successfully!")
+
+
+def databases_current() -> bool:
+    """Check whether every master database is stamped at its latest schema version"""
+    for db in _all_master_databases():
+        if not Path(db.db_path).exists():
+            return False
+        db.connect()
+        try:
+            if db.schema_version() < db.latest_schema_version():
+                return False
+        finally:
+            db.close()
+    return True
+
+
+# Process-level bootstrap state - Streamlit reruns share the interpreter
+_bootstrap_lock = threading.Lock()
+_bootstrapped = False
+
+
+def ensure_databases_initialized() -> bool:
+    """
+    Bootstrap the databases once per process
+
+    The first call checks the schema version stamps and only runs
+    initialize_all_databases() when something is out of date; every later
+    call returns immediately without touching the database files.
+
+    Returns:
+        True if this call ran the bootstrap check, False if it was already done
+    """
+    global _bootstrapped
+
+    if _bootstrapped:
+        return False
+
+    with _bootstrap_lock:
+        if _bootstrapped:
+            return False
+
+        if not databases_current():
+            initialize_all_databases()
+
+        _bootstrapped = True
+
+    return True
+
+
+def reset_bootstrap():
+    """Make the next ensure_databases_initialized() check the schema stamps again (after a restore)"""
+    global _bootstrapped
+
+    with _bootstrap_lock:
+        _bootstrapped = False
 
 
 if __name__ == "__main__":
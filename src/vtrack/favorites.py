@@ -5,8 +5,9 @@ Allow users to bookmark their favorite projects
 
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import List
 from .database import G_DRIVE
+from .records import ProjectRecord
 import streamlit as st
 
 
@@ -131,7 +132,7 @@ class FavoritesManager:
         return project_id in favorites
 
     @staticmethod
-    def get_favorite_projects(user_id: int, db) -> List[Dict]:
+    def get_favorite_projects(user_id: int, db) -> List[ProjectRecord]:
         """
         Get full project data for user's favorites
 
@@ -140,7 +141,7 @@ class FavoritesManager:
             db: Database connection
 
         Returns:
-            List of project dictionaries
+            List of project records
         """
         try:
             favorites = FavoritesManager.get_user_favorites(user_id)
@@ -150,13 +151,12 @@ class FavoritesManager:
 
             # Get projects
             placeholders = ','.join('?' * len(favorites))
-            projects = db.fetchall(
+            return db.fetch_records(
                 f"SELECT * FROM projects WHERE project_id IN ({placeholders})",
-                tuple(favorites)
+                tuple(favorites),
+                ProjectRecord
             )
 
-            return [dict(p) for p in projects]
-
         except Exception as e:
             return []
 
@@ -4,7 +4,7 @@ Calculates health scores based on multiple factors
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Mapping, Optional
 from .database import MasterProjectsDB, LocalProjectsDB
 import streamlit as st
 
@@ -13,7 +13,7 @@ class HealthScoreCalculator:
     """Calculate project health scores"""
 
     @staticmethod
-    def calculate_project_health(project: Dict) -> Dict:
+    def calculate_project_health(project: Mapping) -> Dict:
         """
         Calculate comprehensive health score for a project
 
@@ -25,7 +25,7 @@ class HealthScoreCalculator:
         - Dependency resolution (15%)
 
         Args:
-            project: Project dictionary
+            project: Project dictionary or ProjectRecord
 
         Returns:
             Dictionary with score, grade, and breakdown
@@ -95,7 +95,7 @@ class HealthScoreCalculator:
         }
 
     @staticmethod
-    def _calculate_schedule_score(project: Dict) -> float:
+    def _calculate_schedule_score(project: Mapping) -> float:
         """Calculate score based on schedule adherence"""
         try:
             # If no completion date set, return 70 (neutral)
@@ -124,7 +124,7 @@ class HealthScoreCalculator:
             return 70.0
 
     @staticmethod
-    def _calculate_kpi_freshness_score(project: Dict) -> float:
+    def _calculate_kpi_freshness_score(project: Mapping) -> float:
         """Calculate score based on KPI data freshness"""
         try:
             # Check last KPI snapshot date
@@ -140,7 +140,7 @@ class HealthScoreCalculator:
             return 50.0
 
     @staticmethod
-    def _calculate_status_score(project: Dict) -> float:
+    def _calculate_status_score(project: Mapping) -> float:
         """Calculate score based on project status"""
         status = project.get('status', '')
 
@@ -276,7 +276,7 @@ class HealthScoreCalculator:
         st.markdown("</div></div>", unsafe_allow_html=True)
 
 
-def show_project_health_widget(project: Dict):
+def show_project_health_widget(project: Mapping):
     """Display compact health widget for a project"""
     health = HealthScoreCalculator.calculate_project_health(project)
 
@@ -0,0 +1,172 @@
+"""
+Sync inbox manifest for Verizon Tracker
+Per-file metadata for pending bundles so pages never re-parse the inbox
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .bundles import bundle_files, iter_records
+from .database import MasterProjectsDB, SYNC_INBOX
+
+
+# Bundle list -> manifest count column
+MANIFEST_COUNTS = {
+    'projects': 'projects',
+    'kpi_snapshots': 'kpis',
+    'project_dependencies': 'dependencies',
+    'project_contacts': 'contacts'
+}
+
+# Bundle list of project deltas, counted and previewed as projects
+PROJECT_UPDATES = 'project_updates'
+
+# Projects listed on the inbox page per bundle
+PREVIEW_PROJECTS = 5
+
+MANIFEST_COLUMNS = [
+    'file_name', 'username', 'user_id', 'sync_timestamp',
+    *MANIFEST_COUNTS.values(),
+    'size_bytes', 'file_mtime', 'project_preview', 'error'
+]
+
+UPSERT_MANIFEST_SQL = f"""
+    INSERT OR REPLACE INTO sync_inbox_manifest ({', '.join(MANIFEST_COLUMNS)})
+    VALUES ({', '.join('?' for _ in MANIFEST_COLUMNS)})
+"""
+
+
+def _summary(header: Dict[str, Any], counts: Dict[str, int],
+             projects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {
+        'username': header.get('username', 'Unknown'),
+        'user_id': header.get('user_id'),
+        'sync_timestamp': header.get('sync_timestamp', 'Unknown'),
+        'project_preview': json.dumps([
+            {key: project.get(key) for key in ('name', 'ccr_nfid', 'status')}
+            for project in projects[:PREVIEW_PROJECTS]
+        ]),
+        'error': None
+    }
+    for key, column in MANIFEST_COUNTS.items():
+        summary[column] = counts.get(key, 0)
+    summary[MANIFEST_COUNTS['projects']] += counts.get(PROJECT_UPDATES, 0)
+    return summary
+
+
+def _preview_update(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Project preview entry for a delta: its CCR/NFID plus whatever it changes"""
+    return dict(update.get('changes') or {}, ccr_nfid=update.get('ccr_nfid'))
+
+
+def _preview_projects(projects: List[Dict[str, Any]], updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return (projects + [_preview_update(update) for update in updates])[:PREVIEW_PROJECTS]
+
+
+def summarize_bundle(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    """Manifest fields taken from a parsed bundle"""
+    counts = {key: len(bundle.get(key, [])) for key in (*MANIFEST_COUNTS, PROJECT_UPDATES)}
+    return _summary(bundle, counts, _preview_projects(bundle.get('projects', []),
+                                                      bundle.get(PROJECT_UPDATES, [])[:PREVIEW_PROJECTS]))
+
+
+def _manifest_row(sync_file: Path, summary: Dict[str, Any], stat=None) -> tuple:
+    stat = stat or sync_file.stat()
+    values = dict(summary, file_name=sync_file.name, size_bytes=stat.st_size, file_mtime=stat.st_mtime)
+    return tuple(values.get(column) for column in MANIFEST_COLUMNS)
+
+
+def record_bundle(projects_db: MasterProjectsDB, sync_file: Path, bundle: Dict[str, Any]):
+    """Index a bundle that was just written to the inbox"""
+    projects_db.execute(UPSERT_MANIFEST_SQL, _manifest_row(sync_file, summarize_bundle(bundle)))
+
+
+def record_written_bundle(projects_db: MasterProjectsDB, sync_file: Path, written: Dict[str, Any]):
+    """Index a .vtb bundle from the summary bundles.write_bundle() returned"""
+    preview = written['preview']
+    summary = _summary(written['header'], written['counts'],
+                       _preview_projects(preview.get('projects', []), preview.get(PROJECT_UPDATES, [])))
+    projects_db.execute(UPSERT_MANIFEST_SQL, _manifest_row(sync_file, summary))
+
+
+def forget_bundle(projects_db: MasterProjectsDB, file_name: str):
+    """Drop a bundle from the manifest once it has left the inbox"""
+    projects_db.execute("DELETE FROM sync_inbox_manifest WHERE file_name = ?", (file_name,))
+
+
+def _summarize_file(sync_file: Path) -> Dict[str, Any]:
+    """Stream a bundle that was not indexed when it was dropped"""
+    try:
+        header, counts, projects = {}, {}, []
+        for kind, name, value in iter_records(sync_file):
+            if kind == 'field':
+                header[name] = value
+                continue
+            counts[name] = counts.get(name, 0) + 1
+            if name in ('projects', PROJECT_UPDATES) and len(projects) < PREVIEW_PROJECTS:
+                projects.append(value if name == 'projects' else _preview_update(value))
+        return _summary(header, counts, projects)
+    except Exception as e:
+        summary = {column: 0 for column in MANIFEST_COUNTS.values()}
+        summary.update({'username': 'Unknown', 'sync_timestamp': 'Unknown',
+                        'project_preview': '[]', 'error': str(e)})
+        return summary
+
+
+def refresh_manifest(projects_db: MasterProjectsDB, inbox: Path = SYNC_INBOX) -> Dict[str, int]:
+    """
+    Reconcile the manifest with the files actually in the inbox
+
+    Only stats each file; a bundle is parsed only if it has no manifest
+    row yet or its size/mtime changed (files copied in by hand, or a drop
+    whose manifest write failed).
+
+    Returns:
+        Dictionary with indexed and removed counts
+    """
+    on_disk = {sync_file.name: (sync_file, sync_file.stat()) for sync_file in bundle_files(inbox)}
+
+    indexed = {
+        row['file_name']: (row['size_bytes'], row['file_mtime'])
+        for row in projects_db.fetchall("SELECT file_name, size_bytes, file_mtime FROM sync_inbox_manifest")
+    }
+
+    removed = [(name,) for name in indexed if name not in on_disk]
+    stale = [
+        _manifest_row(sync_file, _summarize_file(sync_file), stat)
+        for name, (sync_file, stat) in on_disk.items()
+        if indexed.get(name) != (stat.st_size, stat.st_mtime)
+    ]
+
+    if removed or stale:
+        with projects_db.transaction():
+            projects_db.executemany("DELETE FROM sync_inbox_manifest WHERE file_name = ?", removed)
+            projects_db.executemany(UPSERT_MANIFEST_SQL, stale)
+
+    return {'indexed': len(stale), 'removed': len(removed)}
+
+
+def pending_bundles(projects_db: MasterProjectsDB) -> List[Dict[str, Any]]:
+    """Manifest rows for pending bundles, newest first, with the project preview decoded"""
+    rows = projects_db.fetchall("SELECT * FROM sync_inbox_manifest ORDER BY file_mtime DESC")
+    bundles = []
+    for row in rows:
+        entry = dict(row)
+        entry['project_preview'] = json.loads(entry['project_preview'] or '[]')
+        entry['total_items'] = sum(entry[column] or 0 for column in MANIFEST_COUNTS.values())
+        bundles.append(entry)
+    return bundles
+
+
+def pending_count(projects_db: Optional[MasterProjectsDB] = None) -> int:
+    """Number of bundles waiting in the inbox according to the manifest"""
+    owns_connection = projects_db is None
+    if owns_connection:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+    try:
+        row = projects_db.fetchone("SELECT COUNT(*) as count FROM sync_inbox_manifest")
+        return row['count'] if row else 0
+    finally:
+        if owns_connection:
+            projects_db.close()
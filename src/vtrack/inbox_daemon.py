@@ -0,0 +1,259 @@
+"""
+Sync inbox watcher daemon for Verizon Tracker
+Applies bundles as they land in SYNC_INBOX (run with: python -m src.vtrack.inbox_daemon)
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import ingest
+from .bundles import JSON_SUFFIX, bundle_part
+from .database import SYNC_INBOX, ARCHIVE, MasterProjectsDB, ensure_databases_initialized
+
+
+# Full rescan interval; the only trigger when inotify is unavailable
+DAEMON_POLL_SECONDS = 5.0
+
+# JSON bundles are written in place, so they must be this old before they
+# are read; .vtb bundles are renamed into the inbox complete
+SETTLE_SECONDS = 2.0
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+
+def _inotify_watch(directory: Path) -> Optional[int]:
+    """inotify descriptor watching directory for completed files, or None if unavailable"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, str(directory).encode(), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+
+class InboxWatcher:
+    """
+    Blocks until the inbox may have changed
+
+    Uses inotify on Linux. Elsewhere, or with force_polling (inotify never
+    fires for files written by other machines to a network share), wait()
+    just sleeps and the daemon's periodic rescan finds new bundles.
+    """
+
+    def __init__(self, inbox: Path, force_polling: bool = False):
+        self.inbox = inbox
+        self._fd = None if force_polling else _inotify_watch(inbox)
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._fd is not None else "polling"
+
+    def wait(self, timeout: float, stop: threading.Event) -> bool:
+        """
+        Wait up to timeout seconds for a file to land in the inbox
+
+        Returns:
+            True if inotify reported a change, False on timeout or stop
+        """
+        if self._fd is None:
+            stop.wait(timeout)
+            return False
+
+        deadline = time.monotonic() + timeout
+        while not stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # Short slices so a stop request is noticed promptly
+            readable, _, _ = select.select([self._fd], [], [], min(remaining, 1.0))
+            if readable:
+                try:
+                    while os.read(self._fd, 64 * 1024):
+                        pass
+                except BlockingIOError:
+                    pass
+                return True
+        return False
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def ready_files(inbox: Path, failed: Dict[str, Tuple[int, float]],
+                settle_seconds: float = SETTLE_SECONDS) -> Tuple[List[Path], int]:
+    """
+    Pending bundles that can be applied now, oldest first
+
+    Skips JSON files still inside the settle window, files that failed
+    before and have not changed since (size, mtime), and later parts of a
+    multi-part bundle held back by such a failed part.
+
+    Returns:
+        (ready files, number of files still settling)
+    """
+    now = time.time()
+    ready, settling = [], 0
+    blocked = set()
+    for sync_file in ingest.pending_inbox_files(inbox):
+        try:
+            stat = sync_file.stat()
+        except FileNotFoundError:
+            # Taken by another ingest run (the inbox page) since the listing
+            continue
+        part = bundle_part(sync_file)
+        if part and part[0] in blocked:
+            continue
+        if failed.get(sync_file.name) == (stat.st_size, stat.st_mtime):
+            if part:
+                blocked.add(part[0])
+            continue
+        if sync_file.suffix == JSON_SUFFIX and now - stat.st_mtime < settle_seconds:
+            settling += 1
+            continue
+        ready.append(sync_file)
+    return ready, settling
+
+
+def process_ready(inbox: Path, archive_dir: Path, failed: Dict[str, Tuple[int, float]],
+                  workers: int = 1, settle_seconds: float = SETTLE_SECONDS) -> Tuple[Optional[Dict], int]:
+    """
+    Apply every ready bundle and remember the ones that failed
+
+    Returns:
+        (ingest totals, or None if nothing was ready; files still settling)
+    """
+    files, settling = ready_files(inbox, failed, settle_seconds)
+    if not files:
+        return None, settling
+
+    totals = ingest.ingest_inbox(inbox, archive_dir, workers=workers,
+                                 files=ingest.schedule_inbox_files(files))
+    for file_stats in totals['file_stats']:
+        sync_file = inbox / file_stats['file']
+        if file_stats['success']:
+            failed.pop(file_stats['file'], None)
+        elif file_stats['deferred']:
+            # Picked up again once the earlier part has been applied
+            continue
+        else:
+            try:
+                stat = sync_file.stat()
+            except FileNotFoundError:
+                continue
+            failed[file_stats['file']] = (stat.st_size, stat.st_mtime)
+    return totals, settling
+
+
+def _log(message: str):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+
+def run(inbox: Path = SYNC_INBOX, archive_dir: Path = ARCHIVE,
+        poll_interval: float = DAEMON_POLL_SECONDS, settle_seconds: float = SETTLE_SECONDS,
+        workers: int = 1, force_polling: bool = False, once: bool = False,
+        stop: Optional[threading.Event] = None):
+    """
+    Watch the inbox and apply bundles until stop is set
+
+    Args:
+        inbox: Inbox directory
+        archive_dir: Directory of the archive packs
+        poll_interval: Seconds between full rescans
+        settle_seconds: Minimum age of a JSON bundle before it is read
+        workers: Decoding processes passed to ingest_inbox()
+        force_polling: Never use inotify (network shares)
+        once: Process what is ready and return
+        stop: Event that ends the loop (set by SIGINT/SIGTERM in main())
+    """
+    stop = stop or threading.Event()
+    inbox.mkdir(parents=True, exist_ok=True)
+    watcher = InboxWatcher(inbox, force_polling)
+    failed: Dict[str, Tuple[int, float]] = {}
+    _log(f"Watching {inbox} ({watcher.mode}, rescan every {poll_interval:g}s)")
+
+    try:
+        while not stop.is_set():
+            try:
+                totals, settling = process_ready(inbox, archive_dir, failed, workers, settle_seconds)
+            except Exception as e:
+                # e.g. master locked by a long page ingest; the next rescan tries again
+                _log(f"Ingest cycle failed, retrying on the next rescan: {e}")
+                totals, settling = None, 0
+            if totals:
+                for file_stats in totals['file_stats']:
+                    if file_stats['deferred']:
+                        _log(f"Deferred {file_stats['file']}: {'; '.join(file_stats['errors'][-1:])}")
+                    elif file_stats['duplicate']:
+                        _log(f"Archived {file_stats['file']} without applying: identical bundle already applied")
+                    elif file_stats['success']:
+                        _log(f"Applied {file_stats['file']} from {file_stats['username']}: "
+                             f"{file_stats['projects_inserted'] + file_stats['projects_updated']} projects, "
+                             f"{file_stats['kpis_applied']} KPIs "
+                             f"(apply {file_stats['duration']:.2f}s, latency {file_stats['latency']:.1f}s)")
+                    else:
+                        _log(f"Failed {file_stats['file']} (retried when it changes): "
+                             f"{'; '.join(file_stats['errors'][-1:])}")
+            if once:
+                break
+
+            # Come back as soon as a settling JSON bundle is old enough
+            watcher.wait(min(poll_interval, settle_seconds) if settling else poll_interval, stop)
+    finally:
+        watcher.close()
+
+    projects_db = MasterProjectsDB()
+    projects_db.connect()
+    latency = ingest.ingest_latency(projects_db)
+    projects_db.close()
+    if latency['bundles']:
+        _log(f"Last 24h: {latency['bundles']} bundles, latency p50 {latency['p50']:.1f}s, "
+             f"p95 {latency['p95']:.1f}s, max {latency['max']:.1f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply sync bundles as they land in the inbox")
+    parser.add_argument("--once", action="store_true", help="process ready bundles and exit")
+    parser.add_argument("--poll-interval", type=float, default=DAEMON_POLL_SECONDS,
+                        help="seconds between full inbox rescans")
+    parser.add_argument("--polling", action="store_true",
+                        help="do not use inotify (required when the inbox is a network share)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="bundle decoding processes (default: ingest_workers setting, capped at the CPU count)")
+    args = parser.parse_args(argv)
+
+    ensure_databases_initialized()
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    run(poll_interval=args.poll_interval, workers=args.workers or ingest.default_ingest_workers(),
+        force_polling=args.polling, once=args.once, stop=stop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,919 @@
+"""
+Sync inbox ingest engine for Verizon Tracker
+Applies PM sync bundles to the master database, one transaction per file
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .bundles import bundle_digest, bundle_files, bundle_records, bundle_username, earlier_parts, iter_records
+from .database import MasterProjectsDB, SYNC_INBOX, ARCHIVE
+from .archive import archive_bundle, pack_loose_files
+from .inbox import forget_bundle
+from .settings import settings
+
+
+# Columns written when a bundle project is inserted into master
+PROJECT_INSERT_COLUMNS = [
+    'name', 'ccr_nfid', 'program_id', 'project_type_id', 'pm_id',
+    'status', 'phase', 'notes', 'nfid', 'customer', 'clli',
+    'rft_date', 'system_type', 'current_queue', 'site_address',
+    'project_start_date', 'project_complete_date'
+]
+
+# Columns a PM may change on a project that already exists in master
+PROJECT_UPDATE_COLUMNS = [
+    'name', 'status', 'phase', 'notes', 'customer', 'clli',
+    'site_address', 'current_queue', 'system_type'
+]
+
+# Bundle table of column-level project edits: local_id, ccr_nfid and a
+# changes dict holding only the columns the PM changed
+PROJECT_UPDATES_TABLE = 'project_updates'
+
+# Bundle tables read for bundle_context()
+PROJECT_TABLES = ('projects', PROJECT_UPDATES_TABLE)
+
+PROJECT_REQUIRED_FIELDS = ['name', 'ccr_nfid', 'pm_id', 'status']
+PROJECT_STATUSES = ('Active', 'On Hold', 'Completed', 'Cancelled')
+
+UPSERT_PROJECT_SQL = f"""
+    INSERT INTO projects ({', '.join(PROJECT_INSERT_COLUMNS)})
+    VALUES ({', '.join('?' for _ in PROJECT_INSERT_COLUMNS)})
+    ON CONFLICT(ccr_nfid) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in PROJECT_UPDATE_COLUMNS)},
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Child records carried in bundles: local primary key, local -> master
+# project reference columns, and the data columns copied as-is
+CHILD_TABLES = [
+    {
+        'table': 'kpi_snapshots',
+        'stat': 'kpis_applied',
+        'local_key': 'local_snapshot_id',
+        'master_key': ('master_snapshot_id', 'snapshot_id'),
+        'project_refs': [('local_project_id', 'project_id')],
+        'columns': ['snapshot_date', 'budget_status', 'schedule_status', 'on_time_percent', 'notes'],
+    },
+    {
+        'table': 'project_dependencies',
+        'stat': 'dependencies_applied',
+        'local_key': 'local_dependency_id',
+        'master_key': ('master_dependency_id', 'dependency_id'),
+        'project_refs': [('local_project_id', 'project_id'),
+                         ('depends_on_local_project_id', 'depends_on_project_id')],
+        'columns': ['dependency_type', 'notes'],
+    },
+    {
+        'table': 'project_contacts',
+        'stat': 'contacts_applied',
+        'local_key': 'local_contact_id',
+        'master_key': ('master_contact_id', 'contact_id'),
+        'project_refs': [('local_project_id', 'project_id')],
+        'columns': ['contact_name', 'contact_role', 'contact_email'],
+    },
+]
+CHILD_SPECS = {spec['table']: spec for spec in CHILD_TABLES}
+
+
+# SQLite's default limit on host parameters per statement is 999
+LOOKUP_BATCH_SIZE = 500
+
+# Bundle rows applied per executemany() while streaming a file
+INGEST_BATCH_SIZE = 1000
+
+# Larger files are streamed by the writer instead of being decoded whole in a worker
+PARALLEL_PREPARE_MAX_BYTES = 16 * 1024 * 1024
+
+# Bundle bytes each PM's queue earns per fair-share scheduling round
+FAIR_SHARE_QUANTUM_BYTES = 1024 * 1024
+
+# Stats fields summed across files by ingest_inbox()
+COUNTER_KEYS = (
+    'projects_inserted', 'projects_updated', 'projects_skipped',
+    'kpis_applied', 'dependencies_applied', 'contacts_applied', 'children_skipped', 'duration'
+)
+
+
+def _validate_project(project: Dict[str, Any]) -> Optional[str]:
+    """Return why a bundle project cannot be applied, or None if it is valid"""
+    missing = [field for field in PROJECT_REQUIRED_FIELDS if not project.get(field)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if project['status'] not in PROJECT_STATUSES:
+        return f"invalid status '{project['status']}'"
+    return None
+
+
+def _validate_project_update(changes: Dict[str, Any]) -> Optional[str]:
+    """Return why a project delta cannot be applied, or None if it is valid"""
+    if 'name' in changes and not changes['name']:
+        return "missing name"
+    if 'status' in changes and changes['status'] not in PROJECT_STATUSES:
+        return f"invalid status '{changes['status']}'"
+    return None
+
+
+def master_project_ids(projects_db: MasterProjectsDB, ccr_nfids: List[str]) -> Dict[str, int]:
+    """Master project_id for each of the given CCR/NFIDs that exists (batched IN lookups)"""
+    found = {}
+    for start in range(0, len(ccr_nfids), LOOKUP_BATCH_SIZE):
+        batch = ccr_nfids[start:start + LOOKUP_BATCH_SIZE]
+        placeholders = ','.join('?' for _ in batch)
+        rows = projects_db.fetchall(
+            f"SELECT project_id, ccr_nfid FROM projects WHERE ccr_nfid IN ({placeholders})",
+            tuple(batch)
+        )
+        found.update({row['ccr_nfid']: row['project_id'] for row in rows})
+    return found
+
+
+def _source_user_id(projects_db: MasterProjectsDB, context: Dict[str, Any]) -> Optional[int]:
+    """ID of the PM who sent the bundle (older bundles only carry the username)"""
+    if context.get('user_id') is not None:
+        return int(context['user_id'])
+    try:
+        row = projects_db.fetchone(
+            "SELECT user_id FROM users_db.users WHERE username = ?", (context.get('username'),)
+        )
+    except Exception:
+        return None
+    return row['user_id'] if row else None
+
+
+def bundle_context(records: Iterable[Tuple[str, str, Any]]) -> Dict[str, Any]:
+    """
+    Sender and local project ID -> CCR/NFID map for a bundle
+
+    Built in a first pass over the projects rows and top-level fields, so
+    child records can be remapped batch by batch wherever project_keys
+    appears in the file.
+    """
+    context = {'username': None, 'user_id': None, 'project_keys': {}}
+    for kind, name, value in records:
+        if kind == 'row':
+            if value.get('local_id') is not None and value.get('ccr_nfid'):
+                context['project_keys'][int(value['local_id'])] = value['ccr_nfid']
+        elif name == 'project_keys':
+            context['project_keys'].update(
+                {int(local_id): ccr_nfid for local_id, ccr_nfid in value.items()}
+            )
+        elif name in ('username', 'user_id'):
+            context[name] = value
+    return context
+
+
+def _child_upsert_sql(spec: Dict[str, Any]) -> str:
+    """INSERT ... ON CONFLICT keyed on (source_user_id, source_local_id) for a child table"""
+    columns = [master for _, master in spec['project_refs']] + spec['columns']
+    insert_columns = columns + ['source_user_id', 'source_local_id']
+    return f"""
+        INSERT INTO {spec['table']} ({', '.join(insert_columns)})
+        VALUES ({', '.join('?' for _ in insert_columns)})
+        ON CONFLICT(source_user_id, source_local_id) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in columns)}
+    """
+
+
+def _child_update_sql(spec: Dict[str, Any]) -> str:
+    """UPDATE of a child row by its master primary key (rows the PM pulled from master)"""
+    columns = [master for _, master in spec['project_refs']] + spec['columns']
+    return f"""
+        UPDATE {spec['table']} SET {', '.join(f'{column} = ?' for column in columns)}
+        WHERE {spec['master_key'][1]} = ?
+    """
+
+
+def _existing_master_keys(projects_db: MasterProjectsDB, spec: Dict[str, Any], keys: List[int]) -> set:
+    """Which of the given master primary keys still exist in a child table (batched IN lookups)"""
+    key = spec['master_key'][1]
+    found = set()
+    for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+        batch = keys[start:start + LOOKUP_BATCH_SIZE]
+        placeholders = ','.join('?' for _ in batch)
+        rows = projects_db.fetchall(
+            f"SELECT {key} FROM {spec['table']} WHERE {key} IN ({placeholders})", tuple(batch)
+        )
+        found.update(row[key] for row in rows)
+    return found
+
+
+def _prepare_project_batch(rows: List[Dict[str, Any]], stats: Dict[str, Any]) -> Dict[str, tuple]:
+    """Validated upsert parameters for one batch of bundle projects, keyed by CCR/NFID"""
+    # Last occurrence wins if a batch carries the same project twice
+    projects = {}
+    for project in rows:
+        problem = _validate_project(project)
+        if problem:
+            stats['projects_skipped'] += 1
+            stats['errors'].append(f"Skipped project {project.get('name') or project.get('ccr_nfid')}: {problem}")
+            continue
+        projects[project['ccr_nfid']] = tuple(project.get(column) for column in PROJECT_INSERT_COLUMNS)
+    return projects
+
+
+def _write_project_batch(projects_db: MasterProjectsDB, projects: Dict[str, tuple],
+                         stats: Dict[str, Any]):
+    """Upsert one prepared batch of projects"""
+    existing = master_project_ids(projects_db, list(projects))
+    projects_db.executemany(UPSERT_PROJECT_SQL, list(projects.values()))
+
+    stats['projects_updated'] += len(existing)
+    stats['projects_inserted'] += len(projects) - len(existing)
+
+
+def _prepare_update_batch(rows: List[Dict[str, Any]], stats: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Validated column changes for one batch of project deltas, keyed by CCR/NFID"""
+    updates = {}
+    for update in rows:
+        # Columns master does not take from PMs are dropped, as in UPSERT_PROJECT_SQL
+        changes = {column: value for column, value in (update.get('changes') or {}).items()
+                   if column in PROJECT_UPDATE_COLUMNS}
+        problem = _validate_project_update(changes)
+        if problem:
+            stats['projects_skipped'] += 1
+            stats['errors'].append(f"Skipped project {update.get('ccr_nfid')}: {problem}")
+            continue
+        if changes and update.get('ccr_nfid'):
+            # Later deltas for the same project are layered over earlier ones
+            updates.setdefault(update['ccr_nfid'], {}).update(changes)
+    return updates
+
+
+def _write_update_batch(projects_db: MasterProjectsDB, updates: Dict[str, Dict[str, Any]],
+                        stats: Dict[str, Any]):
+    """
+    Apply one prepared batch of project deltas
+
+    Each project only has its changed columns set; projects changing the
+    same columns share one executemany(). A delta for a project master
+    does not have is skipped (its full row was never applied).
+    """
+    existing = master_project_ids(projects_db, list(updates))
+
+    groups = {}
+    for ccr_nfid, changes in updates.items():
+        if ccr_nfid not in existing:
+            stats['projects_skipped'] += 1
+            stats['errors'].append(f"Skipped update to project {ccr_nfid}: project not in master")
+            continue
+        columns = tuple(sorted(changes))
+        groups.setdefault(columns, []).append(tuple(changes[column] for column in columns) + (ccr_nfid,))
+
+    for columns, params in groups.items():
+        projects_db.executemany(f"""
+            UPDATE projects
+            SET {', '.join(f'{column} = ?' for column in columns)}, updated_at = CURRENT_TIMESTAMP
+            WHERE ccr_nfid = ?
+        """, params)
+        stats['projects_updated'] += len(params)
+
+
+def _prepare_child_batch(spec: Dict[str, Any], rows: List[Dict[str, Any]]) -> List[tuple]:
+    """(local project refs..., data columns..., master key, local key) for one batch of child records"""
+    return [
+        tuple(record.get(local) for local, _ in spec['project_refs'])
+        + tuple(record.get(column) for column in spec['columns'])
+        + (record.get(spec['master_key'][0]), record.get(spec['local_key']))
+        for record in rows
+    ]
+
+
+def _write_child_batch(projects_db: MasterProjectsDB, spec: Dict[str, Any], rows: List[tuple],
+                       context: Dict[str, Any], stats: Dict[str, Any]):
+    """
+    Upsert one prepared batch of KPI snapshots, dependencies or contacts
+
+    Local project IDs are remapped to master IDs with one batched lookup
+    per batch; records whose project is not in master are skipped. Records
+    the PM pulled from master carry its primary key and update that row.
+    The others are upserted on (source_user_id, source_local_id), so they
+    are skipped when the sender is not a known user: NULLs never conflict
+    in a unique index, and every re-send would insert them again.
+    """
+    refs = len(spec['project_refs'])
+    local_keys = context['project_keys']
+    wanted = {local_keys[local] for row in rows for local in row[:refs] if local in local_keys}
+    master_ids = master_project_ids(projects_db, sorted(wanted))
+    pulled = _existing_master_keys(projects_db, spec, sorted({row[-2] for row in rows if row[-2] is not None}))
+
+    updates, upserts, unknown_sender = [], [], 0
+    for row in rows:
+        project_ids = tuple(master_ids.get(local_keys.get(local)) for local in row[:refs])
+        if None in project_ids:
+            stats['children_skipped'] += 1
+            stats['errors'].append(f"Skipped {spec['table']} row {row[-1]}: project not in master")
+        elif row[-2] in pulled:
+            updates.append(project_ids + row[refs:-2] + (row[-2],))
+        elif context['source_user_id'] is None:
+            unknown_sender += 1
+        else:
+            upserts.append(project_ids + row[refs:-2] + (context['source_user_id'], row[-1]))
+
+    if unknown_sender:
+        stats['children_skipped'] += unknown_sender
+        stats['errors'].append(f"Skipped {unknown_sender} {spec['table']} rows: sender "
+                               f"'{context.get('username')}' is not a known user")
+    if updates:
+        projects_db.executemany(_child_update_sql(spec), updates)
+    if upserts:
+        projects_db.executemany(_child_upsert_sql(spec), upserts)
+    stats[spec['stat']] += len(updates) + len(upserts)
+
+
+def iter_prepared_batches(records: Iterable[Tuple[str, str, Any]], stats: Dict[str, Any],
+                          batch_size: int = INGEST_BATCH_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Group bundle rows into batches of up to batch_size and prepare them
+    for writing (validation and parameter tuples; no database access)
+
+    Yields:
+        (table, prepared batch) tuples in bundle order
+    """
+    table, rows = None, []
+    for kind, name, value in records:
+        if kind != 'row' or (name not in PROJECT_TABLES and name not in CHILD_SPECS):
+            continue
+        if rows and (name != table or len(rows) >= batch_size):
+            yield table, _prepare_batch(table, rows, stats)
+            rows = []
+        table = name
+        rows.append(value)
+    if rows:
+        yield table, _prepare_batch(table, rows, stats)
+
+
+def _prepare_batch(table: str, rows: List[Dict[str, Any]], stats: Dict[str, Any]):
+    if table == 'projects':
+        return _prepare_project_batch(rows, stats)
+    if table == PROJECT_UPDATES_TABLE:
+        return _prepare_update_batch(rows, stats)
+    return _prepare_child_batch(CHILD_SPECS[table], rows)
+
+
+def _write_batch(projects_db: MasterProjectsDB, table: str, prepared,
+                 context: Dict[str, Any], stats: Dict[str, Any]):
+    if table == 'projects':
+        _write_project_batch(projects_db, prepared, stats)
+    elif table == PROJECT_UPDATES_TABLE:
+        _write_update_batch(projects_db, prepared, stats)
+    else:
+        _write_child_batch(projects_db, CHILD_SPECS[table], prepared, context, stats)
+
+
+def new_ingest_stats(name: str = "") -> Dict[str, Any]:
+    """Empty stats record for one bundle"""
+    stats = {'file': name, 'username': None, 'success': False, 'duplicate': False,
+             'deferred': False, 'errors': [], 'latency': None}
+    stats.update({key: 0 for key in COUNTER_KEYS})
+    stats['duration'] = 0.0
+    return stats
+
+
+def apply_records(projects_db: MasterProjectsDB, records: Iterable[Tuple[str, str, Any]],
+                  context: Dict[str, Any], stats: Optional[Dict[str, Any]] = None,
+                  batch_size: int = INGEST_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Stream a bundle's projects and child records into master in a single
+    transaction, batch_size rows per executemany()
+
+    At most one batch of rows is held in memory, so memory use does not
+    depend on the size of the bundle. Invalid projects are skipped and
+    reported; anything that fails inside the transaction rolls the whole
+    bundle back and is re-raised.
+
+    Args:
+        projects_db: Connected master projects database
+        records: Bundle records (bundles.iter_records() or bundles.bundle_records())
+        context: bundle_context() for the same bundle
+        stats: Stats record to fill (a new one is created if omitted)
+        batch_size: Rows per batch
+
+    Returns:
+        Stats dictionary with per-table counts and errors
+    """
+    stats = stats if stats is not None else new_ingest_stats()
+    return _write_batches(projects_db, iter_prepared_batches(records, stats, batch_size), context, stats)
+
+
+def _write_batches(projects_db: MasterProjectsDB, batches: Iterable[Tuple[str, Any]],
+                   context: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Write prepared batches to master in a single transaction"""
+    stats['username'] = context.get('username')
+    context = dict(context, source_user_id=_source_user_id(projects_db, context))
+
+    with projects_db.transaction():
+        for table, prepared in batches:
+            _write_batch(projects_db, table, prepared, context, stats)
+
+    return stats
+
+
+def apply_bundle(projects_db: MasterProjectsDB, bundle: Dict[str, Any],
+                 stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Upsert an in-memory bundle's projects and their child records into
+    master in a single transaction (see apply_records)
+    """
+    context = bundle_context(bundle_records(bundle, tables=PROJECT_TABLES))
+    return apply_records(projects_db, bundle_records(bundle), context, stats)
+
+
+def prepare_bundle(sync_file: Path, batch_size: int = INGEST_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Decode and validate one bundle without touching master
+
+    Runs in ingest worker processes; the result is handed to ingest_file()
+    on the writer thread.
+
+    Returns:
+        Dictionary with the bundle context, its prepared batches and the
+        validation stats (skipped projects and their errors)
+    """
+    stats = new_ingest_stats(sync_file.name)
+    digest = bundle_digest(sync_file)
+    context = bundle_context(iter_records(sync_file, tables=PROJECT_TABLES))
+    batches = list(iter_prepared_batches(iter_records(sync_file), stats, batch_size))
+    return {'digest': digest, 'context': context, 'batches': batches, 'stats': stats}
+
+
+def ingest_file(projects_db: MasterProjectsDB, sync_file: Path,
+                archive_dir: Path = ARCHIVE,
+                prepared: Optional[Callable[[], Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Apply one inbox file and move it into the archive packs if it succeeds
+
+    The bundle's content hash is recorded in the ingest ledger in the same
+    transaction as its rows, so a bundle that was already applied (dropped
+    twice, or applied but not archived before a crash) is archived without
+    writing to master again. A failed bundle writes nothing and is applied
+    from the start when retried.
+
+    A part of a multi-part bundle is deferred (left in the inbox, nothing
+    written) while an earlier part of the same bundle is still waiting,
+    so parts are always applied in order and a failed part holds back
+    only the parts after it.
+
+    Args:
+        projects_db: Connected master projects database
+        sync_file: Bundle file in the inbox
+        archive_dir: Directory of the packs processed files are appended to
+        prepared: Optional callable returning prepare_bundle() output for
+            this file (e.g. a worker future's result); the file is
+            streamed from disk if omitted
+
+    Returns:
+        Stats dictionary for the file ('success' False leaves it in the
+        inbox, 'duplicate' True means it was skipped as already applied,
+        'deferred' True that it waits for an earlier part)
+    """
+    stats = new_ingest_stats(sync_file.name)
+    start = time.perf_counter()
+    digest = None
+
+    waiting_for = earlier_parts(sync_file)
+    if waiting_for:
+        stats['deferred'] = True
+        stats['errors'].append(f"{sync_file.name}: waiting for {waiting_for[0].name}")
+        return stats
+
+    try:
+        dropped_at = sync_file.stat().st_mtime
+        bundle = prepared() if prepared is not None else None
+        digest = bundle['digest'] if bundle is not None else bundle_digest(sync_file)
+
+        with projects_db.transaction():
+            # Checked under the write lock, so two ingest runs (daemon and
+            # page) can never both apply the same bundle
+            applied = ledger_entry(projects_db, digest)
+            if applied and applied['status'] == 'applied':
+                stats['duplicate'] = True
+                stats['username'] = applied['username']
+            elif bundle is None:
+                # Two streaming passes: project keys first, then the records themselves
+                context = bundle_context(iter_records(sync_file, tables=PROJECT_TABLES))
+                apply_records(projects_db, iter_records(sync_file), context, stats)
+                _record_ledger(projects_db, digest, stats, 'applied')
+            else:
+                _write_prepared(projects_db, bundle, stats)
+                _record_ledger(projects_db, digest, stats, 'applied')
+
+        stats['duration'] = time.perf_counter() - start
+        stats['latency'] = time.time() - dropped_at
+        with projects_db.transaction():
+            # Another run that applied the same bundle may have archived the file already
+            if sync_file.exists():
+                archive_bundle(projects_db, sync_file, archive_dir, digest, stats['username'])
+            forget_bundle(projects_db, sync_file.name)
+            if not stats['duplicate']:
+                _log_applied(projects_db, stats, dropped_at)
+        sync_file.unlink(missing_ok=True)
+        stats['success'] = True
+    except FileNotFoundError as e:
+        # Taken out of the inbox by another ingest run before this one read it
+        stats['errors'].append(f"{sync_file.name}: no longer in the inbox ({e.strerror})")
+    except Exception as e:
+        stats['errors'].append(f"{sync_file.name}: {e}")
+        if digest is not None:
+            try:
+                _record_ledger(projects_db, digest, stats, 'failed', str(e))
+            except Exception:
+                pass
+
+    stats['duration'] = time.perf_counter() - start
+    return stats
+
+
+def _write_prepared(projects_db: MasterProjectsDB, bundle: Dict[str, Any], stats: Dict[str, Any]):
+    """Write prepare_bundle() output, carrying over the worker's validation stats"""
+    for key in ('projects_skipped', 'errors'):
+        stats[key] += bundle['stats'][key]
+    _write_batches(projects_db, bundle['batches'], bundle['context'], stats)
+
+
+def apply_prepared_bundle(projects_db: MasterProjectsDB, bundle: Dict[str, Any],
+                          name: str = "",
+                          on_applied: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Apply prepare_bundle() output in one transaction recorded in the ledger
+
+    For bundles that are not inbox files (replaying the archive); inbox
+    files go through ingest_file(). A bundle the ledger already has as
+    applied is skipped and reported as a duplicate. on_applied(stats) runs
+    inside the transaction once the bundle is applied or found applied,
+    so bookkeeping it writes commits (or rolls back) with the bundle.
+
+    Returns:
+        Stats dictionary for the bundle
+    """
+    stats = new_ingest_stats(name)
+    start = time.perf_counter()
+    try:
+        with projects_db.transaction():
+            # Checked under the write lock, as in ingest_file()
+            applied = ledger_entry(projects_db, bundle['digest'])
+            if applied and applied['status'] == 'applied':
+                stats.update(duplicate=True, username=applied['username'])
+            else:
+                _write_prepared(projects_db, bundle, stats)
+                _record_ledger(projects_db, bundle['digest'], stats, 'applied')
+            if on_applied:
+                on_applied(stats)
+        stats['success'] = True
+    except Exception as e:
+        stats['errors'].append(f"{name}: {e}")
+        try:
+            _record_ledger(projects_db, bundle['digest'], stats, 'failed', str(e))
+        except Exception:
+            pass
+    stats['duration'] = time.perf_counter() - start
+    return stats
+
+
+def ledger_entry(projects_db: MasterProjectsDB, digest: str):
+    """Ingest ledger row for a bundle content hash, or None if never seen"""
+    return projects_db.fetchone("SELECT * FROM sync_ingest_ledger WHERE bundle_hash = ?", (digest,))
+
+
+def _record_ledger(projects_db: MasterProjectsDB, digest: str, stats: Dict[str, Any],
+                   status: str, error: Optional[str] = None):
+    """
+    Record the outcome of an attempt to apply a bundle
+
+    attempts counts every try; an applied entry is never downgraded by a
+    later failure (e.g. archiving the file after the commit).
+    """
+    applied = status == 'applied'
+    projects_db.execute("""
+        INSERT INTO sync_ingest_ledger (
+            bundle_hash, file_name, username, status, projects, kpis, dependencies, contacts,
+            error, first_seen_at, applied_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(bundle_hash) DO UPDATE SET
+            file_name = excluded.file_name,
+            username = COALESCE(excluded.username, username),
+            status = excluded.status,
+            attempts = attempts + 1,
+            projects = excluded.projects,
+            kpis = excluded.kpis,
+            dependencies = excluded.dependencies,
+            contacts = excluded.contacts,
+            error = excluded.error,
+            applied_at = excluded.applied_at
+        WHERE sync_ingest_ledger.status = 'failed'
+    """, (
+        digest, stats['file'], stats['username'], status,
+        stats['projects_inserted'] + stats['projects_updated'] if applied else 0,
+        stats['kpis_applied'] if applied else 0,
+        stats['dependencies_applied'] if applied else 0,
+        stats['contacts_applied'] if applied else 0,
+        error, time.time(), time.time() if applied else None
+    ))
+
+
+def _log_applied(projects_db: MasterProjectsDB, stats: Dict[str, Any], dropped_at: float):
+    """Record drop-to-applied latency for an archived bundle"""
+    projects_db.execute("""
+        INSERT INTO sync_ingest_log (
+            file_name, username, dropped_at, applied_at, latency_seconds, apply_seconds,
+            projects, kpis, dependencies, contacts
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        stats['file'], stats['username'], dropped_at, dropped_at + stats['latency'],
+        stats['latency'], stats['duration'],
+        stats['projects_inserted'] + stats['projects_updated'], stats['kpis_applied'],
+        stats['dependencies_applied'], stats['contacts_applied']
+    ))
+
+
+def ingest_latency(projects_db: MasterProjectsDB, hours: float = 24) -> Dict[str, Any]:
+    """
+    Drop-to-applied latency of bundles archived in the last `hours`
+
+    Returns:
+        Dictionary with bundle count and p50 / p95 / max latency in seconds
+        (None when nothing was applied)
+    """
+    rows = projects_db.fetchall("""
+        SELECT latency_seconds FROM sync_ingest_log
+        WHERE applied_at >= ? AND latency_seconds IS NOT NULL
+        ORDER BY latency_seconds
+    """, (time.time() - hours * 3600,))
+    latencies = [row['latency_seconds'] for row in rows]
+    if not latencies:
+        return {'bundles': 0, 'p50': None, 'p95': None, 'max': None}
+    return {
+        'bundles': len(latencies),
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'max': latencies[-1]
+    }
+
+
+def pending_inbox_files(inbox: Path = SYNC_INBOX) -> List[Path]:
+    """Inbox bundles in the order they should be applied (oldest first, parts in order)"""
+    return sorted(bundle_files(inbox), key=lambda path: (path.stat().st_mtime, path.name))
+
+
+def schedule_inbox_files(files: List[Path], pinned: Optional[List[str]] = None,
+                         quantum: int = FAIR_SHARE_QUANTUM_BYTES) -> List[Path]:
+    """
+    Order inbox files so one PM's backlog does not hold up everyone else
+
+    Files are queued per PM (from the file name), each queue keeping the
+    order given, so a PM's later edits and the parts of a bundle still
+    apply in sequence. Queues of pinned PMs are emptied first, in pin
+    order. The rest share the writer by deficit round robin: each round,
+    visiting the queue with the oldest waiting bundle first, every queue
+    earns `quantum` bytes of credit and sends bundles from its head while
+    they fit. Small bundles therefore go in the first round and a large
+    backlog is spread over later ones.
+
+    Bundles from different PMs are no longer applied strictly oldest
+    first; that only matters if two PMs edit the same project.
+
+    Args:
+        files: Inbox files, oldest first
+        pinned: Usernames served first (default: ingest_pinned_users setting,
+            read on every call; the settings snapshot follows config.db's
+            data_version, so pins saved on the inbox page apply to a
+            running daemon's next pass)
+        quantum: Credit per queue per round, in bytes
+
+    Returns:
+        The same files in processing order
+    """
+    pinned = settings.ingest_pinned_users if pinned is None else pinned
+    queues: Dict[str, deque] = {}
+    for sync_file in files:
+        try:
+            stat = sync_file.stat()
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size, mtime = 0, 0.0
+        queues.setdefault(bundle_username(sync_file), deque()).append((sync_file, size, mtime))
+
+    ordered = []
+    for username in pinned:
+        ordered.extend(sync_file for sync_file, _, _ in queues.pop(username, ()))
+
+    credit = {username: 0 for username in queues}
+    while queues:
+        # Skip ahead over rounds in which no queue could send anything
+        rounds = max(1, min(
+            -(-(queue[0][1] - credit[username]) // quantum) for username, queue in queues.items()
+        ))
+        for username in sorted(queues, key=lambda name: queues[name][0][2]):
+            queue = queues[username]
+            credit[username] += rounds * quantum
+            while queue and queue[0][1] <= credit[username]:
+                sync_file, size, _ = queue.popleft()
+                credit[username] -= size
+                ordered.append(sync_file)
+            if not queue:
+                del queues[username]
+
+    return ordered
+
+
+def queue_stats(projects_db: MasterProjectsDB, hours: float = 24) -> List[Dict[str, Any]]:
+    """
+    Per-PM inbox queue and wait metrics
+
+    Returns:
+        One dictionary per PM with pending bundles, pending bytes, how long
+        the oldest pending bundle has waited, and the number and p50 / p95
+        drop-to-applied wait of bundles applied in the last `hours`; the
+        longest current wait first
+    """
+    now = time.time()
+    queues: Dict[str, Dict[str, Any]] = {}
+
+    def entry(username: Optional[str]) -> Dict[str, Any]:
+        username = username or 'Unknown'
+        return queues.setdefault(username, {
+            'username': username, 'pending': 0, 'pending_bytes': 0, 'oldest_wait': None,
+            'applied': 0, 'p50_wait': None, 'p95_wait': None
+        })
+
+    for row in projects_db.fetchall("""
+        SELECT username, COUNT(*) as pending, SUM(size_bytes) as pending_bytes, MIN(file_mtime) as oldest
+        FROM sync_inbox_manifest
+        GROUP BY username
+    """):
+        queue = entry(row['username'])
+        queue.update(pending=row['pending'], pending_bytes=row['pending_bytes'] or 0,
+                     oldest_wait=now - row['oldest'] if row['oldest'] else None)
+
+    waits: Dict[str, List[float]] = {}
+    for row in projects_db.fetchall("""
+        SELECT username, latency_seconds FROM sync_ingest_log
+        WHERE applied_at >= ? AND latency_seconds IS NOT NULL
+        ORDER BY latency_seconds
+    """, (now - hours * 3600,)):
+        waits.setdefault(entry(row['username'])['username'], []).append(row['latency_seconds'])
+
+    for username, latencies in waits.items():
+        queues[username].update(
+            applied=len(latencies),
+            p50_wait=latencies[len(latencies) // 2],
+            p95_wait=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        )
+
+    return sorted(queues.values(), key=lambda queue: -(queue['oldest_wait'] or 0))
+
+
+def _ingest_sequential(files: List[Path], archive_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Stream and apply each file in turn on the calling thread"""
+    projects_db = MasterProjectsDB()
+    projects_db.connect()
+    try:
+        for sync_file in files:
+            yield ingest_file(projects_db, sync_file, archive_dir)
+    finally:
+        projects_db.close()
+
+
+def _ingest_parallel(files: List[Path], archive_dir: Path, workers: int) -> Iterator[Dict[str, Any]]:
+    """
+    Decode bundles in a process pool while one writer thread applies them
+    to master in file order
+
+    The writer keeps at most workers * 2 files submitted ahead of the one
+    it is writing, so prepared bundles held in memory are bounded by the
+    worker count. Files over PARALLEL_PREPARE_MAX_BYTES skip the pool and
+    are streamed by the writer. Stats are yielded on the calling thread
+    (Streamlit progress widgets only work there).
+    """
+    results: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    window = workers * 2
+
+    def write_all(executor: ProcessPoolExecutor):
+        pending = deque()
+        remaining = iter(files)
+
+        def submit_ahead():
+            while len(pending) < window:
+                sync_file = next(remaining, None)
+                if sync_file is None:
+                    return
+                try:
+                    streamed = sync_file.stat().st_size > PARALLEL_PREPARE_MAX_BYTES
+                except FileNotFoundError:
+                    # Claimed by another ingest run; ingest_file() reports it as gone
+                    streamed = True
+                if streamed:
+                    pending.append((sync_file, None))
+                else:
+                    pending.append((sync_file, executor.submit(prepare_bundle, sync_file).result))
+
+        try:
+            projects_db = MasterProjectsDB()
+            projects_db.connect()
+            try:
+                submit_ahead()
+                while pending and not stop.is_set():
+                    sync_file, prepared = pending.popleft()
+                    submit_ahead()
+                    results.put(ingest_file(projects_db, sync_file, archive_dir, prepared))
+            finally:
+                projects_db.close()
+        except Exception as e:
+            results.put(e)
+        results.put(None)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        writer = threading.Thread(target=write_all, args=(executor,), name="ingest-writer", daemon=True)
+        writer.start()
+        try:
+            while True:
+                item = results.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Caller gave up (e.g. its progress callback raised): finish the current file only
+            stop.set()
+            writer.join()
+
+
+def default_ingest_workers() -> int:
+    """ingest_workers setting, capped at the CPU count (extra processes only add overhead)"""
+    return max(1, min(settings.ingest_workers, os.cpu_count() or 1))
+
+
+def ingest_inbox(inbox: Path = SYNC_INBOX, archive_dir: Path = ARCHIVE,
+                 progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+                 workers: int = 1, files: Optional[List[Path]] = None) -> Dict[str, Any]:
+    """
+    Apply every pending inbox file, fair-shared across PMs (see
+    schedule_inbox_files); each PM's files apply oldest first so later
+    edits win
+
+    Args:
+        inbox: Inbox directory
+        archive_dir: Directory of the archive packs (bundle files
+            archived loose by earlier versions are packed first)
+        progress: Optional callback(done, total, file_stats) after each file
+        workers: Worker processes decoding bundles ahead of the single
+            writer; 1 applies files one at a time on the calling thread
+        files: Apply only these inbox files, in the order given
+            (default: every pending file, in schedule_inbox_files() order)
+
+    Returns:
+        Totals across files plus the per-file stats list ('duration' is
+        wall-clock time for the whole run)
+    """
+    if files is None:
+        files = schedule_inbox_files(pending_inbox_files(inbox))
+    totals = {
+        'files': len(files),
+        'files_processed': 0,
+        'files_failed': 0,
+        'files_duplicate': 0,
+        'files_deferred': 0,
+        'errors': [],
+        'file_stats': []
+    }
+    totals.update({key: 0 for key in COUNTER_KEYS})
+    start = time.perf_counter()
+
+    if bundle_files(archive_dir):
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+        try:
+            pack_loose_files(projects_db, archive_dir)
+        finally:
+            projects_db.close()
+
+    if workers > 1 and len(files) > 1:
+        file_results = _ingest_parallel(files, archive_dir, workers)
+    else:
+        file_results = _ingest_sequential(files, archive_dir)
+
+    for done, file_stats in enumerate(file_results, start=1):
+        if file_stats['deferred']:
+            totals['files_deferred'] += 1
+        else:
+            totals['files_processed' if file_stats['success'] else 'files_failed'] += 1
+        totals['files_duplicate'] += file_stats['duplicate']
+        for key in COUNTER_KEYS:
+            totals[key] += file_stats[key]
+        totals['errors'].extend(file_stats['errors'])
+        totals['file_stats'].append(file_stats)
+
+        if progress:
+            progress(done, len(files), file_stats)
+
+    totals['duration'] = time.perf_counter() - start
+    return totals
@@ -34,7 +34,7 @@ class NotificationCenter:
                 local_db.connect()
 
                 pending = local_db.fetchone(
-                    "SELECT COUNT(*) as count FROM projects WHERE sync_status IN ('new', 'updated')",
+                    "SELECT COUNT(*) as count FROM pending_changes WHERE table_name = 'projects'",
                     ()
                 )
                 notifications['pending_sync'] = pending['count'] if pending else 0
@@ -57,12 +57,10 @@ class NotificationCenter:
 
             elif role in ["Associate Director", "Director"]:
                 # Check team syncs waiting to be processed
-                from pathlib import Path
-                from .database import SYNC_INBOX
+                from .inbox import pending_count
 
                 try:
-                    sync_files = list(SYNC_INBOX.glob("*.json"))
-                    notifications['team_syncs'] = len(sync_files)
+                    notifications['team_syncs'] = pending_count()
                 except:
                     notifications['team_syncs'] = 0
 
@@ -0,0 +1,217 @@
+"""
+Compact record types for Verizon Tracker
+Slotted, read-only rows for projects, KPI snapshots and activities
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Tuple
+
+
+class Record:
+    """Immutable row with dict-style read access and no per-instance __dict__"""
+
+    __slots__ = ('_extra',)
+
+    # Known columns, one slot each; subclasses override
+    FIELDS: Tuple[str, ...] = ()
+
+    # Low-cardinality text columns whose values are interned when loaded
+    INTERNED: Tuple[str, ...] = ()
+
+    def __init__(self, **values):
+        extra = None
+        for key, value in values.items():
+            if key in self._field_set:
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, '_extra', extra)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key: str):
+        if key in self._field_set:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None):
+        """Column value, or default if the query did not select it"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Selected column names (fields first, then extra columns)"""
+        names = [name for name in self.FIELDS if hasattr(self, name)]
+        if self._extra:
+            names.extend(self._extra)
+        return names
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy (for JSON bundles and session exports)"""
+        return dict(self.items())
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.items() == other.items()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((type(self), tuple(self.items())))
+
+    def __reduce__(self):
+        # Slots plus a blocking __setattr__ defeat the default pickle/copy path
+        return (_rebuild_record, (type(self), self.to_dict()))
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+
+Record._field_set = frozenset()
+
+# Lets pandas, json helpers and isinstance(x, Mapping) checks treat records like dicts
+Mapping.register(Record)
+
+
+def _rebuild_record(record_type, values: Dict[str, Any]):
+    return record_type(**values)
+
+
+class ProjectRecord(Record):
+    """Project row from master or a local database"""
+
+    FIELDS = (
+        'project_id', 'local_id', 'master_project_id', 'name', 'ccr_nfid',
+        'program_id', 'project_type_id', 'pm_id', 'status', 'phase', 'notes',
+        'nfid', 'customer', 'clli', 'rft_date', 'system_type', 'current_queue',
+        'site_address', 'project_start_date', 'project_complete_date',
+        'sync_status', 'created_at', 'updated_at',
+        # master pull-sync sequence
+        'change_seq',
+        # project_with_pm view columns
+        'program_name', 'project_type', 'pm_name', 'pm_role',
+    )
+    INTERNED = ('status', 'phase', 'customer', 'system_type', 'current_queue',
+                'sync_status', 'program_name', 'project_type', 'pm_name', 'pm_role')
+    __slots__ = FIELDS
+
+
+class KpiSnapshotRecord(Record):
+    """KPI snapshot row from master or a local database"""
+
+    FIELDS = (
+        'snapshot_id', 'local_snapshot_id', 'master_snapshot_id', 'project_id',
+        'local_project_id', 'snapshot_date', 'budget_status', 'schedule_status',
+        'on_time_percent', 'notes', 'sync_status', 'created_at',
+        # master-only ingest keys and pull-sync sequence
+        'source_user_id', 'source_local_id', 'change_seq',
+    )
+    INTERNED = ('budget_status', 'schedule_status', 'sync_status')
+    __slots__ = FIELDS
+
+
+class ActivityRecord(Record):
+    """User activity row, optionally joined to user and project names"""
+
+    FIELDS = (
+        'activity_id', 'user_id', 'activity_type', 'activity_description',
+        'related_project_id', 'created_at', 'project_name', 'user_name',
+    )
+    INTERNED = ('activity_type', 'project_name', 'user_name')
+    __slots__ = FIELDS
+
+
+def record_factory(record_type):
+    """
+    Build a sqlite3 row_factory that creates record_type instances
+
+    The column-to-slot mapping is worked out once per statement (keyed on
+    cursor.description) rather than once per row, and columns listed in
+    INTERNED share one string object per distinct value.
+
+    Args:
+        record_type: Record subclass to build
+
+    Returns:
+        Callable suitable for cursor.row_factory
+    """
+    new = record_type.__new__
+    set_extra = Record._extra.__set__
+    cache = {'description': None, 'setters': (), 'extra': ()}
+
+    def plan(description):
+        setters = []
+        extra = []
+        for index, column in enumerate(description):
+            name = column[0]
+            if name in record_type._field_set:
+                slot_set = getattr(record_type, name).__set__
+                if name in record_type.INTERNED:
+                    setters.append((index, _interning_setter(slot_set)))
+                else:
+                    setters.append((index, slot_set))
+            else:
+                extra.append((index, name))
+        cache['description'] = description
+        cache['setters'] = tuple(setters)
+        cache['extra'] = tuple(extra)
+
+    def factory(cursor, row):
+        if cursor.description is not cache['description']:
+            plan(cursor.description)
+
+        record = new(record_type)
+        for index, slot_set in cache['setters']:
+            slot_set(record, row[index])
+        if cache['extra']:
+            set_extra(record, {name: row[index] for index, name in cache['extra']})
+        else:
+            set_extra(record, None)
+        return record
+
+    return factory
+
+
+def _interning_setter(slot_set):
+    def set_interned(record, value):
+        slot_set(record, sys.intern(value) if type(value) is str else value)
+    return set_interned
@@ -0,0 +1,204 @@
+"""
+Master rebuild for Verizon Tracker
+Replays archived sync bundles onto a base snapshot of master_projects.db
+"""
+
+import multiprocessing
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Tuple
+from . import archive, ingest
+from .backup import copy_database
+from .database import Database, MasterProjectsDB, ARCHIVE, G_DRIVE, connection_pool
+
+
+# Live master, whose archive index lists the bundles to replay
+MASTER_DB_PATH = G_DRIVE / "master_projects.db"
+
+
+def archived_entries(index_path: Optional[Path] = MASTER_DB_PATH,
+                     archive_dir: Path = ARCHIVE) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Archived bundles in the order master applied them
+
+    Read from the sync_archive_index of the database at index_path; if
+    there is none or it cannot be read (a damaged master), the packs are
+    scanned instead.
+
+    Returns:
+        (index entries, 'index' or 'scan')
+    """
+    if index_path is not None and Path(index_path).exists():
+        index_db = Database(str(index_path))
+        try:
+            index_db.connect()
+            rows = index_db.fetchall("SELECT * FROM sync_archive_index ORDER BY archived_at, bundle_id")
+            return [dict(row) for row in rows], 'index'
+        except Exception:
+            pass
+        finally:
+            index_db.close()
+            connection_pool.close_idle(index_db.db_path)
+    return archive.scan_packs(archive_dir), 'scan'
+
+
+def replay_plan(entries: List[Dict[str, Any]], applied_hashes: Collection[str],
+                exclude: Collection[str] = (), since: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Entries still to replay onto a base that already holds applied_hashes
+
+    Each bundle's content is replayed once (duplicate drops share a hash).
+    exclude drops bundles by file name or content hash (e.g. a bad bundle
+    that was merged); since drops bundles archived before the base was
+    taken.
+
+    Returns:
+        (entries to replay in order, number excluded)
+    """
+    seen, plan, excluded = set(applied_hashes), [], 0
+    for entry in entries:
+        if entry['file_name'] in exclude or entry['bundle_hash'] in exclude:
+            excluded += 1
+            continue
+        if entry['bundle_hash'] in seen or (since is not None and entry['archived_at'] < since):
+            continue
+        seen.add(entry['bundle_hash'])
+        plan.append(entry)
+    return plan, excluded
+
+
+def _prepare_entry(entry: Dict[str, Any], archive_dir: Path, scratch_dir: Path) -> Dict[str, Any]:
+    """Extract one archived bundle and decode it (runs in replay worker processes)"""
+    entry_dir = scratch_dir / entry['bundle_hash']
+    try:
+        return ingest.prepare_bundle(archive.extract_archived_bundle(entry, entry_dir, archive_dir))
+    finally:
+        shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def _prepared_in_order(plan: List[Dict[str, Any]], archive_dir: Path, scratch_dir: Path,
+                       workers: int) -> Iterator[Tuple[Dict[str, Any], Callable[[], Dict[str, Any]]]]:
+    """
+    (entry, prepared result) for each planned bundle, in plan order
+
+    With workers > 1 bundles are decoded in a process pool, at most
+    workers * 2 ahead of the one being applied.
+    """
+    if workers <= 1:
+        for entry in plan:
+            yield entry, lambda entry=entry: _prepare_entry(entry, archive_dir, scratch_dir)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = deque()
+        remaining = iter(plan)
+        while True:
+            while len(pending) < workers * 2:
+                entry = next(remaining, None)
+                if entry is None:
+                    break
+                pending.append((entry, executor.submit(_prepare_entry, entry, archive_dir, scratch_dir).result))
+            if not pending:
+                return
+            yield pending.popleft()
+
+
+def rebuild_master(output: Path, base: Optional[Path] = None,
+                   index_path: Optional[Path] = MASTER_DB_PATH, archive_dir: Path = ARCHIVE,
+                   workers: int = 1, exclude: Collection[str] = (), since: Optional[float] = None,
+                   progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Build a new master database from a base snapshot plus the archive
+
+    The base (e.g. a backup's master_projects.db) is copied to output and
+    migrated, or output starts empty. Archived bundles the base's ingest
+    ledger does not already have are then applied in archive order with
+    the batched ingest path, one transaction per bundle, and indexed in
+    the new database. Bundles are decoded in worker processes ahead of the
+    single writer. The live master is never modified; swapping output in
+    is left to the operator.
+
+    Args:
+        output: New database file (must not exist)
+        base: Snapshot to start from (None for an empty master)
+        index_path: Database whose archive index lists the bundles (the
+            packs are scanned if None or unreadable)
+        archive_dir: Directory of the archive packs
+        workers: Decoding processes (1 decodes on the calling thread)
+        exclude: File names or content hashes of bundles to leave out
+        since: Skip bundles archived before this time (when the base
+            predates the ingest ledger)
+        progress: Optional callback(done, total, bundle_stats) after each bundle
+
+    Returns:
+        Totals with per-bundle stats, the index source and bundles/sec
+    """
+    output = Path(output)
+    if output.exists():
+        raise FileExistsError(f"{output} already exists")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if base is not None:
+        copy_database(Path(base), output)
+
+    projects_db = MasterProjectsDB()
+    projects_db.db_path = str(output)
+    projects_db.connect()
+    scratch_dir = output.with_name(output.name + ".replay")
+    try:
+        projects_db.migrate()
+        applied = {row['bundle_hash'] for row in projects_db.fetchall(
+            "SELECT bundle_hash FROM sync_ingest_ledger WHERE status = 'applied'"
+        )}
+        indexed = {row['bundle_hash'] for row in projects_db.fetchall("SELECT bundle_hash FROM sync_archive_index")}
+
+        entries, source = archived_entries(index_path, archive_dir)
+        plan, excluded = replay_plan(entries, applied, exclude, since)
+        totals = {
+            'source': source,
+            'archived': len(entries),
+            'bundles': len(plan),
+            'bundles_applied': 0,
+            'bundles_failed': 0,
+            'bundles_excluded': excluded,
+            'errors': [],
+            'bundle_stats': []
+        }
+        totals.update({key: 0 for key in ingest.COUNTER_KEYS})
+        start = time.perf_counter()
+
+        def index_entry(entry: Dict[str, Any]) -> Callable[[Dict[str, Any]], None]:
+            """Hook that indexes the bundle in the same transaction that applies it"""
+            def on_applied(stats: Dict[str, Any]):
+                if entry['bundle_hash'] not in indexed:
+                    projects_db.execute(archive.INSERT_INDEX_SQL,
+                                        tuple(entry[column] for column in archive.INDEX_COLUMNS))
+            return on_applied
+
+        for done, (entry, prepared) in enumerate(_prepared_in_order(plan, archive_dir, scratch_dir, workers), start=1):
+            try:
+                stats = ingest.apply_prepared_bundle(projects_db, prepared(), entry['file_name'],
+                                                     on_applied=index_entry(entry))
+            except Exception as e:
+                # Could not be extracted or decoded
+                stats = ingest.new_ingest_stats(entry['file_name'])
+                stats['errors'].append(f"{entry['file_name']}: {e}")
+
+            totals['bundles_applied' if stats['success'] else 'bundles_failed'] += 1
+            for key in ingest.COUNTER_KEYS:
+                totals[key] += stats[key]
+            totals['errors'].extend(stats['errors'])
+            totals['bundle_stats'].append(stats)
+            if progress:
+                progress(done, len(plan), stats)
+
+        totals['duration'] = time.perf_counter() - start
+        totals['bundles_per_sec'] = totals['bundles_applied'] / totals['duration'] if totals['duration'] else 0.0
+        return totals
+    finally:
+        projects_db.close()
+        # Release the file so it can be swapped in for master
+        connection_pool.close_idle(projects_db.db_path)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
@@ -5,6 +5,7 @@ Global search across projects, users, and activities
 
 from typing import List, Dict
 from .database import MasterProjectsDB, MasterUsersDB, LocalProjectsDB
+from .records import ProjectRecord
 import streamlit as st
 
 
@@ -12,7 +13,7 @@ class GlobalSearch:
     """Perform global searches across the application"""
 
     @staticmethod
-    def search_projects(query: str, user_id: int, role: str, limit: int = 10) -> List[Dict]:
+    def search_projects(query: str, user_id: int, role: str, limit: int = 10) -> List[ProjectRecord]:
         """
         Search projects by name, CCR/NFID, customer, or description
 
@@ -23,7 +24,7 @@ class GlobalSearch:
             limit: Maximum results to return
 
         Returns:
-            List of matching project dictionaries
+            List of matching project records
         """
         if not query or len(query) < 2:
             return []
@@ -36,7 +37,7 @@ class GlobalSearch:
                 db = LocalProjectsDB(user_id)
                 db.connect()
 
-                results = db.fetchall("""
+                results = db.fetch_records("""
                     SELECT
                         project_id,
                         name,
@@ -55,7 +56,7 @@ class GlobalSearch:
                     AND pm_id = ?
                     ORDER BY name
                     LIMIT ?
-                """, (query_pattern, query_pattern, query_pattern, query_pattern, user_id, limit))
+                """, (query_pattern, query_pattern, query_pattern, query_pattern, user_id, limit), ProjectRecord)
 
                 db.close()
             else:
@@ -63,7 +64,7 @@ class GlobalSearch:
                 db = MasterProjectsDB()
                 db.connect()
 
-                results = db.fetchall("""
+                results = db.fetch_records("""
                     SELECT
                         project_id,
                         name,
@@ -81,11 +82,11 @@ class GlobalSearch:
                     )
                     ORDER BY name
                     LIMIT ?
-                """, (query_pattern, query_pattern, query_pattern, query_pattern, limit))
+                """, (query_pattern, query_pattern, query_pattern, query_pattern, limit), ProjectRecord)
 
                 db.close()
 
-            return [dict(row) for row in results]
+            return results
 
         except Exception as e:
             return []
@@ -137,7 +138,7 @@ class GlobalSearch:
             return []
 
     @staticmethod
-    def get_recent_projects(user_id: int, role: str, limit: int = 5) -> List[Dict]:
+    def get_recent_projects(user_id: int, role: str, limit: int = 5) -> List[ProjectRecord]:
         """
         Get recently accessed/modified projects
 
@@ -147,7 +148,7 @@ class GlobalSearch:
             limit: Maximum results to return
 
         Returns:
-            List of recent project dictionaries
+            List of recent project records
         """
         try:
             if role == "Sr. Project Manager":
@@ -155,7 +156,7 @@ class GlobalSearch:
                 db = LocalProjectsDB(user_id)
                 db.connect()
 
-                results = db.fetchall("""
+                results = db.fetch_records("""
                     SELECT
                         p.project_id,
                         p.name,
@@ -167,7 +168,7 @@ class GlobalSearch:
                     WHERE p.pm_id = ?
                     ORDER BY p.updated_at DESC
                     LIMIT ?
-                """, (user_id, limit))
+                """, (user_id, limit), ProjectRecord)
 
                 db.close()
             else:
@@ -176,7 +177,7 @@ class GlobalSearch:
                 db.connect()
 
                 # Get recent activities to find recently accessed projects
-                results = db.fetchall("""
+                results = db.fetch_records("""
                     SELECT DISTINCT
                         p.project_id,
                         p.name,
@@ -188,11 +189,11 @@ class GlobalSearch:
                     WHERE p.updated_at IS NOT NULL
                     ORDER BY p.updated_at DESC
                     LIMIT ?
-                """, (limit,))
+                """, (limit,), ProjectRecord)
 
                 db.close()
 
-            return [dict(row) for row in results]
+            return results
 
         except Exception as e:
             return []
@@ -0,0 +1,157 @@
+"""
+Cached application settings for Verizon Tracker
+Typed, in-process snapshot of config.db so page renders never load it again
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .database import ConfigDB, query_cache
+
+
+# Type and fallback for settings read on hot paths; other keys are plain strings
+SETTING_TYPES: Dict[str, tuple] = {
+    'kpi_threshold_green': (float, 90.0),
+    'kpi_threshold_yellow': (float, 70.0),
+    'business_days_per_week': (int, 5),
+    'ai_model_name': (str, "all-MiniLM-L6-v2"),
+    'app_version': (str, "1.0.0"),
+    'sync_bundle_format': (str, "vtb"),
+    'ingest_workers': (int, 4),
+    'sync_part_max_rows': (int, 5000),
+    'ingest_pinned_users': (str, ""),
+}
+
+
+class SettingsCache:
+    """
+    Process-wide snapshot of config_settings, reloaded only after a write
+
+    The snapshot is stamped with config.db's data_version, so writes from
+    other processes (the inbox daemon, another app instance) are picked up
+    on the next read, not only writes made through this process's ConfigDB.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Dict[str, str]]] = None,
+                 version: Optional[Callable[[], Any]] = None):
+        self._loader = loader or self._load_from_config_db
+        self._version = version or self._config_db_version
+        self._lock = threading.Lock()
+        self._state: Optional[tuple] = None  # (raw values, typed values, version) swapped as one
+        self.loads = 0
+
+    @staticmethod
+    def _load_from_config_db() -> Dict[str, str]:
+        config_db = ConfigDB()
+        config_db.connect()
+        rows = config_db.fetchall("SELECT setting_key, setting_value FROM config_settings")
+        config_db.close()
+        return {row['setting_key']: row['setting_value'] for row in rows}
+
+    @staticmethod
+    def _config_db_version() -> tuple:
+        return query_cache.data_version(ConfigDB())
+
+    def _snapshot(self) -> tuple:
+        try:
+            # Read before loading: a write that lands during the load leaves a stale stamp
+            version = self._version()
+        except Exception:
+            version = None
+        state = self._state
+        if state is None or state[2] != version:
+            with self._lock:
+                if self._state is None or self._state[2] != version:
+                    try:
+                        raw = self._loader()
+                    except Exception:
+                        # config.db unavailable - serve defaults without caching them
+                        return {}, {}, None
+                    self._state = (raw, {}, version)
+                    self.loads += 1
+                state = self._state
+        return state
+
+    def invalidate(self):
+        """Drop the snapshot so the next read reloads config.db (call after every write)"""
+        with self._lock:
+            self._state = None
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Get a raw setting value
+
+        Args:
+            key: Setting key
+            default: Value returned if the key is not set
+
+        Returns:
+            Setting value as stored in config.db, or default
+        """
+        raw, _, _ = self._snapshot()
+        return raw.get(key, default)
+
+    def get_typed(self, key: str) -> Any:
+        """
+        Get a setting converted to its type from SETTING_TYPES
+
+        Falls back to the declared default if the stored value is missing or
+        does not convert (e.g. a typo entered through the Admin Panel).
+        """
+        raw, typed, _ = self._snapshot()
+        if key in typed:
+            return typed[key]
+
+        cast, default = SETTING_TYPES[key]
+        try:
+            value = cast(raw[key])
+        except (KeyError, TypeError, ValueError):
+            value = default
+        typed[key] = value
+        return value
+
+    @property
+    def kpi_threshold_green(self) -> float:
+        """On-time percentage at or above which a KPI is green"""
+        return self.get_typed('kpi_threshold_green')
+
+    @property
+    def kpi_threshold_yellow(self) -> float:
+        """On-time percentage at or above which a KPI is yellow"""
+        return self.get_typed('kpi_threshold_yellow')
+
+    @property
+    def business_days_per_week(self) -> int:
+        return self.get_typed('business_days_per_week')
+
+    @property
+    def ai_model_name(self) -> str:
+        return self.get_typed('ai_model_name')
+
+    @property
+    def app_version(self) -> str:
+        return self.get_typed('app_version')
+
+    @property
+    def sync_bundle_format(self) -> str:
+        """Format PMs write sync bundles in: "vtb" (compressed) or "json" """
+        return self.get_typed('sync_bundle_format')
+
+    @property
+    def ingest_workers(self) -> int:
+        """Processes decoding inbox bundles ahead of the master writer"""
+        return self.get_typed('ingest_workers')
+
+    @property
+    def sync_part_max_rows(self) -> int:
+        """Rows per part when a PM's pending changes are split into a multi-part bundle"""
+        return self.get_typed('sync_part_max_rows')
+
+    @property
+    def ingest_pinned_users(self) -> List[str]:
+        """PMs whose inbox bundles are applied before everyone else's, highest priority first"""
+        return [name.strip() for name in self.get_typed('ingest_pinned_users').split(',') if name.strip()]
+
+
+# Shared snapshot used by every session in this process
+settings = SettingsCache()
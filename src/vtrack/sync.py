@@ -3,150 +3,442 @@ Synchronization module for Verizon Tracker
 Handles syncing local data to master database via inbox system
 """
 
+import itertools
 import json
 import os
+import shutil
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
-from .database import LocalProjectsDB, SYNC_INBOX, ARCHIVE
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from .database import LocalProjectsDB, MasterProjectsDB, SYNC_INBOX, ARCHIVE, SYNC_OUTBOX
+from .settings import settings
+from .ingest import CHILD_TABLES, PROJECT_INSERT_COLUMNS, PROJECT_UPDATES_TABLE
+from . import bundles, inbox
+
+
+# Child record columns that point at a local project
+PROJECT_REFERENCE_COLUMNS = ("local_project_id", "depends_on_local_project_id")
+
+# Rows pulled from the local cursor per fetchmany() while streaming a bundle
+BUNDLE_FETCH_SIZE = 1000
+
+# Rows logged in the sync window, grouped with whether they must ship whole:
+# inserts, and updates logged before column tracking (or on child tables)
+PENDING_ROWS_SQL = """
+    SELECT row_id, GROUP_CONCAT(changed_columns) AS changed_columns
+    FROM change_log
+    WHERE table_name = ? AND seq > ? AND seq <= ?
+    GROUP BY row_id
+    HAVING MAX(operation = 'insert' OR changed_columns IS NULL) = {full}
+"""
 
+# Staging directory manifest for a bundle waiting to be uploaded part by part
+OUTBOX_MANIFEST = "manifest.json"
+
+# Synced table -> label used in pending and pulled counts
+SYNC_LABELS = {
+    'projects': 'projects',
+    'kpi_snapshots': 'kpis',
+    'project_dependencies': 'dependencies',
+    'project_contacts': 'contacts'
+}
+
+# Local column holding the master primary key of a pulled row
+PULL_MASTER_KEYS = {
+    'projects': 'master_project_id',
+    'kpi_snapshots': 'master_snapshot_id',
+    'project_dependencies': 'master_dependency_id',
+    'project_contacts': 'master_contact_id'
+}
+
+# Project columns copied from master into a PM's local database
+PULL_PROJECT_COLUMNS = PROJECT_INSERT_COLUMNS + ['created_at', 'updated_at']
+
+# Master rows read and applied per batch while pulling (also bounds IN lookups)
+PULL_BATCH_SIZE = 500
+
+UPSERT_PULLED_PROJECT_SQL = f"""
+    INSERT INTO projects (master_project_id, {', '.join(PULL_PROJECT_COLUMNS)}, sync_status)
+    VALUES (?, {', '.join('?' for _ in PULL_PROJECT_COLUMNS)}, 'synced')
+    ON CONFLICT(ccr_nfid) DO UPDATE SET
+        master_project_id = excluded.master_project_id,
+        {', '.join(f'{column} = excluded.{column}' for column in PULL_PROJECT_COLUMNS)},
+        sync_status = 'synced'
+"""
 
-def create_sync_bundle(local_db: LocalProjectsDB, username: str) -> Dict[str, Any]:
+
+def pending_bundle_events(local_db: LocalProjectsDB, username: str) -> Iterator[bundles.BundleEvent]:
     """
-    Create a sync bundle containing all pending changes from local database
-    Returns a dictionary with projects, KPIs, dependencies, and contacts
+    Stream all pending changes from the local database as bundle events
+
+    Pending rows are read from the change log between the acknowledged
+    watermark and the current head; the head is stored as change_seq so
+    only those changes are acknowledged once the bundle is saved. New
+    projects ship whole; projects that were only edited ship as
+    project_updates deltas. Rows are read in BUNDLE_FETCH_SIZE chunks, so
+    memory does not grow with the size of the bundle.
     """
 
-    bundle = {
+    acked_seq = local_db.sync_watermark()
+    through_seq = local_db.change_log_head()
+
+    yield "header", None, {
         "username": username,
+        "user_id": local_db.user_id,
         "sync_timestamp": datetime.now().isoformat(),
-        "projects": [],
-        "kpi_snapshots": [],
-        "project_dependencies": [],
-        "project_contacts": []
+        "change_seq": through_seq
     }
 
-    # Get all projects that need syncing (new or updated)
-    projects = local_db.fetchall("""
-        SELECT * FROM projects
-        WHERE sync_status IN ('new', 'updated')
-    """)
+    # CCR/NFID of every project a child record points at, so master can map
+    # local IDs even when the parent project itself has not changed
+    referenced = set()
+
+    for table, key in LocalProjectsDB.SYNCED_TABLES:
+        cursor = local_db.conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM {table}
+            WHERE {key} IN (SELECT row_id FROM ({PENDING_ROWS_SQL.format(full=1)}))
+        """, (table, acked_seq, through_seq))
+
+        columns = [column[0] for column in cursor.description]
+        yield "table", table, columns
+
+        references = [] if table == "projects" else [
+            columns.index(column) for column in PROJECT_REFERENCE_COLUMNS if column in columns
+        ]
+        for row in _fetch_rows(cursor):
+            for index in references:
+                if row[index] is not None:
+                    referenced.add(row[index])
+            yield "row", table, tuple(row)
+
+        if table == "projects":
+            yield from _project_update_events(local_db, acked_seq, through_seq)
+
+    yield "field", "project_keys", _project_keys(local_db, referenced)
+
+
+def _fetch_rows(cursor) -> Iterator[tuple]:
+    """Rows of an executed cursor, BUNDLE_FETCH_SIZE at a time"""
+    while True:
+        rows = cursor.fetchmany(BUNDLE_FETCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+def _project_update_events(local_db: LocalProjectsDB, acked_seq: int,
+                           through_seq: int) -> Iterator[bundles.BundleEvent]:
+    """
+    Column-level deltas for projects that were only updated in the window
+
+    Each delta carries the project's CCR/NFID and the current value of just
+    the columns the change log recorded as changed, so editing one field
+    ships one field instead of the whole row.
+    """
+    yield "table", PROJECT_UPDATES_TABLE, ["local_id", "ccr_nfid", "changes"]
+
+    cursor = local_db.conn.cursor()
+    cursor.execute(f"""
+        SELECT p.*, pending.changed_columns AS pending_columns
+        FROM projects p
+        JOIN ({PENDING_ROWS_SQL.format(full=0)}) pending ON pending.row_id = p.local_id
+    """, ('projects', acked_seq, through_seq))
+    columns = [column[0] for column in cursor.description]
+
+    for row in _fetch_rows(cursor):
+        project = dict(zip(columns, row))
+        changed = dict.fromkeys(project['pending_columns'].split(','))
+        yield "row", PROJECT_UPDATES_TABLE, (
+            project['local_id'], project['ccr_nfid'], {column: project[column] for column in changed}
+        )
+
+
+def _project_keys(local_db: LocalProjectsDB, referenced: set) -> Dict[str, str]:
+    """CCR/NFID of each referenced local project, keyed by local ID as a string"""
+    project_keys = {}
+    local_ids = sorted(referenced)
+    for start in range(0, len(local_ids), 500):
+        batch = local_ids[start:start + 500]
+        placeholders = ','.join('?' for _ in batch)
+        rows = local_db.fetchall(
+            f"SELECT local_id, ccr_nfid FROM projects WHERE local_id IN ({placeholders})",
+            tuple(batch)
+        )
+        project_keys.update({str(row['local_id']): row['ccr_nfid'] for row in rows})
+    return project_keys
+
+
+def pending_bundle_parts(local_db: LocalProjectsDB, username: str,
+                         max_rows: int) -> Iterator[Iterator[bundles.BundleEvent]]:
+    """
+    Split pending changes into bundles of at most max_rows rows each
+
+    Each part is a complete bundle: the header (with its part number), the
+    table frames for the rows it holds and project_keys for the local
+    projects its child records point at, so master can apply it on its
+    own. Parts share one pass over the local cursors and must be consumed
+    in order.
+    """
+
+    events = pending_bundle_events(local_db, username)
+    _, _, header = next(events)
+    state = {'table': None, 'columns': None, 'references': [], 'carry': None, 'done': False}
+
+    def part_events(number: int) -> Iterator[bundles.BundleEvent]:
+        yield "header", None, dict(header, part=number)
+        if state['table'] is not None:
+            yield "table", state['table'], state['columns']
+
+        referenced, rows = set(), 0
+        carry, state['carry'] = state['carry'], None
+        for kind, name, value in itertools.chain([carry] if carry else [], events):
+            if kind == "row":
+                if rows == max_rows:
+                    # First row of the next part
+                    state['carry'] = (kind, name, value)
+                    break
+                rows += 1
+                referenced.update(value[index] for index in state['references'] if value[index] is not None)
+                yield kind, name, value
+            elif kind == "table":
+                state['table'], state['columns'] = name, value
+                state['references'] = [] if name == "projects" else [
+                    value.index(column) for column in PROJECT_REFERENCE_COLUMNS if column in value
+                ]
+                yield kind, name, value
+            elif name != "project_keys":
+                yield kind, name, value
+        else:
+            state['done'] = True
+
+        yield "field", "project_keys", _project_keys(local_db, referenced)
+
+    for number in itertools.count(1):
+        yield part_events(number)
+        if state['done']:
+            break
 
-    for project in projects:
-        bundle["projects"].append(dict(project))
 
-    # Get KPI snapshots for those projects
-    if projects:
-        project_ids = [p['local_id'] for p in projects]
-        placeholders = ','.join(['?' for _ in project_ids])
+def create_sync_bundle(local_db: LocalProjectsDB, username: str) -> Dict[str, Any]:
+    """
+    Create a sync bundle containing all pending changes from local database
+    Returns a dictionary with projects, KPIs, dependencies, and contacts
+    """
 
-        kpis = local_db.fetchall(f"""
-            SELECT * FROM kpi_snapshots
-            WHERE local_project_id IN ({placeholders})
-            AND sync_status IN ('new', 'updated')
-        """, tuple(project_ids))
+    return bundles.collect_bundle(pending_bundle_events(local_db, username))
 
-        for kpi in kpis:
-            bundle["kpi_snapshots"].append(dict(kpi))
 
-        # Get dependencies
-        deps = local_db.fetchall(f"""
-            SELECT * FROM project_dependencies
-            WHERE local_project_id IN ({placeholders})
-            AND sync_status IN ('new', 'updated')
-        """, tuple(project_ids))
+def _bundle_stem(username: str) -> str:
+    return f"sync_{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        for dep in deps:
-            bundle["project_dependencies"].append(dict(dep))
 
-        # Get contacts
-        contacts = local_db.fetchall(f"""
-            SELECT * FROM project_contacts
-            WHERE local_project_id IN ({placeholders})
-            AND sync_status IN ('new', 'updated')
-        """, tuple(project_ids))
+def _new_bundle_path(username: str, suffix: str) -> Path:
+    """Unique inbox path for a new bundle"""
+    SYNC_INBOX.mkdir(parents=True, exist_ok=True)
+    return SYNC_INBOX / f"{_bundle_stem(username)}{suffix}"
 
-        for contact in contacts:
-            bundle["project_contacts"].append(dict(contact))
 
-    return bundle
+def _index_in_manifest(record, *args):
+    """
+    Index a new bundle so the inbox page never has to parse it; if master
+    is busy the next refresh_manifest() picks the file up instead
+    """
+    try:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+        record(projects_db, *args)
+        projects_db.close()
+    except Exception:
+        pass
 
 
 def save_sync_bundle_to_inbox(bundle: Dict[str, Any], username: str) -> str:
     """
-    Save sync bundle as JSON file in the sync inbox
+    Save sync bundle in the sync inbox, in the configured bundle format
     Returns the filename
     """
 
-    # Create unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"sync_{username}_{timestamp}.json"
-    filepath = SYNC_INBOX / filename
+    if settings.sync_bundle_format == "json":
+        filepath = _new_bundle_path(username, bundles.JSON_SUFFIX)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(bundle, f, indent=2, default=str)
+        _index_in_manifest(inbox.record_bundle, filepath, bundle)
+    else:
+        filepath = _new_bundle_path(username, bundles.VTB_SUFFIX)
+        written = bundles.write_bundle(filepath, bundles.bundle_events(bundle))
+        _index_in_manifest(inbox.record_written_bundle, filepath, written)
 
-    # Ensure inbox directory exists
-    SYNC_INBOX.mkdir(parents=True, exist_ok=True)
+    return filepath.name
+
+
+def stream_sync_bundle_to_inbox(local_db: LocalProjectsDB, username: str) -> Tuple[str, int]:
+    """
+    Write pending changes straight from the local cursor to a .vtb bundle
+    Returns the filename and the bundle's change_seq
+    """
+
+    filepath = _new_bundle_path(username, bundles.VTB_SUFFIX)
+    written = bundles.write_bundle(filepath, pending_bundle_events(local_db, username))
+    _index_in_manifest(inbox.record_written_bundle, filepath, written)
 
-    # Write JSON file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(bundle, f, indent=2, default=str)
+    return filepath.name, written['header']['change_seq']
 
-    return filename
 
+def _write_outbox_manifest(staging: Path, manifest: Dict[str, Any]):
+    """Replace a staging directory's manifest in one rename (it is the upload checkpoint)"""
+    partial = staging / (OUTBOX_MANIFEST + ".part")
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    partial.replace(staging / OUTBOX_MANIFEST)
 
-def mark_items_as_synced(local_db: LocalProjectsDB):
+
+def stage_sync_parts(local_db: LocalProjectsDB, username: str, outbox: Path = SYNC_OUTBOX,
+                     max_rows: Optional[int] = None) -> Tuple[Path, Dict[str, Any]]:
     """
-    Mark all items that were in 'new' or 'updated' status as 'synced'
+    Write pending changes to the local outbox as numbered .vtb parts
+
+    Staging is local, so it is fast and completes before anything is sent
+    to the shared drive. A single part is named like an ordinary bundle.
+
+    Args:
+        local_db: Connected local database
+        username: PM username
+        outbox: Local staging root
+        max_rows: Rows per part (default: sync_part_max_rows setting)
+
+    Returns:
+        (staging directory, manifest listing the parts in order)
     """
+    max_rows = max_rows or settings.sync_part_max_rows
+    stem = _bundle_stem(username)
+    staging = outbox / stem
+    # A bundle staged earlier in the same second is still waiting to upload
+    while staging.exists():
+        time.sleep(1)
+        stem = _bundle_stem(username)
+        staging = outbox / stem
+    staging.mkdir(parents=True)
+
+    parts = []
+    for number, events in enumerate(pending_bundle_parts(local_db, username, max_rows), start=1):
+        path = staging / bundles.part_file_name(stem, number)
+        written = bundles.write_bundle(path, events)
+        parts.append({
+            'file': path.name,
+            'rows': sum(written['counts'].values()),
+            'header': written['header'],
+            'counts': written['counts'],
+            'preview': written['preview'],
+            'uploaded': False
+        })
+
+    if len(parts) == 1:
+        single = stem + bundles.VTB_SUFFIX
+        (staging / parts[0]['file']).replace(staging / single)
+        parts[0]['file'] = single
+
+    manifest = {
+        'bundle_id': stem,
+        'username': username,
+        'user_id': local_db.user_id,
+        'change_seq': parts[0]['header']['change_seq'],
+        'created_at': datetime.now().isoformat(),
+        'parts': parts
+    }
+    _write_outbox_manifest(staging, manifest)
+    return staging, manifest
+
 
-    tables = [
-        'projects',
-        'kpi_snapshots',
-        'project_dependencies',
-        'project_contacts'
-    ]
+def upload_staged_bundle(staging: Path, inbox_dir: Path = SYNC_INBOX) -> Dict[str, Any]:
+    """
+    Copy a staged bundle's parts to the inbox in order, checkpointing each
 
-    for table in tables:
-        local_db.execute(f"""
-            UPDATE {table}
-            SET sync_status = 'synced'
-            WHERE sync_status IN ('new', 'updated')
-        """)
+    Every part is copied under a .part name and renamed into the inbox, and
+    the staging manifest is updated after each one, so an interrupted upload
+    resumes with the first part that did not arrive. The staging directory
+    is removed once every part is in the inbox.
 
+    Returns:
+        The staging manifest
 
-def get_pending_sync_counts(local_db: LocalProjectsDB) -> Dict[str, int]:
+    Raises:
+        OSError: If a copy fails; parts already uploaded stay uploaded
     """
-    Get counts of items pending sync
+    with open(staging / OUTBOX_MANIFEST, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+    for part in manifest['parts']:
+        if part['uploaded']:
+            continue
+        target = inbox_dir / part['file']
+        partial = target.with_name(target.name + ".part")
+        shutil.copyfile(staging / part['file'], partial)
+        partial.replace(target)
+        if inbox_dir == SYNC_INBOX:
+            _index_in_manifest(inbox.record_written_bundle, target, part)
+
+        part['uploaded'] = True
+        _write_outbox_manifest(staging, manifest)
+
+    shutil.rmtree(staging)
+    return manifest
+
+
+def staged_bundles(username: str, outbox: Path = SYNC_OUTBOX) -> List[Path]:
+    """Staging directories of a PM's bundles not yet fully uploaded, oldest first"""
+    if not outbox.exists():
+        return []
+    return sorted(
+        path for path in outbox.iterdir()
+        if path.is_dir() and path.name.startswith(f"sync_{username}_") and (path / OUTBOX_MANIFEST).exists()
+    )
+
+
+def resume_outbox_uploads(username: str, outbox: Path = SYNC_OUTBOX,
+                          inbox_dir: Path = SYNC_INBOX) -> int:
     """
+    Finish uploading bundles an earlier sync staged but could not deliver
 
-    counts = {}
+    Returns:
+        Number of bundles completed
+    """
+    staged = staged_bundles(username, outbox)
+    for staging in staged:
+        upload_staged_bundle(staging, inbox_dir)
+    return len(staged)
 
-    # Count projects
-    result = local_db.fetchone("""
-        SELECT COUNT(*) as count FROM projects
-        WHERE sync_status IN ('new', 'updated')
-    """)
-    counts['projects'] = result['count'] if result else 0
 
-    # Count KPIs
-    result = local_db.fetchone("""
-        SELECT COUNT(*) as count FROM kpi_snapshots
-        WHERE sync_status IN ('new', 'updated')
-    """)
-    counts['kpis'] = result['count'] if result else 0
+def mark_items_as_synced(local_db: LocalProjectsDB, through_seq: Optional[int] = None):
+    """
+    Acknowledge pending changes up to through_seq (a bundle's change_seq)
+    Defaults to everything logged so far
+    """
 
-    # Count dependencies
-    result = local_db.fetchone("""
-        SELECT COUNT(*) as count FROM project_dependencies
-        WHERE sync_status IN ('new', 'updated')
-    """)
-    counts['dependencies'] = result['count'] if result else 0
+    if through_seq is None:
+        through_seq = local_db.change_log_head()
+
+    local_db.acknowledge_changes(through_seq)
+
+
+def get_pending_sync_counts(local_db: LocalProjectsDB) -> Dict[str, int]:
+    """
+    Get counts of items pending sync
+    """
+
+    labels = SYNC_LABELS
+    counts = {label: 0 for label in labels.values()}
 
-    # Count contacts
-    result = local_db.fetchone("""
-        SELECT COUNT(*) as count FROM project_contacts
-        WHERE sync_status IN ('new', 'updated')
+    results = local_db.fetchall("""
+        SELECT table_name, COUNT(*) as count
+        FROM pending_changes
+        GROUP BY table_name
     """)
-    counts['contacts'] = result['count'] if result else 0
+    for row in results:
+        if row['table_name'] in labels:
+            counts[labels[row['table_name']]] = row['count']
 
     return counts
 
@@ -158,25 +450,245 @@ def sync_local_to_inbox(local_db: LocalProjectsDB, username: str) -> tuple[bool,
     """
 
     try:
+        # Deliver anything an earlier sync staged but could not upload
+        resumed = resume_outbox_uploads(username)
+
         # Get pending counts first
         counts = get_pending_sync_counts(local_db)
 
         # Check if there's anything to sync
         total = sum(counts.values())
         if total == 0:
+            if resumed:
+                return True, f"Finished uploading {resumed} earlier sync bundle(s)", counts
             return False, "No pending changes to sync", counts
 
-        # Create sync bundle
-        bundle = create_sync_bundle(local_db, username)
-
-        # Save to inbox
-        filename = save_sync_bundle_to_inbox(bundle, username)
-
-        # Mark items as synced
-        mark_items_as_synced(local_db)
+        # Create the bundle in the inbox (JSON is kept as a configurable fallback)
+        if settings.sync_bundle_format == "json":
+            bundle = create_sync_bundle(local_db, username)
+            filename = save_sync_bundle_to_inbox(bundle, username)
+            mark_items_as_synced(local_db, bundle["change_seq"])
+        else:
+            staging, manifest = stage_sync_parts(local_db, username)
+            # The staged parts now hold these changes; an interrupted upload
+            # is resumed from the outbox rather than re-read from the change log
+            mark_items_as_synced(local_db, manifest['change_seq'])
+            parts = len(manifest['parts'])
+            try:
+                upload_staged_bundle(staging)
+            except OSError as e:
+                return False, (f"Sync staged but the upload stopped: {e}. "
+                               f"Remaining parts are sent on the next sync."), counts
+            filename = manifest['parts'][0]['file'] if parts == 1 else f"{manifest['bundle_id']}, {parts} parts"
 
         message = f"Successfully synced {total} items to inbox ({filename})"
         return True, message, counts
 
     except Exception as e:
         return False, f"Sync failed: {str(e)}", {}
+
+
+def _local_keys(local_db: LocalProjectsDB, table: str, key: str, column: str, values: List[Any]) -> Dict[Any, int]:
+    """Local primary key of each row whose column matches one of values (batched IN lookups)"""
+    found = {}
+    values = [value for value in set(values) if value is not None]
+    for start in range(0, len(values), PULL_BATCH_SIZE):
+        batch = values[start:start + PULL_BATCH_SIZE]
+        placeholders = ','.join('?' for _ in batch)
+        rows = local_db.fetchall(
+            f"SELECT {key}, {column} FROM {table} WHERE {column} IN ({placeholders})",
+            tuple(batch)
+        )
+        found.update({row[column]: row[key] for row in rows})
+    return found
+
+
+def _pending_row_ids(local_db: LocalProjectsDB, table: str) -> set:
+    """Local keys of rows in table with changes not yet pushed"""
+    rows = local_db.fetchall("SELECT row_id FROM pending_changes WHERE table_name = ?", (table,))
+    return {row['row_id'] for row in rows}
+
+
+def _master_batches(projects_db: MasterProjectsDB, query: str, params: tuple) -> Iterator[List[Any]]:
+    """Stream a master query PULL_BATCH_SIZE rows at a time"""
+    cursor = projects_db.conn.cursor()
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(PULL_BATCH_SIZE)
+        if not rows:
+            break
+        yield rows
+
+
+def _pull_projects(projects_db: MasterProjectsDB, local_db: LocalProjectsDB,
+                   from_seq: int, through_seq: int, stats: Dict[str, Any]):
+    """Upsert the PM's master projects changed in (from_seq, through_seq] by CCR/NFID"""
+    pending = _pending_row_ids(local_db, 'projects')
+    query = f"""
+        SELECT project_id, {', '.join(PULL_PROJECT_COLUMNS)}
+        FROM projects
+        WHERE pm_id = ? AND change_seq > ? AND change_seq <= ?
+    """
+    for rows in _master_batches(projects_db, query, (local_db.user_id, from_seq, through_seq)):
+        local_ids = _local_keys(local_db, 'projects', 'local_id', 'ccr_nfid', [row['ccr_nfid'] for row in rows])
+
+        upserts, links = [], []
+        for row in rows:
+            local_id = local_ids.get(row['ccr_nfid'])
+            if local_id in pending:
+                # Unpushed local edits win; only learn the master ID
+                links.append((row['project_id'], local_id))
+            else:
+                upserts.append((row['project_id'],) + tuple(row[column] for column in PULL_PROJECT_COLUMNS))
+
+        local_db.executemany(UPSERT_PULLED_PROJECT_SQL, upserts)
+        local_db.executemany("UPDATE projects SET master_project_id = ? WHERE local_id = ?", links)
+        stats['projects'] += len(upserts)
+        stats['skipped'] += len(links)
+
+
+def _pull_children(projects_db: MasterProjectsDB, local_db: LocalProjectsDB, spec: Dict[str, Any],
+                   from_seq: int, through_seq: int, stats: Dict[str, Any]):
+    """
+    Apply changed KPI snapshots, dependencies or contacts of the PM's projects
+
+    Rows this PM pushed are matched on their original local key; rows
+    created elsewhere are upserted on the master key. Rows whose project
+    is not in the local database (a dependency on another PM's project)
+    are skipped.
+    """
+    table = spec['table']
+    master_key = dict(MasterProjectsDB.PULLED_TABLES)[table]
+    master_column = PULL_MASTER_KEYS[table]
+    refs = spec['project_refs']
+    columns = spec['columns']
+    pending = _pending_row_ids(local_db, table)
+
+    # EXISTS probes projects by primary key, so the scan follows the change_seq index
+    query = f"""
+        SELECT c.{master_key}, c.source_user_id, c.source_local_id,
+               {', '.join(f'c.{master}' for _, master in refs)}, {', '.join(f'c.{column}' for column in columns)}
+        FROM {table} c
+        WHERE c.change_seq > ? AND c.change_seq <= ?
+          AND EXISTS (SELECT 1 FROM projects p WHERE p.project_id = c.project_id AND p.pm_id = ?)
+    """
+    assignments = ', '.join(f'{column} = ?' for column in columns)
+    update_own_sql = f"UPDATE {table} SET {master_column} = ?, {assignments} WHERE {spec['local_key']} = ?"
+    link_own_sql = f"UPDATE {table} SET {master_column} = ? WHERE {spec['local_key']} = ?"
+    insert_columns = [master_column] + [local for local, _ in refs] + columns
+    upsert_sql = f"""
+        INSERT INTO {table} ({', '.join(insert_columns)}, sync_status)
+        VALUES ({', '.join('?' for _ in insert_columns)}, 'synced')
+        ON CONFLICT({master_column}) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in insert_columns[1:])},
+            sync_status = 'synced'
+    """
+
+    for rows in _master_batches(projects_db, query, (from_seq, through_seq, local_db.user_id)):
+        project_ids = _local_keys(local_db, 'projects', 'local_id', 'master_project_id',
+                                  [row[master] for row in rows for _, master in refs])
+        existing = _local_keys(local_db, table, spec['local_key'], master_column,
+                               [row[master_key] for row in rows])
+
+        own, links, upserts = [], [], []
+        for row in rows:
+            values = tuple(row[column] for column in columns)
+            if row['source_user_id'] == local_db.user_id and row['source_local_id'] is not None:
+                if row['source_local_id'] in pending:
+                    links.append((row[master_key], row['source_local_id']))
+                    stats['skipped'] += 1
+                else:
+                    own.append((row[master_key],) + values + (row['source_local_id'],))
+                continue
+
+            local_refs = tuple(project_ids.get(row[master]) for _, master in refs)
+            if None in local_refs or existing.get(row[master_key]) in pending:
+                stats['skipped'] += 1
+                continue
+            upserts.append((row[master_key],) + local_refs + values)
+
+        local_db.executemany(update_own_sql, own)
+        local_db.executemany(link_own_sql, links)
+        local_db.executemany(upsert_sql, upserts)
+        stats[SYNC_LABELS[table]] += len(own) + len(upserts)
+
+
+def new_pull_stats() -> Dict[str, Any]:
+    """Empty stats record for one pull"""
+    stats = {label: 0 for label in SYNC_LABELS.values()}
+    stats.update({'skipped': 0, 'from_seq': 0, 'through_seq': 0, 'duration': 0.0})
+    return stats
+
+
+def pull_master_changes(local_db: LocalProjectsDB, projects_db: MasterProjectsDB) -> Dict[str, Any]:
+    """
+    Bring a PM's local database up to date with master
+
+    Fetches only the master rows of the PM's projects stamped with a change
+    sequence number above the local pull watermark, so the cost follows the
+    number of changes rather than the size of the portfolio. Everything is
+    applied in one local transaction together with the new watermark.
+
+    Rows with unpushed local changes are left alone (counted as skipped)
+    and win when they are next synced. The pulled writes are removed from
+    the local change log so they are not pushed back to master. Projects
+    deleted from master or reassigned to another PM are not removed.
+
+    Args:
+        local_db: Connected local database of the PM
+        projects_db: Connected master projects database
+
+    Returns:
+        Stats dictionary with pulled counts per table, skipped rows and
+        the (from_seq, through_seq] range that was pulled
+    """
+    started = time.perf_counter()
+    stats = new_pull_stats()
+    stats['from_seq'] = from_seq = local_db.pull_watermark()
+    # Rows committed after this read get higher numbers and wait for the next pull
+    stats['through_seq'] = through_seq = projects_db.change_sequence_head()
+
+    if through_seq > from_seq:
+        with local_db.transaction():
+            logged_before = local_db.change_log_head()
+
+            _pull_projects(projects_db, local_db, from_seq, through_seq, stats)
+            for spec in CHILD_TABLES:
+                _pull_children(projects_db, local_db, spec, from_seq, through_seq, stats)
+
+            local_db.execute("DELETE FROM change_log WHERE seq > ?", (logged_before,))
+            local_db.execute("""
+                UPDATE sync_watermark
+                SET pulled_seq = ?, pulled_at = CURRENT_TIMESTAMP
+                WHERE watermark_id = 1
+            """, (through_seq,))
+
+    stats['duration'] = time.perf_counter() - started
+    return stats
+
+
+def pull_master_to_local(local_db: LocalProjectsDB) -> tuple[bool, str, Dict]:
+    """
+    Main pull function - refreshes the local database from master
+    Returns (success, message, stats)
+    """
+
+    try:
+        projects_db = MasterProjectsDB()
+        projects_db.connect()
+        try:
+            stats = pull_master_changes(local_db, projects_db)
+        finally:
+            projects_db.close()
+
+        total = sum(stats[label] for label in SYNC_LABELS.values())
+        if total == 0:
+            return True, "Already up to date with master", stats
+
+        message = f"Pulled {total} changes from master"
+        if stats['skipped']:
+            message += f" ({stats['skipped']} kept local because they have unsynced edits or no local project)"
+        return True, message, stats
+
+    except Exception as e:
+        return False, f"Pull failed: {str(e)}", {}
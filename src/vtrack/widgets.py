@@ -7,6 +7,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 from typing import Dict, List
 from .database import MasterProjectsDB, LocalProjectsDB
+from .settings import settings
 import streamlit as st
 import pandas as pd
 
@@ -178,7 +179,7 @@ class DashboardWidgets:
             if role == "Sr. Project Manager":
                 db = LocalProjectsDB(user_id)
                 db.connect()
-                results = db.fetchall("""
+                df = db.fetch_frame("""
                     SELECT
                         k.snapshot_date,
                         AVG(k.on_time_percent) as avg_ontime
@@ -187,12 +188,12 @@ class DashboardWidgets:
                     WHERE p.pm_id = ? AND k.snapshot_date >= ?
                     GROUP BY k.snapshot_date
                     ORDER BY k.snapshot_date
-                """, (user_id, start_date))
+                """, (user_id, start_date), parse_dates=['snapshot_date'])
                 db.close()
             else:
                 db = MasterProjectsDB()
                 db.connect()
-                results = db.fetchall("""
+                df = db.fetch_frame("""
                     SELECT
                         snapshot_date,
                         AVG(on_time_percent) as avg_ontime
@@ -200,13 +201,10 @@ class DashboardWidgets:
                     WHERE snapshot_date >= ?
                     GROUP BY snapshot_date
                     ORDER BY snapshot_date
-                """, (start_date,))
+                """, (start_date,), parse_dates=['snapshot_date'])
                 db.close()
 
-            if results:
-                df = pd.DataFrame([dict(row) for row in results])
-                return df
-            return pd.DataFrame()
+            return df
         except:
             return pd.DataFrame()
 
@@ -228,6 +226,8 @@ class DashboardWidgets:
             fillcolor='rgba(238, 0, 0, 0.1)'
         ))
 
+        fig.add_hline(y=settings.kpi_threshold_green, line_dash="dash", line_color="#4CAF50", line_width=1)
+
         fig.update_layout(
             showlegend=False,
             margin=dict(l=0, r=0, t=30, b=0),